@@ -1,33 +1,249 @@
+import asyncio
+import logging
+import time
 from abc import ABC, abstractmethod
-import google.generativeai as genai
-from app.config import GEMINI_API_KEY, GEMINI_MODEL
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from app.config import (
+    GEMINI_API_KEY,
+    GEMINI_MODEL,
+    AI_PROVIDER,
+    AI_HEDGE_BACKUP,
+    AI_HEDGE_PERCENTILE,
+    AI_HEDGE_MIN_DELAY,
+    AI_HEDGE_MAX_DELAY,
+    AI_HEDGE_DEFAULT_DELAY,
+    AI_HEDGE_MIN_SAMPLES,
+)
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_PROMPT = "당신은 노련한 선배 기자입니다. 다음 현장 상황에 대해 JSON 형식으로 응답해주세요."
 
 class AIProvider(ABC):
+    name = "provider"
+
     @abstractmethod
-    async def generate_response(self, prompt: str) -> str:
+    async def complete(self, prompt: str, temperature: float = 0.2, schema=None) -> str:
+        """프롬프트를 그대로 보내고 응답 텍스트 반환 (schema 가 있으면 그 pydantic 모델 형태의 JSON 으로 응답)"""
         pass
 
+    async def generate_response(self, prompt: str) -> str:
+        return await self.complete(f"{SYSTEM_PROMPT}\n\n현장 상황: {prompt}")
+
 class GeminiProvider(AIProvider):
-    def __init__(self):
+    """google.genai 비동기 클라이언트 기반 프로바이더 (클라이언트는 gemini_utils 와 공유)"""
+
+    def __init__(self, model: str = GEMINI_MODEL):
         if not GEMINI_API_KEY:
             raise ValueError("Gemini API 키가 설정되지 않았습니다.")
-        
-        genai.configure(api_key=GEMINI_API_KEY)
-        self.model = genai.GenerativeModel(GEMINI_MODEL)
+        self.model = model
+        self.name = f"gemini:{model}"
 
-    async def generate_response(self, prompt: str) -> str:
+    async def complete(self, prompt: str, temperature: float = 0.2, schema=None) -> str:
+        from app import gemini_utils
         try:
-            system_prompt = "당신은 노련한 선배 기자입니다. 다음 현장 상황에 대해 JSON 형식으로 응답해주세요."
-            full_prompt = f"{system_prompt}\n\n현장 상황: {prompt}"
-            
-            response = self.model.generate_content(full_prompt)
+            response = await gemini_utils.generate_content(prompt, "llm_call", model=self.model,
+                                                           temperature=temperature,
+                                                           **gemini_utils.json_output(schema))
+            if not response or not response.text:
+                raise ValueError("Gemini API가 빈 응답을 반환했습니다.")
             return response.text
         except Exception as e:
             raise Exception(f"Gemini API 오류: {str(e)}")
 
-def get_ai_provider() -> AIProvider:
-    """AI 프로바이더 팩토리 함수"""
+class OpenAIProvider(AIProvider):
+    """비동기 OpenAI 클라이언트 기반 프로바이더 (공유 커넥션 풀 사용)"""
+
+    name = "openai"
+
+    def __init__(self):
+        from app import openai_utils
+        if openai_utils.client is None:
+            raise ValueError("OpenAI API 키가 설정되지 않았습니다.")
+        self._openai = openai_utils
+
+    async def complete(self, prompt: str, temperature: float = 0.2, schema=None) -> str:
+        try:
+            return await self._openai.complete(prompt, temperature=temperature, json_mode=schema is not None)
+        except Exception as e:
+            raise Exception(f"OpenAI API 오류: {str(e)}")
+
+    async def generate_response(self, prompt: str) -> str:
+        try:
+            return await self._openai.complete(f"현장 상황: {prompt}", system=SYSTEM_PROMPT)
+        except Exception as e:
+            raise Exception(f"OpenAI API 오류: {str(e)}")
+
+class LatencyTracker:
+    """최근 호출의 지연 시간(초) 표본
+
+    헤지에서 져서 취소된 호출은 실제 지연이 취소 시점까지의 시간보다 길다는 것만 알 수 있으므로
+    그 시간을 중도 절단(censored) 표본으로 넣는다 (빼 버리면 느린 호출만 빠져 분포가 짧게 치우친다).
+    """
+
+    def __init__(self, window: int = 200):
+        self.samples = deque(maxlen=window)
+        self.calls = 0
+        self.errors = 0
+        self.censored = 0
+
+    def record(self, seconds: float, censored: bool = False):
+        self.samples.append(seconds)
+        if censored:
+            self.censored += 1
+
+    def percentile(self, p: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+        return ordered[idx]
+
+    def stats(self) -> dict:
+        def ms(value):
+            return round(value * 1000, 1) if value is not None else None
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "censored": self.censored,
+            "samples": len(self.samples),
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+        }
+
+class HedgedRouter(AIProvider):
+    """기본 프로바이더가 지연 임계값 안에 응답하지 않으면 백업 프로바이더에도 요청을 보내고,
+    먼저 온 유효한 응답을 쓰고 나머지는 취소한다.
+
+    지연 임계값은 기본 프로바이더의 최근 지연 분포(AI_HEDGE_PERCENTILE 백분위)로 정한다.
+    """
+
+    def __init__(self, primary: AIProvider, backups: List[AIProvider] = None):
+        self.primary = primary
+        self.backups = backups or []
+        self.name = f"hedged:{primary.name}"
+        self.latency: Dict[str, LatencyTracker] = {
+            p.name: LatencyTracker() for p in [primary] + self.backups
+        }
+        self.hedges = 0
+        self.wins: Dict[str, int] = {p.name: 0 for p in [primary] + self.backups}
+
+    def hedge_delay(self) -> float:
+        tracker = self.latency[self.primary.name]
+        if len(tracker.samples) < AI_HEDGE_MIN_SAMPLES:
+            return AI_HEDGE_DEFAULT_DELAY
+        delay = tracker.percentile(AI_HEDGE_PERCENTILE)
+        return min(AI_HEDGE_MAX_DELAY, max(AI_HEDGE_MIN_DELAY, delay))
+
+    async def _call(self, provider: AIProvider, prompt: str, temperature: float, parse: Optional[Callable], schema):
+        tracker = self.latency[provider.name]
+        tracker.calls += 1
+        started = time.perf_counter()
+        try:
+            text = await provider.complete(prompt, temperature=temperature, schema=schema)
+            result = parse(text) if parse else text
+        except asyncio.CancelledError:
+            tracker.record(time.perf_counter() - started, censored=True)
+            raise
+        except Exception:
+            tracker.errors += 1
+            raise
+        tracker.record(time.perf_counter() - started)
+        return result
+
+    async def complete(self, prompt: str, temperature: float = 0.2, parse: Optional[Callable] = None, schema=None):
+        """parse 가 있으면 parse(text) 결과를, 없으면 텍스트를 반환 (parse 에서 예외가 나면 유효하지 않은 응답)"""
+        result, _ = await self.complete_with_provider(prompt, temperature, parse, schema)
+        return result
+
+    async def complete_with_provider(self, prompt: str, temperature: float = 0.2, parse: Optional[Callable] = None,
+                                     schema=None) -> Tuple[object, str]:
+        """complete 와 같고, 응답한 프로바이더 이름을 함께 반환"""
+        if not self.backups:
+            result = await self._call(self.primary, prompt, temperature, parse, schema)
+            self.wins[self.primary.name] += 1
+            return result, self.primary.name
+
+        waiting = list(self.backups)
+        tasks: Dict[asyncio.Task, AIProvider] = {}
+
+        def launch(provider: AIProvider):
+            tasks[asyncio.create_task(self._call(provider, prompt, temperature, parse, schema))] = provider
+
+        launch(self.primary)
+        delay = self.hedge_delay()
+        errors = []
+        try:
+            while tasks:
+                done, _ = await asyncio.wait(
+                    tasks.keys(),
+                    timeout=delay if waiting else None,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if not done:
+                    # 임계값 안에 응답이 없으면 다음 백업 투입
+                    self.hedges += 1
+                    logger.info(f"헤지 요청 시작: {waiting[0].name} (지연 {delay:.2f}s 초과)")
+                    launch(waiting.pop(0))
+                    continue
+                for task in done:
+                    provider = tasks.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        errors.append(f"{provider.name}: {e}")
+                        continue
+                    self.wins[provider.name] += 1
+                    return result, provider.name
+                # 실패한 요청이 있으면 기다리지 않고 다음 백업 투입
+                if waiting and not tasks:
+                    launch(waiting.pop(0))
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        raise Exception("; ".join(errors))
+
+    def stats(self) -> dict:
+        return {
+            "primary": self.primary.name,
+            "backups": [p.name for p in self.backups],
+            "hedge_delay_ms": round(self.hedge_delay() * 1000, 1),
+            "hedges": self.hedges,
+            "wins": self.wins,
+            "latency": {name: tracker.stats() for name, tracker in self.latency.items()},
+        }
+
+def get_ai_provider(name: str = None) -> AIProvider:
+    """AI 프로바이더 팩토리 함수 (name 이 없으면 AI_PROVIDER 설정 사용)
+
+    - "gemini" 또는 "gemini:<모델명>"
+    - "openai"
+    """
+    name = (name or AI_PROVIDER).strip()
     try:
-        return GeminiProvider()
+        kind, _, model = name.partition(":")
+        if kind.lower() == "gemini":
+            return GeminiProvider(model or GEMINI_MODEL)
+        if kind.lower() == "openai":
+            return OpenAIProvider()
     except Exception as e:
-        raise Exception(f"AI 프로바이더 초기화 오류: {str(e)}") 
\ No newline at end of file
+        raise Exception(f"AI 프로바이더 초기화 오류: {str(e)}")
+    raise Exception(f"AI 프로바이더 초기화 오류: 지원하지 않는 프로바이더입니다: {name}")
+
+_router: Optional[HedgedRouter] = None
+
+def get_router() -> HedgedRouter:
+    """기본 프로바이더 + AI_HEDGE_BACKUP 백업 프로바이더로 구성한 헤지 라우터 (프로세스당 하나)"""
+    global _router
+    if _router is None:
+        backups = []
+        for backup_name in filter(None, (n.strip() for n in AI_HEDGE_BACKUP.split(","))):
+            try:
+                backups.append(get_ai_provider(backup_name))
+            except Exception as e:
+                logger.error(f"백업 프로바이더 초기화 실패 ({backup_name}): {e}")
+        _router = HedgedRouter(get_ai_provider(), backups)
+    return _router
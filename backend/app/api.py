@@ -1,5 +1,6 @@
-from fastapi import APIRouter, HTTPException, status
-from fastapi.responses import JSONResponse
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
 from app.models import (
     SituationRequest, 
     DirectorResponse,
@@ -7,13 +8,45 @@ from app.models import (
     ErrorResponse,
     TopicRequest,
     PerspectiveRequest,
+    PerspectiveBatchRequest,
+    PerspectiveBatchResponse,
     NewsSearchResponse,
     NewsAnalyzeRequest,
-    NewsAnalyzeResponse
+    NewsAnalyzeResponse,
+    ArticleAnalysis,
+    StatisticsResponse,
+    SimilarCaseRequest,
+    SimilarCase,
+    IngestRequest,
+    IngestResponse
 )
-from app.gemini_utils import get_directing, get_perspective, search_naver_news, analyze_article_with_gemini
+from app.gemini_utils import (
+    get_directing,
+    stream_directing,
+    get_perspective,
+    get_perspectives,
+    search_naver_news,
+    analyze_article_with_gemini,
+    summarize_articles_with_gemini,
+    research_news
+)
+from app.response_cache import get_response_cache
+from app.search_cache import get_search_cache
+from app.data_utils import get_statistics, search_semantic_cases
+from app.segments import get_segment_store
+from app.ai_providers import get_router
+from app import singleflight
+from app import llm_scheduler
+from app.metrics import time_stage
+from app.deadline import (
+    Deadline, request_deadline, cancel_on_disconnect, deadline_exceeded, note_partial, note_disconnect
+)
+from app.config import ADMIN_TOKEN, NEWS_SEARCH_TIMEOUT, NEWS_ANALYZE_TIMEOUT, NEWS_RESEARCH_TIMEOUT, NEWS_SUMMARY_MIN_SECONDS
+from contextlib import aclosing
+import asyncio
+import hmac
+import json
 import logging
-from google import genai
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -55,6 +88,36 @@ async def direct(request: SituationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+def sse_event(event: str, data) -> str:
+    """Server-Sent Events 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/direct/stream",
+    summary="AI 취재 디렉팅 (스트리밍)",
+    description="""디렉팅 결과를 Server-Sent Events 로 스트리밍합니다.
+    `issues`, `questions`, `angles` 등 각 필드가 완성되는 즉시 `field` 이벤트({"name", "value"})로 보내고,
+    마지막에 검증된 전체 결과를 `done` 이벤트로, 실패 시 `error` 이벤트를 보냅니다.""",
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+    })
+async def direct_stream(request: SituationRequest):
+    async def events():
+        try:
+            async for name, value in stream_directing(request.situation):
+                if name == "done":
+                    yield sse_event("done", DirectorResponse(**value).model_dump())
+                else:
+                    yield sse_event("field", {"name": name, "value": value})
+        except Exception as e:
+            logger.error(f"디렉팅 스트리밍 오류: {str(e)}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # 1단계: 네이버 뉴스 유사 기사 검색
 @router.post("/news-search",
     summary="네이버 뉴스 유사 기사 검색 결과 반환",
@@ -64,7 +127,13 @@ async def direct(request: SituationRequest):
         400: {"model": ErrorResponse, "description": "잘못된 요청"},
         500: {"model": ErrorResponse, "description": "서버 오류"}
     })
-async def news_search(request: TopicRequest):
+async def news_search(request: TopicRequest, http_request: Request):
+    """
+    네이버 뉴스 유사 기사 검색
+
+    - 처리 시간 예산은 `X-Request-Timeout` 헤더(초)로 바꿀 수 있고, 넘기면 504
+    - 클라이언트가 연결을 끊으면 검색을 취소합니다
+    """
     try:
         logger.info(f"네이버 뉴스 검색 요청: {request.topic}")
         if not request.topic:
@@ -72,8 +141,16 @@ async def news_search(request: TopicRequest):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="검색할 주제를 입력해주세요."
             )
-        result_text = await search_naver_news(request.topic, max_results=3)
-        return NewsSearchResponse(news_articles=result_text)
+        deadline = request_deadline(http_request, NEWS_SEARCH_TIMEOUT)
+        try:
+            result_text = await cancel_on_disconnect(
+                http_request, search_naver_news(request.topic, max_results=3, deadline=deadline), "news_search")
+        except TimeoutError:
+            raise deadline_exceeded("news_search", f"뉴스 검색이 {deadline.budget:g}초 안에 끝나지 않았습니다.")
+        with time_stage("response_build"):
+            return NewsSearchResponse(news_articles=result_text)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"네이버 뉴스 검색 오류: {str(e)}")
         raise HTTPException(
@@ -84,13 +161,13 @@ async def news_search(request: TopicRequest):
 # 2단계: Gemini 기사 분석
 @router.post("/news-analyze",
     summary="네이버 뉴스 기사 Gemini 분석 결과 반환",
-    description="네이버 뉴스 기사 원문 텍스트를 받아 Gemini로 기사별 분석 및 종합 분석 결과를 반환합니다.",
+    description="네이버 뉴스 기사 원문 텍스트를 받아 Gemini로 기사별 분석 및 종합 분석 결과를 반환합니다. 처리 시간 예산(`X-Request-Timeout` 헤더)을 넘기면 끝난 기사 분석만 `partial: true` 로 반환합니다.",
     response_model=NewsAnalyzeResponse,
     responses={
         400: {"model": ErrorResponse, "description": "잘못된 요청"},
         500: {"model": ErrorResponse, "description": "서버 오류"}
     })
-async def news_analyze(request: NewsAnalyzeRequest):
+async def news_analyze(request: NewsAnalyzeRequest, http_request: Request):
     try:
         logger.info("Gemini 기사 분석 요청")
         if not request.news_articles:
@@ -98,43 +175,102 @@ async def news_analyze(request: NewsAnalyzeRequest):
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="기사 원문 텍스트를 입력해주세요."
             )
-        analysis_result = await analyze_article_with_gemini(request.news_articles)
-        article_analyses = []
+        deadline = request_deadline(http_request, NEWS_ANALYZE_TIMEOUT)
+        return await cancel_on_disconnect(
+            http_request, analyze_news(request.news_articles, deadline), "news_analyze")
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Gemini 기사 분석 오류: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(e)
+        )
+
+async def analyze_news(news_articles: str, deadline: Deadline) -> NewsAnalyzeResponse:
+    """기사별 분석 + 종합 분석 (마감 시간이 지나면 끝난 부분까지만)"""
+    analysis_result = await analyze_article_with_gemini(news_articles, deadline=deadline)
+    partial = analysis_result.get("partial", False)
+    article_analyses = []
+    with time_stage("response_build"):
         for idx, item in enumerate(analysis_result.get("analyses", [])):
             article_analyses.append({
-                "article_index": idx,
+                "article_index": item.get("article_index", idx),
                 "title": item.get("title", ""),
                 "angles": item.get("angles", []),
                 "issues": item.get("issues", []),
                 "framing": item.get("framing", None),
-                "implications": item.get("implications", [])
+                "implications": item.get("implications", []),
+                "duplicates": item.get("duplicates", [])
             })
-        # 종합 분석
-        summary = ""
-        if article_analyses:
-            summary_prompt = f"아래는 여러 유사 기사에 대한 분석 결과입니다. 반복적으로 등장하는 쟁점, 공통된 프레임, 사회적 시사점, 차이점 등을 종합적으로 요약해줘.\n{article_analyses}"
-            try:
-                from app.gemini_utils import client
-                response = await client.aio.models.generate_content(
-                    model="gemini-2.5-flash",
-                    contents=summary_prompt,
-                    config=genai.types.GenerateContentConfig(
-                        temperature=0.2,
-                    ),
-                )
-                summary = response.text.strip()
-            except Exception as e:
-                summary = f"종합 분석 오류: {e}"
-        return NewsAnalyzeResponse(
-            article_analyses=article_analyses,
-            summary=summary
-        )
-    except Exception as e:
-        logger.error(f"Gemini 기사 분석 오류: {str(e)}")
+    # 종합 분석 (남은 시간이 너무 짧으면 건너뛴다)
+    summary = ""
+    if article_analyses and deadline.remaining() < NEWS_SUMMARY_MIN_SECONDS:
+        partial = True
+    elif article_analyses:
+        try:
+            async with deadline.timeout():
+                summary = await summarize_articles_with_gemini(analysis_result.get("articles", []),
+                                                               article_analyses)
+        except TimeoutError:
+            partial = True
+    if partial:
+        note_partial("news_analyze")
+    return NewsAnalyzeResponse(
+        article_analyses=article_analyses,
+        summary=summary,
+        partial=partial
+    )
+
+# 1+2단계 한 번에: 검색 응답에서 기사가 완성되는 대로 분석해 스트리밍
+@router.post("/news-research",
+    summary="네이버 뉴스 검색 + 기사 분석 (스트리밍)",
+    description="""주제로 네이버 뉴스를 검색하고, 검색 응답에서 기사가 하나 완성될 때마다 바로 분석을 시작해
+    결과를 Server-Sent Events 로 보냅니다. `/news-search` 결과를 `/news-analyze` 로 다시 올리는 왕복이 없습니다.
+    `article`({"article_index", "title", "duplicate_of"}) -> `analysis`(기사별 분석, 끝나는 순서대로) -> `summary`({"summary"})
+    -> `done`({"articles", "partial"}) 순서이며, 실패 시 `error`({"detail"}) 이벤트를 보냅니다.
+    앞서 나온 기사와 거의 같은 기사(통신사 기사 전재 등)는 분석하지 않고 `duplicate_of` 에 그 기사 번호를 적습니다.
+    처리 시간 예산(`X-Request-Timeout` 헤더)을 넘기면 끝난 기사 분석까지만 보내고 `partial: true` 로 끝냅니다.""",
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse, "description": "잘못된 요청"},
+    })
+async def news_research(request: TopicRequest, http_request: Request):
+    logger.info(f"뉴스 리서치 요청: {request.topic}")
+    if not request.topic:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=str(e)
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="검색할 주제를 입력해주세요."
         )
+    deadline = request_deadline(http_request, NEWS_RESEARCH_TIMEOUT)
+
+    async def events():
+        try:
+            async with aclosing(research_news(request.topic, deadline)) as stream:
+                async for event, data in stream:
+                    if event == "analysis":
+                        data = ArticleAnalysis(**data).model_dump()
+                    elif event == "summary":
+                        data = {"summary": data}
+                    elif event == "done" and data["partial"]:
+                        note_partial("news_research")
+                    yield sse_event(event, data)
+        except asyncio.CancelledError:
+            # 클라이언트가 연결을 끊으면 스트리밍 태스크가 취소되고 남은 검색/분석 태스크도 정리된다
+            note_disconnect("news_research")
+            raise
+        except TimeoutError:
+            error = deadline_exceeded("news_research", f"뉴스 검색이 {deadline.budget:g}초 안에 끝나지 않았습니다.")
+            yield sse_event("error", {"detail": error.detail})
+        except Exception as e:
+            logger.error(f"뉴스 리서치 오류: {str(e)}")
+            yield sse_event("error", {"detail": str(e)})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.post("/perspective",
     summary="관점 확장 분석",
@@ -173,6 +309,190 @@ async def perspective(request: PerspectiveRequest):
             detail=f"관점 확장 처리 중 오류가 발생했습니다: {str(e)}"
         )
 
+@router.post("/perspectives",
+    summary="여러 관점 동시 분석",
+    description="여러 관점을 동시에 분석해 하나의 결과로 합쳐 반환합니다. 관점별 소요 시간과 오류도 함께 반환합니다.",
+    response_model=PerspectiveBatchResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "잘못된 요청"},
+        500: {"model": ErrorResponse, "description": "서버 오류"}
+    })
+async def perspectives(request: PerspectiveBatchRequest):
+    """
+    여러 관점 동시 분석
+
+    - **situation**: 분석할 현장 상황
+    - **perspectives**: 분석할 관점 목록 (예: `/examples`의 perspectives)
+    """
+    if not request.situation or len(request.situation.strip()) < 5:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="상황 설명을 입력해주세요."
+        )
+    if not any(p and p.strip() for p in request.perspectives):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="분석할 관점을 하나 이상 입력해주세요."
+        )
+
+    logger.info(f"여러 관점 분석 요청: {len(request.perspectives)}개 관점")
+    response = await get_perspectives(request.situation, request.perspectives)
+    if not response["perspectives"]:
+        errors = "; ".join(f"{r['perspective']}: {r['error']}" for r in response["results"])
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"관점 확장 처리 중 오류가 발생했습니다: {errors}"
+        )
+    return response
+
+# 기사 통계 조회
+@router.get("/statistics",
+    summary="기사 통계",
+    description="미리 집계한 통계 큐브에서 카테고리/기간별 기사 수를 카테고리별, 월별, 지역 키워드별, 키워드 사전 카테고리별로 반환합니다.",
+    response_model=StatisticsResponse,
+    responses={
+        400: {"model": ErrorResponse, "description": "잘못된 요청"}
+    })
+async def statistics(category: Optional[str] = None, start: Optional[str] = None, end: Optional[str] = None):
+    """
+    기사 통계
+
+    - **category**: 카테고리 (예: accident, law)
+    - **start** / **end**: 기간 (YYYY-MM, 양끝 포함)
+    """
+    try:
+        return await asyncio.to_thread(get_statistics, category, start, end)
+    except (KeyError, ValueError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e.args[0])
+        )
+
+# 의미 기반 유사 사건 검색
+@router.post("/similar-cases",
+    summary="유사 사건 검색",
+    description="로컬 임베딩 벡터 색인에서 상황 설명과 의미가 가까운 과거 기사를 코사인 유사도 순으로 반환합니다.",
+    response_model=List[SimilarCase],
+    responses={
+        400: {"model": ErrorResponse, "description": "잘못된 요청"},
+        500: {"model": ErrorResponse, "description": "서버 오류"}
+    })
+async def similar_cases(request: SimilarCaseRequest):
+    """
+    유사 사건 검색
+
+    - **situation**: 현장 상황 설명
+    - **limit**: 반환할 사건 수 (1~20)
+    """
+    if not request.situation or len(request.situation.strip()) < 5:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="상황 설명을 입력해주세요."
+        )
+    try:
+        return await asyncio.to_thread(search_semantic_cases, request.situation, request.limit)
+    except Exception as e:
+        logger.error(f"유사 사건 검색 오류: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"유사 사건 검색 중 오류가 발생했습니다: {str(e)}"
+        )
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """관리용 엔드포인트: X-Admin-Token 헤더가 ADMIN_TOKEN 과 같아야 한다 (설정하지 않았으면 막는다)"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="ADMIN_TOKEN 이 설정되지 않아 관리 기능을 쓸 수 없습니다.")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="관리자 토큰이 올바르지 않습니다.")
+
+# 새 기사 추가 (델타 세그먼트)
+@router.post("/ingest",
+    summary="기사 추가",
+    description="새 기사를 델타 세그먼트로 추가하고 그 기사들만 색인합니다. 유사 사건 검색에 바로 반영되며, 세그먼트가 많아지면 백그라운드에서 병합합니다. `X-Admin-Token` 헤더가 필요합니다.",
+    response_model=IngestResponse,
+    dependencies=[Depends(require_admin)],
+    responses={
+        400: {"model": ErrorResponse, "description": "잘못된 요청"},
+        401: {"model": ErrorResponse, "description": "관리자 토큰 불일치"},
+        403: {"model": ErrorResponse, "description": "ADMIN_TOKEN 미설정"}
+    })
+async def ingest(request: IngestRequest):
+    """
+    기사 추가
+
+    - **articles**: category(예: accident), date, title, body_prep 목록
+    """
+    try:
+        articles = [article.model_dump() for article in request.articles]
+        return await asyncio.to_thread(get_segment_store().ingest, articles)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+@router.get("/segments/stats",
+    summary="추가 세그먼트 상태",
+    description="활성 델타 세그먼트 수, 기사 수, 병합 진행 여부를 반환합니다.",
+    response_model=dict)
+async def segment_stats():
+    return await asyncio.to_thread(get_segment_store().stats)
+
+# AI 프로바이더 라우팅 상태 조회
+@router.get("/providers/stats",
+    summary="AI 프로바이더 지연/헤지 통계",
+    description="프로바이더별 호출 수, 오류 수, 지연 백분위와 헤지 요청 횟수를 반환합니다.",
+    response_model=dict)
+async def provider_stats():
+    return get_router().stats()
+
+# 외부 LLM 호출 스케줄러 상태
+@router.get("/scheduler/stats",
+    summary="LLM 호출 스케줄러 상태",
+    description="프로바이더별 진행 중 호출 수, 우선순위별 대기 수, 429 횟수, 버킷 잔량을 반환합니다.",
+    response_model=dict)
+async def scheduler_stats():
+    return llm_scheduler.stats()
+
+# 동일 요청 합치기 통계
+@router.get("/singleflight/stats",
+    summary="동일 요청 합치기 통계",
+    description="동시에 들어온 같은 LLM/검색 요청을 하나로 합친 횟수를 그룹별로 반환합니다.",
+    response_model=dict)
+async def singleflight_stats():
+    return singleflight.all_stats()
+
+# 응답 캐시 상태 조회
+@router.get("/cache/stats",
+    summary="응답 캐시 상태",
+    description="디렉팅/관점 확장 응답 캐시의 적중/미스 카운터와 크기를 반환합니다.",
+    response_model=dict)
+async def cache_stats():
+    return get_response_cache().stats()
+
+@router.get("/search-cache/stats",
+    summary="뉴스 검색 캐시 상태",
+    description="네이버 뉴스 검색 결과 캐시의 적중(신선/오래됨)/미스/백그라운드 갱신 카운터와 크기를 반환합니다.",
+    response_model=dict)
+async def search_cache_stats():
+    return get_search_cache().stats()
+
+# 응답 캐시 무효화
+@router.delete("/cache",
+    summary="응답 캐시 무효화",
+    description="응답 캐시와 뉴스 검색 캐시를 비웁니다. kind(directing, perspective, search)를 지정하면 해당 종류만 비웁니다. `X-Admin-Token` 헤더가 필요합니다.",
+    response_model=dict,
+    dependencies=[Depends(require_admin)])
+async def invalidate_cache(kind: Optional[str] = None):
+    if kind == "search":
+        removed = get_search_cache().invalidate()
+    else:
+        removed = await get_response_cache().invalidate(kind)
+        if not kind:
+            removed += get_search_cache().invalidate()
+    logger.info(f"응답 캐시 무효화: kind={kind}, {removed}건")
+    return {"removed": removed, "kind": kind}
+
 # 예시 데이터 조회 엔드포인트
 @router.get("/examples",
     summary="예시 상황들",
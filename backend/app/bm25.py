@@ -0,0 +1,264 @@
+# 유사 사건 BM25 순위 검색
+#
+# title / body_prep 를 어절 단위 문자 2, 3-gram 으로 나눠(조사가 붙은 한국어 어절도 어간 n-gram 이 맞도록)
+# 문서별 BM25 단어 가중치(tf 정규화까지 적용한 값)를 용어 x 문서 희소 행렬(CSR)로 미리 계산해 둔다.
+# IDF 는 문서 빈도(df)만 저장해 두고 질의 벡터 쪽에 곱하므로,
+# 검색은 질의 벡터(1 x 용어) 와 행렬(용어 x 문서)의 희소 곱 한 번 + 상위 k 선택이다.
+#
+# 행렬과 배열은 .npy 로 저장해 np.load(mmap_mode="r") 로 열므로 워커끼리 페이지 캐시를 공유한다.
+#
+# 오프라인 빌드: python -m app.bm25
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.config import BM25_INDEX_DIR, BM25_K1, BM25_B, NEAR_DUP_OVERFETCH
+from app.corpus import Corpus, get_corpus, manifest_key
+from app.near_dup import unique_hits
+
+logger = logging.getLogger(__name__)
+
+BM25_VERSION = 1
+NGRAM_SIZES = (2, 3)
+TITLE_WEIGHT = 2  # 제목에 나온 n-gram 은 본문보다 두 배로 센다
+
+
+def tokenize(text: str, sizes=NGRAM_SIZES) -> Counter:
+    """어절별 문자 n-gram 빈도 (n 보다 짧은 어절은 어절 그대로)"""
+    grams = Counter()
+    for word in text.lower().split():
+        if len(word) < sizes[0]:
+            grams[word] += 1
+            continue
+        for n in sizes:
+            for i in range(len(word) - n + 1):
+                grams[word[i:i + n]] += 1
+    return grams
+
+
+def document_terms(title: str, body: str) -> Counter:
+    grams = tokenize(body)
+    for gram, count in tokenize(title).items():
+        grams[gram] += count * TITLE_WEIGHT
+    return grams
+
+
+def idf(df: np.ndarray, n_docs: int) -> np.ndarray:
+    """BM25 IDF (항상 양수가 되는 Lucene 식)"""
+    return np.log1p((n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+
+
+def build_term_matrix(docs, vocab: Dict[str, int], k1: float = BM25_K1, b: float = BM25_B):
+    """(title, body) 목록 -> (용어 x 문서 BM25 가중치 CSR, 문서 빈도, 문서 길이)
+
+    vocab 에 없는 용어는 새 번호를 붙여 vocab 에 추가한다.
+    """
+    from scipy import sparse
+
+    indptr, indices, tfs, lengths = [0], [], [], []
+    for title, body in docs:
+        grams = document_terms(title, body)
+        for gram, tf in grams.items():
+            indices.append(vocab.setdefault(gram, len(vocab)))
+            tfs.append(tf)
+        indptr.append(len(indices))
+        lengths.append(sum(grams.values()))
+
+    n_docs = len(lengths)
+    indices = np.asarray(indices, dtype=np.int32)
+    tfs = np.asarray(tfs, dtype=np.float32)
+    lengths = np.asarray(lengths, dtype=np.float32)
+    avgdl = float(lengths.mean()) if n_docs else 0.0
+
+    # 문서 길이로 정규화한 tf 포화값: tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avgdl))
+    doc_of_entry = np.repeat(np.arange(n_docs), np.diff(indptr))
+    norm = k1 * (1 - b + b * lengths[doc_of_entry] / avgdl) if n_docs else np.zeros(0, dtype=np.float32)
+    weights = (tfs * (k1 + 1) / (tfs + norm)).astype(np.float32)
+
+    doc_term = sparse.csr_matrix((weights, indices, np.asarray(indptr, dtype=np.int64)),
+                                 shape=(n_docs, len(vocab)))
+    term_doc = doc_term.T.tocsr()
+    df = np.bincount(indices, minlength=len(vocab)).astype(np.int32)
+    return term_doc, df, lengths
+
+
+class BM25Index:
+    """용어 x 문서 BM25 가중치 행렬 + 코퍼스 행 번호"""
+
+    def __init__(self, corpus: Corpus, vocab: Dict[str, int], term_doc, df: np.ndarray,
+                 rows: np.ndarray, key: str):
+        self.corpus = corpus
+        self.vocab = vocab        # n-gram -> 행렬 행 번호
+        self.term_doc = term_doc  # 용어 x 문서 (CSR)
+        self.df = df              # 용어별 문서 빈도
+        self.rows = rows          # 문서 번호 -> 코퍼스 행 번호
+        self.key = key            # 코퍼스 지문 (코퍼스가 바뀌면 다시 빌드)
+        self.idf = idf(df, len(rows))
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, corpus: Corpus = None) -> "BM25Index":
+        corpus = corpus or get_corpus()
+        rows = corpus.rows_with("title", "body_prep").astype(np.int32)
+        titles, bodies = corpus.column("title"), corpus.column("body_prep")
+        vocab: Dict[str, int] = {}
+        term_doc, df, _ = build_term_matrix(((titles[row], bodies[row]) for row in rows), vocab)
+        logger.info(f"BM25 색인 생성: 문서 {len(rows)}건, 용어 {len(vocab)}개, 가중치 {term_doc.nnz}개")
+        return cls(corpus, vocab, term_doc, df, rows, manifest_key(corpus.manifest))
+
+    def save(self, root: str = BM25_INDEX_DIR):
+        os.makedirs(root, exist_ok=True)
+        target = os.path.join(root, self.key)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{self.key}.", dir=root)
+        try:
+            np.save(os.path.join(tmp_dir, "data.npy"), self.term_doc.data.astype(np.float32))
+            np.save(os.path.join(tmp_dir, "indices.npy"), self.term_doc.indices.astype(np.int32))
+            np.save(os.path.join(tmp_dir, "indptr.npy"), self.term_doc.indptr.astype(np.int64))
+            np.save(os.path.join(tmp_dir, "df.npy"), self.df)
+            np.save(os.path.join(tmp_dir, "rows.npy"), self.rows)
+            vocab = sorted(self.vocab, key=self.vocab.get)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"version": BM25_VERSION, "vocab": vocab}, f, ensure_ascii=False)
+            if os.path.exists(target):
+                shutil.rmtree(target, ignore_errors=True)
+            os.rename(tmp_dir, target)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        for name in os.listdir(root):
+            if name != self.key and not name.startswith("."):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    @classmethod
+    def load(cls, corpus: Corpus = None, root: str = BM25_INDEX_DIR) -> Optional["BM25Index"]:
+        """코퍼스에 맞는 색인이 저장되어 있으면 연다 (없으면 None)"""
+        from scipy import sparse
+
+        corpus = corpus or get_corpus()
+        key = manifest_key(corpus.manifest)
+        path = os.path.join(root, key)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != BM25_VERSION:
+                return None
+
+            def array(name):
+                return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+            vocab = {gram: i for i, gram in enumerate(meta["vocab"])}
+            rows = array("rows")
+            term_doc = sparse.csr_matrix((array("data"), array("indices"), array("indptr")),
+                                         shape=(len(vocab), len(rows)), copy=False)
+            return cls(corpus, vocab, term_doc, np.asarray(array("df")), rows, key)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"BM25 색인 로드 실패: {e}")
+            return None
+
+    def query_vector(self, text: str, idf_by_gram: Optional[Dict[str, float]] = None):
+        """질의 n-gram 에 IDF 를 실은 1 x 용어 희소 벡터 (색인에 없는 n-gram 은 버림)
+
+        idf_by_gram 을 주면 이 색인의 IDF 대신 그 값을 쓴다 (여러 세그먼트를 함께 검색할 때).
+        """
+        from scipy import sparse
+
+        grams = [gram for gram in tokenize(text) if gram in self.vocab]
+        if idf_by_gram is None:
+            weights = {self.vocab[gram]: self.idf[self.vocab[gram]] for gram in grams}
+        else:
+            weights = {self.vocab[gram]: idf_by_gram[gram] for gram in grams}
+        cols = sorted(weights)
+        values = np.asarray([weights[c] for c in cols], dtype=np.float32)
+        return sparse.csr_matrix((values, cols, [0, len(cols)]), shape=(1, len(self.vocab)), dtype=np.float32)
+
+    def scores(self, text: str, idf_by_gram: Optional[Dict[str, float]] = None) -> np.ndarray:
+        """문서별 BM25 점수"""
+        if not len(self.rows):
+            return np.zeros(0, dtype=np.float32)
+        return (self.query_vector(text, idf_by_gram) @ self.term_doc).toarray().ravel()
+
+    def top_k(self, text: str, k: int = 5, idf_by_gram: Optional[Dict[str, float]] = None) -> List[Tuple[int, float]]:
+        """점수 상위 k 개 (코퍼스 행 번호, 점수), 점수가 0 인 문서는 제외"""
+        scores = self.scores(text, idf_by_gram)
+        return [(int(self.rows[i]), float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def search(self, text: str, limit: int = 5) -> List[dict]:
+        """유사 사건 결과 (점수 내림차순, 점수 포함)"""
+        return search_indexes([self], text, limit)
+
+
+def search_indexes(indexes: List[BM25Index], text: str, limit: int = 5, signatures: list = None) -> List[dict]:
+    """여러 색인(기본 코퍼스 + 추가 세그먼트)을 함께 검색해 점수순으로 합친다
+
+    IDF 는 전체 세그먼트의 문서 빈도 합으로 다시 계산해 세그먼트 사이 점수를 맞춘다.
+    (tf 정규화의 평균 문서 길이는 세그먼트별 값이라 병합 전까지는 근사치)
+    signatures(색인별 CorpusSignatures)를 주면 앞쪽 결과와 거의 같은 기사는 뺀다.
+    """
+    n_docs = sum(len(index) for index in indexes)
+    df = Counter()
+    for index in indexes:
+        for gram in tokenize(text):
+            if gram in index.vocab:
+                df[gram] += int(index.df[index.vocab[gram]])
+    grams = list(df)
+    idf_by_gram = dict(zip(grams, idf(np.asarray([df[g] for g in grams], dtype=np.float64), n_docs).tolist()))
+
+    k = limit * NEAR_DUP_OVERFETCH if signatures else limit
+    hits = []
+    for i, index in enumerate(indexes):
+        hits.extend((score, i, row) for row, score in index.top_k(text, k, idf_by_gram))
+    hits.sort(key=lambda hit: -hit[0])
+    if signatures:
+        hits = unique_hits(hits, lambda hit: signatures[hit[1]][hit[2]], source="similar_cases")
+    return [{**indexes[i].corpus.case(row), 'score': round(score, 4)} for score, i, row in hits[:limit]]
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """점수 상위 k 개 위치 (내림차순, 0 점 제외) - 전체 정렬 대신 argpartition"""
+    positive = np.flatnonzero(scores > 0)
+    if len(positive) > k:
+        positive = positive[np.argpartition(scores[positive], -k)[-k:]]
+    # 동점이면 코퍼스 앞쪽 문서 먼저
+    return positive[np.lexsort((positive, -scores[positive]))]
+
+
+_index: Optional[BM25Index] = None
+_index_lock = threading.Lock()
+
+
+def get_bm25_index() -> BM25Index:
+    """BM25 색인 (코퍼스가 바뀌었으면 다시 빌드해 저장)"""
+    global _index
+    corpus = get_corpus()
+    if _index is not None and _index.corpus is corpus:
+        return _index
+    with _index_lock:
+        if _index is not None and _index.corpus is corpus:
+            return _index
+        index = BM25Index.load(corpus)
+        if index is None:
+            index = BM25Index.build(corpus)
+            try:
+                index.save()
+            except OSError as e:
+                logger.warning(f"BM25 색인 저장 실패: {e}")
+        _index = index
+        return _index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    index = BM25Index.build()
+    index.save()
+    print(f"BM25 색인 저장 완료: {BM25_INDEX_DIR} (문서 {len(index)}건, 용어 {len(index.vocab)}개)")
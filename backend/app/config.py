@@ -8,16 +8,166 @@ load_dotenv()
 
 # Gemini 설정
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-GEMINI_MODEL = "gemini-pro"
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
 
 def validate_config():
+    """필수 설정 검증 (앱 시작 시 lifespan 에서 실행)"""
     if not GEMINI_API_KEY:
         raise ValueError("Gemini API 키가 설정되지 않았습니다.")
 
-# 설정 검증 실행
-validate_config()
-
 # 모델 설정
 OPENAI_MODEL = "gpt-3.5-turbo"
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "data") 
\ No newline at end of file
+# OpenAI 설정 (AZURE_OPENAI_API_KEY 가 없으면 OPENAI_API_KEY 사용)
+AZURE_OPENAI_API_KEY = os.getenv("AZURE_OPENAI_API_KEY") or os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL")
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "60"))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5"))
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "2"))
+
+# 사용할 AI 프로바이더 (gemini / gemini:<모델명> / openai)
+AI_PROVIDER = os.getenv("AI_PROVIDER", "gemini")
+
+# 헤지 요청 설정: 기본 프로바이더가 지연 임계값 안에 응답하지 않으면 백업 프로바이더에도 요청
+# AI_HEDGE_BACKUP 예) "openai", "gemini:gemini-2.0-flash" (쉼표로 여러 개, 비어 있으면 헤지 안 함)
+AI_HEDGE_BACKUP = os.getenv("AI_HEDGE_BACKUP", "")
+AI_HEDGE_PERCENTILE = float(os.getenv("AI_HEDGE_PERCENTILE", "95"))
+AI_HEDGE_MIN_DELAY = float(os.getenv("AI_HEDGE_MIN_DELAY", "1.0"))
+AI_HEDGE_MAX_DELAY = float(os.getenv("AI_HEDGE_MAX_DELAY", "20.0"))
+AI_HEDGE_DEFAULT_DELAY = float(os.getenv("AI_HEDGE_DEFAULT_DELAY", "8.0"))
+AI_HEDGE_MIN_SAMPLES = int(os.getenv("AI_HEDGE_MIN_SAMPLES", "20"))
+
+DATA_DIR = os.getenv("DATA_DIR", os.path.join(os.path.dirname(os.path.dirname(__file__)), "..", "data"))
+
+# 카테고리별 기사 CSV 파일
+CSV_FILES = ['accident.csv', 'law.csv', 'health.csv', 'education.csv',
+             'welfare.csv', 'traffic.csv', 'region.csv', 'environment.csv']
+
+# 추가 키워드 사전 파일 (.json 또는 "카테고리<TAB>용어" 텍스트, 선택)
+KEYWORD_DICT_PATH = os.getenv("KEYWORD_DICT_PATH")
+
+# CSV 를 열 단위 메모리 맵 파일로 변환해 둘 위치 (python -m app.corpus)
+CORPUS_DIR = os.getenv(
+    "CORPUS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "corpus")
+)
+
+# 통계 집계 큐브 저장 위치와 지역별 집계에 쓸 지역 키워드 (쉼표 구분)
+STATS_CUBE_DIR = os.getenv(
+    "STATS_CUBE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "stats")
+)
+STATS_REGION_KEYWORDS = [r.strip() for r in os.getenv(
+    "STATS_REGION_KEYWORDS",
+    "서울,부산,대구,인천,광주,대전,울산,세종,경기,강원,충북,충남,전북,전남,경북,경남,제주"
+).split(",") if r.strip()]
+
+# 유사 사건 BM25 색인 저장 위치와 파라미터 (k1: tf 포화 정도, b: 문서 길이 정규화 정도)
+BM25_INDEX_DIR = os.getenv(
+    "BM25_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "bm25")
+)
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+
+# 유사 사건 의미 검색용 벡터 색인
+# EMBEDDING_MODEL: 로컬 sentence-transformers 모델 이름/경로 (비워 두면 해시 n-gram 임베딩)
+# EMBEDDING_DIM: 해시 임베딩 차원, VECTOR_NPROBE: 검색할 IVF 묶음 수 (클수록 정확하고 느림)
+VECTOR_INDEX_DIR = os.getenv(
+    "VECTOR_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "vectors")
+)
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "")
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "256"))
+VECTOR_NPROBE = int(os.getenv("VECTOR_NPROBE", "16"))
+
+# 거의 같은 기사 묶기 (MinHash + LSH), 코퍼스 서명 저장 위치
+# NEAR_DUP_THRESHOLD: 같은 기사로 볼 자카드 유사도 추정치, MINHASH_PERMUTATIONS 는 MINHASH_BANDS 의 배수
+MINHASH_DIR = os.getenv(
+    "MINHASH_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "minhash")
+)
+MINHASH_PERMUTATIONS = int(os.getenv("MINHASH_PERMUTATIONS", "64"))
+MINHASH_BANDS = int(os.getenv("MINHASH_BANDS", "16"))
+# 유사 사건 검색에서 거의 같은 기사를 빼고도 limit 건을 채우도록 색인마다 limit 의 몇 배를 가져올지
+NEAR_DUP_OVERFETCH = int(os.getenv("NEAR_DUP_OVERFETCH", "3"))
+NEAR_DUP_THRESHOLD = float(os.getenv("NEAR_DUP_THRESHOLD", "0.7"))
+
+# 새로 수집한 기사 세그먼트 저장 위치, 활성 세그먼트가 이 수를 넘으면 하나로 병합
+SEGMENTS_DIR = os.getenv(
+    "SEGMENTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "segments")
+)
+SEGMENT_MERGE_THRESHOLD = int(os.getenv("SEGMENT_MERGE_THRESHOLD", "8"))
+
+# 관리용 엔드포인트(/ingest, DELETE /cache)에 필요한 X-Admin-Token 헤더 값 (비워 두면 두 엔드포인트를 막는다)
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+# LLM 응답 캐시 설정 (메모리 LRU + SQLite)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+RESPONSE_CACHE_DB_PATH = os.getenv(
+    "RESPONSE_CACHE_DB_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(__file__)), ".cache", "response_cache.sqlite3")
+)
+RESPONSE_CACHE_TTL = float(os.getenv("RESPONSE_CACHE_TTL", str(6 * 60 * 60)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "512"))
+# 다른 워커의 캐시 무효화(SQLite 세대 번호)를 메모리 단에 반영하는 확인 주기 (초)
+RESPONSE_CACHE_GENERATION_CHECK = float(os.getenv("RESPONSE_CACHE_GENERATION_CHECK", "1"))
+
+# 네이버 뉴스 검색 결과 캐시 (초, TTL 이 지나도 STALE 초까지는 이전 결과를 주면서 백그라운드 갱신, TTL=0 이면 끔)
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", "300"))
+SEARCH_CACHE_STALE = float(os.getenv("SEARCH_CACHE_STALE", "1800"))
+SEARCH_CACHE_MAX_ENTRIES = int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", "256"))
+
+# 외부 LLM 호출 스케줄러 (llm_scheduler)
+# 프로바이더별 분당 요청 수 / 분당 토큰 수 한도 (0 이면 제한 없음), 전체 동시 호출 수, 대기열 길이
+# RPM/TPM 은 API 키 전체 한도이고 버킷은 프로세스마다 따로 있으므로 워커마다 LLM_WORKERS 로 나눠 쓴다.
+# 동시 호출 수와 대기열 길이는 워커 하나 기준이다.
+LLM_WORKERS = max(1, int(os.getenv("LLM_WORKERS", os.getenv("WEB_CONCURRENCY", "1"))))
+GEMINI_RPM = float(os.getenv("GEMINI_RPM", "300"))
+GEMINI_TPM = float(os.getenv("GEMINI_TPM", "1000000"))
+OPENAI_RPM = float(os.getenv("OPENAI_RPM", "300"))
+OPENAI_TPM = float(os.getenv("OPENAI_TPM", "200000"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_QUEUE_LIMIT = int(os.getenv("LLM_QUEUE_LIMIT", "200"))
+# 버킷이 한 번에 몰아 쓸 수 있는 양 (몇 초 분량까지 쌓아 두는지)
+LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "10"))
+# 429 응답 재시도 횟수와 지수 백오프 (초)
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "1.0"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "30.0"))
+
+# 요청 처리 시간 예산 (초, X-Request-Timeout 헤더로 REQUEST_TIMEOUT_MAX 까지 바꿀 수 있다)
+NEWS_SEARCH_TIMEOUT = float(os.getenv("NEWS_SEARCH_TIMEOUT", "45"))
+NEWS_ANALYZE_TIMEOUT = float(os.getenv("NEWS_ANALYZE_TIMEOUT", "60"))
+NEWS_RESEARCH_TIMEOUT = float(os.getenv("NEWS_RESEARCH_TIMEOUT", "90"))
+REQUEST_TIMEOUT_MAX = float(os.getenv("REQUEST_TIMEOUT_MAX", "180"))
+# 종합 분석 호출을 시작하려면 남아 있어야 하는 최소 시간 (초)
+NEWS_SUMMARY_MIN_SECONDS = float(os.getenv("NEWS_SUMMARY_MIN_SECONDS", "3"))
+
+# 종합 분석 프롬프트 토큰 예산과 기사 본문 발췌 길이 (자)
+SUMMARY_PROMPT_TOKEN_BUDGET = int(os.getenv("SUMMARY_PROMPT_TOKEN_BUDGET", "3000"))
+SUMMARY_SNIPPET_CHARS = int(os.getenv("SUMMARY_SNIPPET_CHARS", "300"))
+
+# 기사 분석 동시 실행 수 (기사별 Gemini 호출을 병렬로 보낼 최대 개수)
+NEWS_ANALYZE_CONCURRENCY = int(os.getenv("NEWS_ANALYZE_CONCURRENCY", "4"))
+
+# 여러 관점 동시 분석 시 동시 실행 수
+PERSPECTIVE_BATCH_CONCURRENCY = int(os.getenv("PERSPECTIVE_BATCH_CONCURRENCY", "3"))
+
+# 네이버 검색 MCP 서버 설정
+NAVER_CLIENT_ID = os.getenv("NAVER_CLIENT_ID", "N0_XnayYPesgOcTS3Ae9")
+NAVER_CLIENT_SECRET = os.getenv("NAVER_CLIENT_SECRET", "xDMaSTrByr")
+NAVER_MCP_COMMAND = os.getenv("NAVER_MCP_COMMAND", "npx")
+NAVER_MCP_ARGS = os.getenv("NAVER_MCP_ARGS", "-y @isnow890/naver-search-mcp").split()
+# MCP 서버 프로세스에 그대로 넘겨 줄 환경 변수 이름 (쉼표 구분, 예: 벤치마크의 FAKE_MCP_LATENCY)
+NAVER_MCP_PASS_ENV = [name.strip() for name in os.getenv("NAVER_MCP_PASS_ENV", "").split(",") if name.strip()]
+
+# MCP 세션 풀 설정 (동시에 띄울 수 있는 Node 프로세스 수 상한)
+NAVER_MCP_POOL_SIZE = int(os.getenv("NAVER_MCP_POOL_SIZE", "2"))
+NAVER_MCP_HEALTH_INTERVAL = float(os.getenv("NAVER_MCP_HEALTH_INTERVAL", "30"))
+NAVER_MCP_PING_TIMEOUT = float(os.getenv("NAVER_MCP_PING_TIMEOUT", "5"))
+# 세션을 빌리려고 기다리는 최대 시간 (초, 넘으면 TimeoutError)
+NAVER_MCP_ACQUIRE_TIMEOUT = float(os.getenv("NAVER_MCP_ACQUIRE_TIMEOUT", "30"))
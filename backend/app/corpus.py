@@ -0,0 +1,244 @@
+# 카테고리별 기사 CSV 를 열 단위 메모리 맵 파일로 변환해 두고 읽는 저장소
+#
+# 문자열 열은 UTF-8 바이트를 이어 붙인 data 배열과 행 경계를 담은 int64 offsets 배열(.npy)로 저장한다.
+# np.load(mmap_mode="r") 로 필요한 열만 열기 때문에 DataFrame 을 만들지 않고,
+# 여러 uvicorn 워커가 같은 파일을 열면 OS 페이지 캐시의 같은 페이지를 공유한다.
+#
+# 저장 위치는 CORPUS_DIR/<CSV 지문> 이고, 임시 디렉터리에 만든 뒤 rename 으로 교체하므로
+# 워커 여러 개가 동시에 빌드해도 반쯤 쓰인 파일을 읽지 않는다.
+#
+# 오프라인 변환: python -m app.corpus
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import DATA_DIR, CSV_FILES, CORPUS_DIR
+
+logger = logging.getLogger(__name__)
+
+CORPUS_VERSION = 1
+TEXT_COLUMNS = ("date", "title", "body_prep")
+
+
+def csv_manifest() -> Dict[str, tuple]:
+    """CSV 파일별 (mtime, size) - 변환 결과가 최신인지 확인하는 데 사용"""
+    manifest = {}
+    for csv_file in CSV_FILES:
+        file_path = os.path.join(DATA_DIR, csv_file)
+        if os.path.exists(file_path):
+            st = os.stat(file_path)
+            manifest[csv_file] = (st.st_mtime_ns, st.st_size)
+    return manifest
+
+
+def manifest_key(manifest: dict) -> str:
+    payload = json.dumps({"version": CORPUS_VERSION, "files": manifest}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class StringColumn:
+    """UTF-8 data + offsets 로 저장된 문자열 열 (행 단위로 필요할 때만 디코딩)"""
+
+    def __init__(self, data: np.ndarray, offsets: np.ndarray):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        # 행마다 memmap 슬라이스를 만들지 않도록 큰 덩어리로 읽어서 자른다
+        chunk_rows = 4096
+        for first in range(0, len(self), chunk_rows):
+            last = min(first + chunk_rows, len(self))
+            base = int(self.offsets[first])
+            blob = self.data[base:int(self.offsets[last])].tobytes()
+            bounds = self.offsets[first:last + 1] - base
+            for i in range(last - first):
+                yield blob[bounds[i]:bounds[i + 1]].decode("utf-8")
+
+
+def _write_string_column(directory: str, name: str, values: List[str]):
+    encoded = [v.encode("utf-8") for v in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+    np.save(os.path.join(directory, f"{name}.data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+
+
+def write_corpus(directory: str, columns: Dict[str, List[str]], source_ids: List[int],
+                 sources: List[dict], manifest: dict):
+    """열 파일 + source.npy + meta.json 쓰기 (meta.json 을 마지막에 쓴다)"""
+    for name in TEXT_COLUMNS:
+        _write_string_column(directory, name, columns[name])
+    np.save(os.path.join(directory, "source.npy"), np.asarray(source_ids, dtype=np.int16))
+    meta = {"version": CORPUS_VERSION, "manifest": manifest, "sources": sources, "rows": len(source_ids)}
+    with open(os.path.join(directory, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+
+
+class Corpus:
+    """열 단위 기사 저장소
+
+    - sources: CSV 파일별 {"file", "rows", "columns"} (CSV_FILES 순서)
+    - source_ids: 행별 sources 번호 (int16 memmap)
+    - column(name): date / title / body_prep 문자열 열 (처음 쓸 때 memmap 으로 연다)
+    """
+
+    def __init__(self, path: str, meta: dict):
+        self.path = path
+        self.manifest = {k: tuple(v) for k, v in meta["manifest"].items()}
+        self.sources: List[dict] = meta["sources"]
+        self.rows: int = meta["rows"]
+        self.source_ids = np.load(os.path.join(path, "source.npy"), mmap_mode="r")
+        self._columns: Dict[str, StringColumn] = {}
+
+    def __len__(self):
+        return self.rows
+
+    def column(self, name: str) -> StringColumn:
+        col = self._columns.get(name)
+        if col is None:
+            if name not in TEXT_COLUMNS:
+                raise KeyError(f"알 수 없는 열: {name}")
+            col = StringColumn(
+                np.load(os.path.join(self.path, f"{name}.data.npy"), mmap_mode="r"),
+                np.load(os.path.join(self.path, f"{name}.offsets.npy"), mmap_mode="r"),
+            )
+            self._columns[name] = col
+        return col
+
+    def source(self, row: int) -> str:
+        return self.sources[int(self.source_ids[row])]["file"]
+
+    def case(self, row: int) -> dict:
+        """유사 사건 결과 형식 (date/title/summary/source, 긴 제목과 본문은 자름)"""
+        title = self.column("title")[row]
+        body = self.column("body_prep")[row]
+        return {
+            'date': self.column("date")[row] or '날짜 불명',
+            'title': title[:100] + '...' if len(title) > 100 else title,
+            'summary': body[:200] + '...' if len(body) > 200 else body,
+            'source': self.source(row)
+        }
+
+    def has_columns(self, row: int, *names: str) -> bool:
+        """원본 CSV 에 해당 열들이 있었는지 (없던 열은 빈 문자열로 채워져 있다)"""
+        columns = self.sources[int(self.source_ids[row])]["columns"]
+        return all(name in columns for name in names)
+
+    def rows_with(self, *names: str) -> np.ndarray:
+        """원본 CSV 에 해당 열들이 모두 있던 행 번호"""
+        wanted = [i for i, s in enumerate(self.sources) if all(n in s["columns"] for n in names)]
+        return np.flatnonzero(np.isin(self.source_ids, wanted))
+
+    def count_by_source(self) -> Dict[str, int]:
+        return {s["file"]: s["rows"] for s in self.sources}
+
+    @classmethod
+    def build(cls, root: str = CORPUS_DIR) -> "Corpus":
+        """CSV 를 읽어 열 파일로 변환 (pandas 는 변환할 때만 사용)"""
+        import pandas as pd
+
+        manifest = csv_manifest()
+        key = manifest_key(manifest)
+        target = os.path.join(root, key)
+        os.makedirs(root, exist_ok=True)
+
+        sources, source_ids = [], []
+        columns = {name: [] for name in TEXT_COLUMNS}
+        for csv_file in CSV_FILES:
+            file_path = os.path.join(DATA_DIR, csv_file)
+            if not os.path.exists(file_path):
+                continue
+            try:
+                df = pd.read_csv(file_path, usecols=lambda c: c in TEXT_COLUMNS)
+            except Exception as e:
+                logger.error(f"Error reading {csv_file}: {e}")
+                continue
+            for name in TEXT_COLUMNS:
+                if name in df.columns:
+                    values = df[name].where(df[name].notna(), "").astype(str)
+                    columns[name].extend(values.tolist())
+                else:
+                    columns[name].extend([""] * len(df))
+            source_ids.extend([len(sources)] * len(df))
+            sources.append({"file": csv_file, "rows": len(df), "columns": list(df.columns)})
+
+        tmp_dir = tempfile.mkdtemp(prefix=f".{key}.", dir=root)
+        try:
+            write_corpus(tmp_dir, columns, source_ids, sources, manifest)
+            try:
+                os.rename(tmp_dir, target)
+            except OSError:
+                # 다른 워커가 먼저 같은 내용을 만들어 둔 경우
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        _remove_stale(root, keep=key)
+        logger.info(f"기사 코퍼스 변환: {len(source_ids)}행 -> {target}")
+        return cls.load(root)
+
+    @classmethod
+    def load(cls, root: str = CORPUS_DIR) -> Optional["Corpus"]:
+        """현재 CSV 에 맞는 변환 결과가 있으면 연다 (없으면 None)"""
+        return cls.open(os.path.join(root, manifest_key(csv_manifest())))
+
+    @classmethod
+    def open(cls, path: str) -> Optional["Corpus"]:
+        """write_corpus 로 만든 디렉터리를 연다 (없거나 버전이 다르면 None)"""
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != CORPUS_VERSION:
+                return None
+            return cls(path, meta)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"기사 코퍼스 로드 실패: {e}")
+            return None
+
+
+def _remove_stale(root: str, keep: str):
+    """이전 CSV 로 만든 변환 결과 정리 (이미 열어 둔 워커의 memmap 은 그대로 유지된다)"""
+    for name in os.listdir(root):
+        if name != keep and not name.startswith("."):
+            shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+_corpus: Optional[Corpus] = None
+_corpus_lock = threading.Lock()
+
+
+def get_corpus() -> Corpus:
+    """기사 코퍼스 (CSV 가 바뀌었으면 다시 변환)"""
+    global _corpus
+    if _corpus is not None and _corpus.manifest == csv_manifest():
+        return _corpus
+    with _corpus_lock:
+        if _corpus is not None and _corpus.manifest == csv_manifest():
+            return _corpus
+        _corpus = Corpus.load() or Corpus.build()
+        return _corpus
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    corpus = Corpus.build()
+    print(f"코퍼스 변환 완료: {corpus.path} ({len(corpus)}행)")
+    for source in corpus.sources:
+        print(f"  {source['file']}: {source['rows']}행")
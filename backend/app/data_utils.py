@@ -1,109 +1,44 @@
 # CSV 데이터 파싱/검색 유틸 (기본 구조)
 
-import os
-import pandas as pd
-import re
-from app.config import DATA_DIR
-
-def extract_keywords(situation):
-    """상황에서 키워드 추출"""
-    keywords = []
-    
-    # 기본 키워드 패턴
-    patterns = {
-        '범죄': ['흉기', '난동', '폭력', '협박', '체포', '검거', '수사'],
-        '음주': ['만취', '술', '음주', '알코올'],
-        '장소': ['노상', '길거리', '도로', '공공장소', '구로구', '서울'],
-        '법적': ['불구속', '송치', '혐의', '기소', '판결']
-    }
-    
-    situation_lower = situation.lower()
-    
-    for category, terms in patterns.items():
-        for term in terms:
-            if term in situation_lower:
-                keywords.append(term)
-    
-    return keywords
+from app.bm25 import get_bm25_index, search_indexes as search_bm25
+from app.stats_cube import get_combined_cube
+from app.vector_index import get_vector_index, search_indexes as search_vectors
+from app.segments import get_segments
+from app.near_dup import get_corpus_signatures
 
 def search_similar_cases(situation):
-    """CSV 데이터에서 유사 사건 검색"""
+    """유사 사건 검색 (상황 설명 전체로 BM25 점수를 매겨 상위 5건, 점수 포함, 추가 세그먼트 포함, 거의 같은 기사 제외)"""
     try:
-        keywords = extract_keywords(situation)
-        similar_cases = []
-        
-        # CSV 파일들 탐색
-        csv_files = ['accident.csv', 'law.csv', 'health.csv', 'education.csv', 
-                    'welfare.csv', 'traffic.csv', 'region.csv', 'environment.csv']
-        
-        for csv_file in csv_files:
-            file_path = os.path.join(DATA_DIR, csv_file)
-            
-            if os.path.exists(file_path):
-                try:
-                    df = pd.read_csv(file_path)
-                    
-                    # 기사 제목과 본문에서 키워드 검색
-                    if 'title' in df.columns and 'body_prep' in df.columns:
-                        for _, row in df.iterrows():
-                            title = str(row.get('title', ''))
-                            body = str(row.get('body_prep', ''))
-                            
-                            # 키워드 매칭 확인
-                            match_count = 0
-                            for keyword in keywords:
-                                if keyword in title.lower() or keyword in body.lower():
-                                    match_count += 1
-                            
-                            # 2개 이상 키워드가 매칭되면 유사 사건으로 간주
-                            if match_count >= 2:
-                                similar_cases.append({
-                                    'date': row.get('date', '날짜 불명'),
-                                    'title': title[:100] + '...' if len(title) > 100 else title,
-                                    'summary': body[:200] + '...' if len(body) > 200 else body,
-                                    'source': csv_file
-                                })
-                            
-                            # 최대 5개까지만 수집
-                            if len(similar_cases) >= 5:
-                                break
-                                
-                except Exception as e:
-                    print(f"Error reading {csv_file}: {e}")
-                    continue
-                    
-            if len(similar_cases) >= 5:
-                break
-        
-        return similar_cases[:5]  # 최대 5개 반환
-        
+        if not situation or not situation.strip():
+            return []
+        segments = get_segments()
+        indexes = [get_bm25_index()] + [s.bm25 for s in segments]
+        signatures = [get_corpus_signatures()] + [s.minhash for s in segments]
+        return search_bm25(indexes, situation, limit=5, signatures=signatures)
+
     except Exception as e:
         print(f"Error in search_similar_cases: {e}")
         return []
 
+def search_semantic_cases(situation, limit=5):
+    """의미 기반 유사 사건 검색 (임베딩 벡터 색인에서 코사인 유사도 상위 limit 건, 점수 포함, 추가 세그먼트 포함,
+    거의 같은 기사 제외)"""
+    if not situation or not situation.strip():
+        return []
+    segments = get_segments()
+    indexes = [get_vector_index()] + [s.vectors for s in segments]
+    signatures = [get_corpus_signatures()] + [s.minhash for s in segments]
+    return search_vectors(indexes, situation, limit=limit, signatures=signatures)
+
 def get_statistics_summary():
-    """데이터 전체 통계 요약"""
+    """데이터 전체 통계 요약 (미리 집계한 통계 큐브 + 추가 세그먼트에서 CSV별 기사 수)"""
     try:
-        stats = {}
-        csv_files = ['accident.csv', 'law.csv', 'health.csv', 'education.csv', 
-                    'welfare.csv', 'traffic.csv', 'region.csv', 'environment.csv']
-        
-        for csv_file in csv_files:
-            file_path = os.path.join(DATA_DIR, csv_file)
-            
-            if os.path.exists(file_path):
-                try:
-                    df = pd.read_csv(file_path)
-                    stats[csv_file] = {
-                        'count': len(df),
-                        'categories': csv_file.replace('.csv', '')
-                    }
-                except Exception as e:
-                    print(f"Error reading {csv_file}: {e}")
-                    continue
-        
-        return stats
-        
+        return get_combined_cube(get_segments()).summary()
+
     except Exception as e:
         print(f"Error in get_statistics_summary: {e}")
-        return {} 
\ No newline at end of file
+        return {}
+
+def get_statistics(category=None, start_month=None, end_month=None):
+    """카테고리/기간별 기사 수 집계 (카테고리별, 월별, 지역 키워드별, 추가 세그먼트 포함)"""
+    return get_combined_cube(get_segments()).query(category, start_month, end_month)
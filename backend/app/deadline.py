@@ -0,0 +1,101 @@
+# 요청 마감 시간(deadline)과 클라이언트 연결 끊김 처리
+#
+# 라우트마다 기본 처리 시간 예산이 있고, 클라이언트는 X-Request-Timeout 헤더(초)로 줄이거나 늘릴 수 있다.
+# Deadline 은 하위 함수(search_naver_news, analyze_article_with_gemini, 종합 분석 호출)까지 넘겨서
+# 남은 시간만큼만 기다리게 하고, 클라이언트가 연결을 끊으면 진행 중인 작업 태스크를 취소한다.
+# (LLM 스케줄러 대기열, MCP 도구 호출 루프도 취소가 전파되어 함께 정리된다)
+
+import asyncio
+import logging
+from typing import Awaitable
+
+from fastapi import HTTPException, Request
+
+from app.config import REQUEST_TIMEOUT_MAX
+from app.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+TIMEOUT_HEADER = "x-request-timeout"
+
+# 499: 클라이언트가 먼저 연결을 끊음 (nginx 관례)
+CLIENT_CLOSED_REQUEST = 499
+
+REQUESTS_CANCELLED = Counter("reporter_requests_cancelled_total", "마감 시간 초과나 연결 끊김으로 중단한 요청 수",
+                             ["route", "reason"])
+
+
+class Deadline:
+    """이벤트 루프 시계 기준 마감 시각"""
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.expires_at = asyncio.get_running_loop().time() + seconds
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - asyncio.get_running_loop().time())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def timeout(self):
+        """async with deadline.timeout(): ... (마감 시각이 지나면 TimeoutError)"""
+        return asyncio.timeout_at(self.expires_at)
+
+
+def request_deadline(request: Request, default: float) -> Deadline:
+    """X-Request-Timeout 헤더(초, 1 ~ REQUEST_TIMEOUT_MAX) 또는 라우트 기본값으로 마감 시간 설정"""
+    seconds = default
+    value = request.headers.get(TIMEOUT_HEADER)
+    if value:
+        try:
+            seconds = min(max(float(value), 1.0), REQUEST_TIMEOUT_MAX)
+        except ValueError:
+            logger.warning(f"잘못된 {TIMEOUT_HEADER} 헤더 무시: {value}")
+    return Deadline(seconds)
+
+
+async def _wait_for_disconnect(request: Request):
+    """http.disconnect 메시지가 올 때까지 대기 (본문은 이미 읽었으므로 다음 메시지는 연결 종료뿐이다)
+
+    request.is_disconnected() 는 메시지를 기다리지 않고 바로 확인하는데,
+    http 미들웨어가 receive 를 감싸고 있으면 항상 False 가 되므로 직접 receive 를 기다린다.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def cancel_on_disconnect(request: Request, work: Awaitable, route: str):
+    """work 를 태스크로 실행하면서 클라이언트 연결을 살피고, 끊기면 작업을 취소하고 499 로 끝낸다"""
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(_wait_for_disconnect(request))
+    try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+        if task.done():
+            return task.result()
+        note_disconnect(route)
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="클라이언트 연결이 끊겼습니다.")
+    finally:
+        for pending in (task, watcher):
+            if not pending.done():
+                pending.cancel()
+
+
+def deadline_exceeded(route: str, detail: str) -> HTTPException:
+    """마감 시간을 넘겨 결과를 하나도 만들지 못한 경우의 504"""
+    REQUESTS_CANCELLED.inc(route=route, reason="deadline")
+    return HTTPException(status_code=504, detail=detail)
+
+
+def note_partial(route: str):
+    """마감 시간 때문에 일부 결과만 돌려준 경우 기록"""
+    REQUESTS_CANCELLED.inc(route=route, reason="deadline_partial")
+
+
+def note_disconnect(route: str):
+    """클라이언트가 연결을 끊어 작업을 취소한 경우 기록"""
+    logger.info(f"클라이언트 연결 끊김, 작업 취소: {route}")
+    REQUESTS_CANCELLED.inc(route=route, reason="disconnect")
@@ -1,123 +1,378 @@
-import json
-import google.generativeai as genai
-from app.config import GEMINI_API_KEY
 import logging
-import subprocess
-from app.models import NewsArticle, ArticleAnalysis
-import os
-import sys
+import re
 import asyncio
-from agents.mcp import MCPServerStdio
-from agents import Agent
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from dotenv import load_dotenv
-from google import genai
+import threading
+import time
+from typing import List, Optional
+from app.config import (GEMINI_API_KEY, GEMINI_MODEL, NEWS_ANALYZE_CONCURRENCY, PERSPECTIVE_BATCH_CONCURRENCY,
+                        NEWS_SUMMARY_MIN_SECONDS)
+from app.mcp_pool import get_naver_pool
+from app.response_cache import get_response_cache
+from app.search_cache import get_search_cache
+from app.singleflight import SingleFlight
+from app.json_stream import TopLevelFieldParser
+from app.ai_providers import get_router
+from app.metrics import time_stage, track_llm_call, record_gemini_usage
+from app.llm_scheduler import get_scheduler, priority_for, estimate_tokens
+from app.deadline import Deadline
+from app.prompt_budget import build_summary_prompt
+from app.near_dup import get_hasher, cluster_labels, NearDuplicateFilter, NEAR_DUPLICATES
+from app.json_repair import parse_json, fill_missing_fields, was_repaired
+from app.models import DirectorResponse, PerspectiveResponse, ArticleAnalysisContent
 
-load_dotenv()
-GOOGLE_API_KEY = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=GEMINI_API_KEY)
+# Gemini 클라이언트는 첫 사용 시 생성 (google.genai 임포트 비용을 콜드 스타트에서 뺀다)
+client = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """공유 Gemini 클라이언트"""
+    global client
+    if client is None:
+        with _client_lock:
+            if client is None:
+                from google import genai
+                client = genai.Client(api_key=GEMINI_API_KEY)
+    return client
+
+def generate_config(**kwargs):
+    """GenerateContentConfig 생성 (google.genai.types 도 첫 사용 시 임포트)"""
+    from google.genai import types
+    return types.GenerateContentConfig(**kwargs)
+
+def json_output(schema) -> dict:
+    """구조화 출력 설정: schema(pydantic 모델) 형태의 JSON 으로만 응답하게 한다"""
+    if schema is None:
+        return {}
+    return {"response_mime_type": "application/json", "response_schema": schema}
 
 logger = logging.getLogger(__name__)
 
-def init_gemini():
-    genai.configure(api_key=GEMINI_API_KEY)
-    return genai.GenerativeModel('gemini-2.0-flash-001')
+MODEL_NAME = GEMINI_MODEL
+
+def total_tokens(response):
+    usage = getattr(response, "usage_metadata", None)
+    return getattr(usage, "total_token_count", None)
+
+async def generate_content(contents, stage: str, model: str = MODEL_NAME, mcp_pool=None, **config):
+    """Gemini 호출 한 번 (단계별 소요 시간, 진행 중 호출 수, 토큰 사용량 기록)
+
+    호출은 llm_scheduler 에서 단계별 우선순위로 차례를 받고, 429 면 백오프 후 다시 시도한다.
+    mcp_pool 을 주면 세션을 먼저 빌린 뒤 차례를 기다려 도구로 넘긴다
+    (세션을 기다리는 호출이 스케줄러 자리를 차지하지 않도록, 429 백오프 동안에는 세션을 반납).
+    """
+    async def request(**extra):
+        with track_llm_call("gemini", stage):
+            return await get_client().aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=generate_config(**config, **extra),
+            )
+
+    if mcp_pool is None:
+        call, resource = request, None
+    else:
+        call, resource = (lambda session: request(tools=[session])), mcp_pool.session
+
+    response = await get_scheduler("gemini").run(call, priority_for(stage), estimate_tokens(contents),
+                                                  usage=total_tokens, resource=resource)
+    record_gemini_usage(model, response)
+    return response
+
+# 동일 요청 합치기 그룹
+llm_flight = SingleFlight("llm")
+search_flight = SingleFlight("naver_search")
 
-def clean_json_response(response: str) -> dict:
-    """마크다운 코드 블록과 불필요한 문자를 제거하고 JSON 파싱"""
+# 프롬프트를 바꾸면 버전을 올려서 이전 응답 캐시를 쓰지 않도록 한다
+DIRECTING_PROMPT_VERSION = "1"
+PERSPECTIVE_PROMPT_VERSION = "1"
+
+def clean_json_response(response: str, source: str = "gemini") -> dict:
+    """JSON 파싱 (코드 블록/앞뒤 설명은 건너뛰고, 잘린 JSON 은 복구)"""
     try:
-        # 마크다운 코드 블록 제거
-        cleaned = response.replace('```json', '').replace('```', '').strip()
-        # JSON 파싱
-        return json.loads(cleaned)
-    except json.JSONDecodeError as e:
+        with time_stage("json_parse"):
+            return parse_json(response, source=source)
+    except ValueError as e:
         raise ValueError(f"JSON 파싱 오류: {str(e)}")
 
+async def cache_unless_repaired(cache, key: str, kind: str, result: dict, provider: Optional[str]):
+    """잘린 응답을 복구했거나 빈 값으로 채운 결과는 정상 응답처럼 보이므로 캐시에 남기지 않는다"""
+    if was_repaired(result):
+        logger.info(f"복구된 {kind} 응답은 캐시하지 않음")
+        return
+    await cache.set(key, kind, result, provider=provider)
+
+def parse_directing_response(text: str) -> dict:
+    """디렉팅 응답 파싱 (잘려서 빠진 필드는 빈 값으로 채움)"""
+    result = clean_json_response(text, source="directing")
+    if not isinstance(result, dict):
+        raise ValueError("디렉팅 응답이 JSON 객체가 아닙니다.")
+    return fill_missing_fields(DirectorResponse, result)
+
+def news_search_prompt(query: str, max_results: int) -> str:
+    return f"네이버 뉴스에서 '{query}'사건과 유사한 기사 {max_results}개만 찾아줘."
+
 # 네이버 뉴스 MCP를 mcp 클라이언트로 호출하여 기사 리스트를 가져오는 함수
-async def search_naver_news(query: str, max_results: int = 3):
-    server_params = StdioServerParameters(
-        command="npx",
-        args=["-y", "@isnow890/naver-search-mcp"],
-        env={
-            "NAVER_CLIENT_ID": os.getenv("NAVER_CLIENT_ID", "N0_XnayYPesgOcTS3Ae9"),
-            "NAVER_CLIENT_SECRET": os.getenv("NAVER_CLIENT_SECRET", "xDMaSTrByr")
-        }
-    )
-    async with stdio_client(server_params) as (read, write):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            prompt = f"네이버 뉴스에서 '{query}'사건과 유사한 기사 {max_results}개만 찾아줘."
-            tool_result = await client.aio.models.generate_content(
-                model="gemini-2.5-flash",  # 또는 최신 gemini-2.5-flash
-                contents=prompt,
-                config=genai.types.GenerateContentConfig(
-                    temperature=0.2,
-                    tools=[session],
-                ),
-            )
-            return tool_result.text
+# (MCP 서버 프로세스는 mcp_pool 에서 재사용)
+async def fetch_naver_news(query: str, max_results: int = 3) -> str:
+    """캐시를 거치지 않는 MCP 검색 한 번"""
+    prompt = news_search_prompt(query, max_results)
+    tool_result = await generate_content(prompt, "news_search_call", temperature=0.2, mcp_pool=get_naver_pool())
+    return tool_result.text
+
+def _shared_fetch(key: str, query: str, max_results: int):
+    # 같은 주제의 동시 검색은 MCP 검색 한 번으로 합친다
+    return search_flight.do(key, lambda: fetch_naver_news(query, max_results))
+
+async def search_naver_news(query: str, max_results: int = 3, deadline: Optional[Deadline] = None):
+    """검색 결과 캐시(search_cache)에 있으면 바로 반환, 없으면 검색
+
+    deadline 이 지나면 TimeoutError (같은 검색을 기다리는 다른 요청이 없으면 검색 작업도 취소된다)
+    """
+    cache = get_search_cache()
+    key = cache.make_key(query, max_results)
 
-# 기사별 Gemini 분석 함수
-async def analyze_article_with_gemini(article_text: str) -> ArticleAnalysis:
+    def fetch():
+        return _shared_fetch(key, query, max_results)
+
+    if deadline is None:
+        return await cache.get_or_fetch(key, fetch)
+    async with deadline.timeout():
+        return await cache.get_or_fetch(key, fetch)
+
+# 검색 결과 텍스트에서 기사 경계로 볼 줄: "1. ", "2) ", "**3.", "### 4.", "[5]" 등
+ARTICLE_MARKER = re.compile(r"^[ \t]{0,3}(?:#{1,4}[ \t]+|\*\*)?(?:\d{1,2}[.)]|\[\d{1,2}\])[ \t]+", re.MULTILINE)
+
+def split_articles(text: str) -> List[str]:
+    """네이버 뉴스 검색 결과 텍스트를 기사 단위로 분리 (경계를 못 찾으면 전체를 한 기사로)"""
+    text = (text or "").strip()
+    starts = [m.start() for m in ARTICLE_MARKER.finditer(text)]
+    if not starts:
+        return [text] if text else []
+    # 첫 번호 앞의 안내 문구("다음은 ... 기사입니다:")는 버린다
+    bounds = starts + [len(text)]
+    return [text[bounds[i]:bounds[i + 1]].strip() for i in range(len(starts)) if text[bounds[i]:bounds[i + 1]].strip()]
+
+class ArticleSplitter:
+    """스트리밍으로 들어오는 검색 결과 텍스트를 split_articles 와 같은 경계로 나눈다
+
+    다음 기사 번호가 나타나야 앞 기사가 끝난 것으로 보고 내보내며, 마지막 기사는 close() 에서 내보낸다.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.emitted = 0
+
+    def feed(self, chunk: str) -> List[str]:
+        self.text += chunk
+        return self._take(split_articles(self.text)[:-1])
+
+    def close(self) -> List[str]:
+        return self._take(split_articles(self.text))
+
+    def _take(self, articles: List[str]) -> List[str]:
+        new = articles[self.emitted:]
+        self.emitted += len(new)
+        return new
+
+async def stream_naver_news(query: str, max_results: int = 3):
+    """search_naver_news 의 스트리밍판: 검색 응답에서 기사 한 건이 완성될 때마다 그 기사 텍스트를 내보낸다
+
+    검색 결과 캐시에 있으면 검색 없이 캐시된 기사를 바로 내보낸다.
+    """
+    cache = get_search_cache()
+    key = cache.make_key(query, max_results)
+    cached = cache.get(key)
+    if cached is not None:
+        text, stale = cached
+        if stale:
+            cache.refresh(key, lambda: _shared_fetch(key, query, max_results))
+        for article in split_articles(text):
+            yield article
+        return
+
+    splitter = ArticleSplitter()
+    last_chunk = None
+    prompt = news_search_prompt(query, max_results)
+    # 도구 호출이 끝나고 응답 스트림이 닫힐 때까지 스케줄러 자리를 차지한다 (재시도 없음)
+    # 세션을 기다리는 동안 스케줄러 자리를 차지하지 않도록 MCP 세션을 먼저 빌린다
+    async with get_naver_pool().session() as session:
+        async with get_scheduler("gemini").slot(priority_for("news_search_call"), estimate_tokens(prompt)):
+            with track_llm_call("gemini", "news_search_call"):
+                stream = await get_client().aio.models.generate_content_stream(
+                    model=MODEL_NAME,
+                    contents=prompt,
+                    config=generate_config(temperature=0.2, tools=[session]),
+                )
+                async for chunk in stream:
+                    last_chunk = chunk
+                    if chunk.text:
+                        for article in splitter.feed(chunk.text):
+                            yield article
+    record_gemini_usage(MODEL_NAME, last_chunk)
+    cache.set(key, splitter.text)
+    for article in splitter.close():
+        yield article
+
+def article_title(article_text: str) -> str:
+    """기사 텍스트 첫 줄에서 제목 추출"""
+    first_line = article_text.strip().splitlines()[0] if article_text.strip() else ""
+    title = ARTICLE_MARKER.sub("", first_line).replace("**", "").strip()
+    return title[:100]
+
+# 기사 한 건 Gemini 분석 함수
+async def analyze_single_article(article_text: str) -> dict:
     prompt = f"""
-    아래는 네이버 뉴스에서 검색된 유사 기사들의 모음입니다. 각 기사별로 보도 각도, 주요 쟁점, 프레이밍, 시사점을 분석해줘. 기사별로 구분해서 결과를 구조화해줘.
+    아래는 네이버 뉴스에서 검색된 기사 한 건입니다. 이 기사의 보도 각도, 주요 쟁점, 프레이밍, 시사점을 분석해줘.
 
-    기사 모음:
+    기사:
     {article_text}
 
     아래 JSON 형식으로만 응답해. 다른 텍스트나 마크다운은 포함하지 마:
     {{
-        "analyses": [
-            {{
-                "title": "기사 제목",
-                "angles": ["보도 각도1", "보도 각도2"],
-                "issues": ["주요 쟁점1", "주요 쟁점2"],
-                "framing": "프레이밍 설명",
-                "implications": ["시사점1", "시사점2"]
-            }}
-        ]
+        "title": "기사 제목",
+        "angles": ["보도 각도1", "보도 각도2"],
+        "issues": ["주요 쟁점1", "주요 쟁점2"],
+        "framing": "프레이밍 설명",
+        "implications": ["시사점1", "시사점2"]
     }}
     """
     try:
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                temperature=0.2,
-            ),
-        )
-        result = clean_json_response(response.text)
-        return result  # analyses 리스트 반환
+        response = await generate_content(prompt, "article_analysis_call", temperature=0.2,
+                                          **json_output(ArticleAnalysisContent))
+        result = clean_json_response(response.text, source="article_analysis")
+        if not isinstance(result, dict):
+            raise ValueError("기사 분석 응답이 JSON 객체가 아닙니다.")
+        return {
+            "title": result.get("title") or article_title(article_text),
+            "angles": result.get("angles", []),
+            "issues": result.get("issues", []),
+            "framing": result.get("framing"),
+            "implications": result.get("implications", []),
+        }
     except Exception as e:
         logger.error(f"Gemini 기사 분석 오류: {e}")
-        return {"analyses": [
-            {"title": "분석 오류", "angles": [], "issues": [], "framing": None, "implications": [f"분석 오류: {e}"]}
-        ]}
-
-# 종합 분석 함수
-async def summarize_articles_with_gemini(articles: list, analyses: list) -> str:
-    # 기사별 요약 및 분석을 텍스트로 합침
-    context = "\n".join([
-        f"기사: {a.title}\n요약: {a.summary}\n보도 각도: {b.angles}\n쟁점: {b.issues}\n프레이밍: {b.framing}\n시사점: {b.implications}"
-        for a, b in zip(articles, analyses)
-    ])
-    prompt = f"""
-    다음은 여러 유사 뉴스 기사와 각 기사별 보도 각도/쟁점/프레이밍/시사점 분석 결과야.\n
-    {context}
+        return {"title": article_title(article_text) or "분석 오류", "angles": [], "issues": [],
+                "framing": None, "implications": [f"분석 오류: {e}"]}
+
+# 기사별 Gemini 분석 함수: 기사 단위로 나눠 동시에 분석 (한 기사의 실패는 그 기사에만 영향)
+# 거의 같은 기사(통신사 기사 전재 등)는 묶음마다 앞쪽 기사 하나만 분석하고 나머지 번호는 duplicates 로 붙인다
+# deadline 이 지나면 끝나지 않은 기사 분석은 취소하고 끝난 것만 돌려준다 (partial=True)
+async def analyze_article_with_gemini(article_text: str, max_concurrency: int = NEWS_ANALYZE_CONCURRENCY,
+                                      deadline: Optional[Deadline] = None) -> dict:
+    articles = split_articles(article_text)
+    labels = cluster_labels(get_hasher().signatures(articles))
+    duplicates = {i: [j for j, label in enumerate(labels) if label == i and j != i]
+                  for i, label in enumerate(labels) if label == i}
+    if len(duplicates) < len(articles):
+        NEAR_DUPLICATES.inc(len(articles) - len(duplicates), source="news")
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def analyze(index: int, article: str) -> dict:
+        async with semaphore:
+            return {"article_index": index, **await analyze_single_article(article),
+                    "duplicates": duplicates[index]}
+
+    tasks = [asyncio.create_task(analyze(i, articles[i])) for i in duplicates]
+    if not tasks:
+        return {"analyses": [], "articles": [], "partial": False}
+    try:
+        done, pending = await asyncio.wait(tasks, timeout=deadline.remaining() if deadline else None)
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+    if pending:
+        logger.warning(f"기사 분석 마감 시간 초과: {len(done)}/{len(tasks)}건만 완료")
+    # 기사 순서대로 완료된 분석만 반환 (articles 는 분리한 기사 원문 전체, article_index 로 찾는다)
+    return {"analyses": [task.result() for task in tasks if task in done], "articles": articles,
+            "partial": bool(pending)}
+
+# 검색 + 기사 분석 + 종합 분석을 겹쳐 실행: 검색 응답에서 기사가 완성되는 대로 분석을 시작한다
+async def research_news(query: str, deadline: Deadline, max_results: int = 3,
+                        max_concurrency: int = NEWS_ANALYZE_CONCURRENCY):
+    """생기는 순서대로 ("article", {article_index, title, duplicate_of}), ("analysis", 기사별 분석) 을 내보내고
+    마지막에 ("summary", 종합 분석), ("done", {"articles", "partial"}) 를 내보낸다.
+    앞서 나온 기사와 거의 같은 기사는 분석하지 않고 article 이벤트의 duplicate_of 에 그 기사 번호를 적는다.
 
-    이 기사들에서 반복적으로 등장하는 쟁점, 공통된 프레임, 사회적 시사점, 차이점 등을 종합적으로 요약해줘.\n
-    1. 반복 쟁점/프레임\n2. 차이점\n3. 사회적 시사점\n4. 추가 취재 포인트\n
-    간결하고 명확하게 정리해줘.
+    deadline 이 지나면 끝나지 않은 분석은 취소하고 partial=True 로 끝낸다 (기사를 하나도 못 찾았으면 TimeoutError).
     """
+    events = asyncio.Queue()
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    articles, analyses, tasks = [], [], []
+    seen = NearDuplicateFilter()
+
+    async def analyze(index: int, article: str):
+        async with semaphore:
+            events.put_nowait(("analysis", {"article_index": index, **await analyze_single_article(article)}))
+
+    async def search():
+        try:
+            async for article in stream_naver_news(query, max_results):
+                duplicate_of = seen.add(get_hasher().signature(article))
+                events.put_nowait(("article", {"article_index": len(articles), "title": article_title(article),
+                                               "duplicate_of": duplicate_of}))
+                if duplicate_of is None:
+                    tasks.append(asyncio.create_task(analyze(len(articles), article)))
+                else:
+                    NEAR_DUPLICATES.inc(source="news")
+                articles.append(article)
+        finally:
+            events.put_nowait(("searched", None))
+
+    search_task = asyncio.create_task(search())
+    partial = False
     try:
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                temperature=0.2,
-            ),
-        )
+        searching = True
+        while searching or len(analyses) < len(tasks):
+            try:
+                # yield 를 timeout 블록 안에 두지 않도록 대기할 때만 마감 시간을 건다
+                async with deadline.timeout():
+                    event, data = await events.get()
+            except TimeoutError:
+                if not articles:
+                    raise
+                logger.warning(f"뉴스 리서치 마감 시간 초과: {len(analyses)}/{len(tasks)}건만 분석")
+                partial = True
+                break
+            if event == "searched":
+                searching = False
+                try:
+                    await search_task
+                except Exception as e:
+                    # 이미 찾은 기사가 있으면 그것만으로 계속한다
+                    if not articles:
+                        raise
+                    logger.error(f"뉴스 검색 스트림 중단: {e}")
+                    partial = True
+                continue
+            if event == "analysis":
+                analyses.append(data)
+            yield event, data
+    finally:
+        for task in [search_task, *tasks]:
+            if not task.done():
+                task.cancel()
+
+    # 종합 분석 (남은 시간이 너무 짧으면 건너뛴다)
+    summary = ""
+    if analyses and deadline.remaining() < NEWS_SUMMARY_MIN_SECONDS:
+        partial = True
+    elif analyses:
+        analyses.sort(key=lambda a: a["article_index"])
+        try:
+            async with deadline.timeout():
+                summary = await summarize_articles_with_gemini(articles, analyses)
+        except TimeoutError:
+            partial = True
+    yield "summary", summary
+    yield "done", {"articles": len(articles), "partial": partial}
+
+# 종합 분석 함수: 기사 원문 발췌와 기사별 분석을 토큰 예산 안의 압축 텍스트로 합쳐 한 번 호출
+async def summarize_articles_with_gemini(articles: List[str], analyses: List[dict],
+                                         model: str = MODEL_NAME) -> str:
+    prompt = build_summary_prompt(analyses, articles)
+    try:
+        response = await generate_content(prompt, "summary_call", model=model, temperature=0.2)
         return response.text.strip()
     except Exception as e:
         logger.error(f"Gemini 종합 분석 오류: {e}")
@@ -128,8 +383,8 @@ async def summarize_articles_with_gemini(articles: list, analyses: list) -> str:
 #     ...
 #     return DeepDiveResponse(...)
 
-async def get_directing(situation: str) -> dict:
-    prompt = f"""
+def build_directing_prompt(situation: str) -> str:
+    return f"""
     당신은 노련한 선배 기자입니다. 다음 현장 상황에 대해 분석해주세요.
     
     현장 상황: {situation}
@@ -153,21 +408,118 @@ async def get_directing(situation: str) -> dict:
         "checklist": ["체크리스트 1", "체크리스트 2"]
     }}
     """
-    
+
+async def get_directing(situation: str) -> dict:
+    cache = get_response_cache()
+    cache_key = cache.make_key("directing", situation, model=MODEL_NAME, prompt_version=DIRECTING_PROMPT_VERSION)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    prompt = build_directing_prompt(situation)
+
+    async def generate():
+        try:
+            # 헤지 라우터를 거쳐 호출 (JSON 파싱까지 성공한 첫 응답 사용)
+            result, provider = await get_router().complete_with_provider(
+                prompt, temperature=0.2, parse=parse_directing_response, schema=DirectorResponse)
+        except Exception as e:
+            raise Exception(f"Gemini API 오류: {str(e)}")
+
+        await cache_unless_repaired(cache, cache_key, "directing", result, provider)
+        return result
+
+    # 같은 상황의 동시 요청은 Gemini 호출 한 번으로 합친다
+    return await llm_flight.do(cache_key, generate)
+
+async def stream_directing(situation: str):
+    """디렉팅 스트리밍: 응답 JSON 의 최상위 필드가 닫힐 때마다 (필드명, 값) 을 내보낸다
+
+    마지막에는 ("done", 전체 결과) 를 내보낸다.
+    """
+    cache = get_response_cache()
+    cache_key = cache.make_key("directing", situation, model=MODEL_NAME, prompt_version=DIRECTING_PROMPT_VERSION)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        for name, value in cached.items():
+            yield name, value
+        yield "done", cached
+        return
+
+    parser = TopLevelFieldParser()
+    chunks = []
+    last_chunk = None
+    prompt = build_directing_prompt(situation)
     try:
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                temperature=0.2,
-            ),
-        )
-        # JSON 응답 정제 및 파싱
-        return clean_json_response(response.text)
+        # 스트림은 중간에 다시 시작할 수 없으므로 재시도 없이 스트림이 끝날 때까지 자리를 차지한다
+        async with get_scheduler("gemini").slot(priority_for("llm_stream"), estimate_tokens(prompt)):
+            with track_llm_call("gemini", "llm_stream"):
+                stream = await get_client().aio.models.generate_content_stream(
+                    model=MODEL_NAME,
+                    contents=prompt,
+                    config=generate_config(
+                        temperature=0.2,
+                        **json_output(DirectorResponse),
+                    ),
+                )
+                async for chunk in stream:
+                    last_chunk = chunk
+                    if not chunk.text:
+                        continue
+                    chunks.append(chunk.text)
+                    for name, value in parser.feed(chunk.text):
+                        yield name, value
     except Exception as e:
         raise Exception(f"Gemini API 오류: {str(e)}")
+    # 사용량 메타데이터는 마지막 청크에 누적값으로 들어온다
+    record_gemini_usage(MODEL_NAME, last_chunk)
+
+    # 스트리밍 파서가 놓쳤거나 파싱하지 못한 필드가 있으면 전체 텍스트로 다시 파싱 (빠진 필드는 빈 값)
+    if parser.done and set(DirectorResponse.model_fields) <= set(parser.fields):
+        result = parser.fields
+    else:
+        result = parse_directing_response("".join(chunks))
+    # 형식이 맞지 않는 결과는 캐시에 남기지 않는다 (캐시에서 꺼낼 때마다 검증에 실패하므로)
+    DirectorResponse(**result)
+    await cache_unless_repaired(cache, cache_key, "directing", result, f"gemini:{MODEL_NAME}")
+    yield "done", result
+
+def parse_perspective_response(text: str) -> dict:
+    """관점 확장 응답 파싱 및 구조 검증"""
+    if not text:
+        raise ValueError("Gemini API가 빈 응답을 반환했습니다.")
+
+    # JSON 응답 정제 및 파싱
+    cleaned_response = clean_json_response(text, source="perspective")
+
+    # 응답 구조 검증
+    if not isinstance(cleaned_response, dict) or "perspectives" not in cleaned_response:
+        raise ValueError("응답에 'perspectives' 필드가 누락되었습니다.")
+
+    if not isinstance(cleaned_response["perspectives"], list):
+        raise ValueError("'perspectives'는 배열이어야 합니다.")
+
+    # 잘린 응답을 복구한 경우 마지막 관점의 빠진 필드는 빈 값으로 채운다
+    if not cleaned_response["perspectives"]:
+        raise ValueError("응답에 관점이 없습니다.")
+    cleaned_response = fill_missing_fields(PerspectiveResponse, cleaned_response)
+
+    for perspective in cleaned_response["perspectives"]:
+        required_fields = ["viewpoint", "issues", "questions", "implications"]
+        for field in required_fields:
+            if field not in perspective:
+                raise ValueError(f"관점에 필수 필드가 누락되었습니다: {field}")
+
+    return cleaned_response
 
 async def get_perspective(situation: str, perspective: str) -> dict:
+    cache = get_response_cache()
+    cache_key = cache.make_key("perspective", situation, perspective,
+                               model=MODEL_NAME, prompt_version=PERSPECTIVE_PROMPT_VERSION)
+    cached = await cache.get(cache_key)
+    if cached is not None:
+        return cached
+
     prompt = f"""
     당신은 노련한 선배 기자입니다. 다음 현장 상황을 '{perspective}' 관점에서 분석해주세요.
     
@@ -188,35 +540,42 @@ async def get_perspective(situation: str, perspective: str) -> dict:
     }}
     """
     
-    try:
-        response = await client.aio.models.generate_content(
-            model="gemini-2.5-flash",
-            contents=prompt,
-            config=genai.types.GenerateContentConfig(
-                temperature=0.2,
-            ),
-        )
-        if not response or not response.text:
-            raise ValueError("Gemini API가 빈 응답을 반환했습니다.")
-            
-        # JSON 응답 정제 및 파싱
-        cleaned_response = clean_json_response(response.text)
-        
-        # 응답 구조 검증
-        if "perspectives" not in cleaned_response:
-            raise ValueError("응답에 'perspectives' 필드가 누락되었습니다.")
-        
-        if not isinstance(cleaned_response["perspectives"], list):
-            raise ValueError("'perspectives'는 배열이어야 합니다.")
-            
-        for perspective in cleaned_response["perspectives"]:
-            required_fields = ["viewpoint", "issues", "questions", "implications"]
-            for field in required_fields:
-                if field not in perspective:
-                    raise ValueError(f"관점에 필수 필드가 누락되었습니다: {field}")
-        
+    async def generate():
+        try:
+            # 헤지 라우터를 거쳐 호출 (구조 검증까지 통과한 첫 응답 사용)
+            cleaned_response, provider = await get_router().complete_with_provider(
+                prompt, temperature=0.2, parse=parse_perspective_response, schema=PerspectiveResponse)
+        except Exception as e:
+            logger.error(f"관점 확장 오류: {str(e)}")
+            raise Exception(f"관점 확장 처리 중 오류가 발생했습니다: {str(e)}")
+
+        await cache_unless_repaired(cache, cache_key, "perspective", cleaned_response, provider)
         return cleaned_response
-        
-    except Exception as e:
-        logger.error(f"관점 확장 오류: {str(e)}")
-        raise Exception(f"관점 확장 처리 중 오류가 발생했습니다: {str(e)}") 
\ No newline at end of file
+
+    # 같은 상황/관점의 동시 요청은 Gemini 호출 한 번으로 합친다
+    return await llm_flight.do(cache_key, generate)
+
+async def get_perspectives(situation: str, perspectives: List[str],
+                           max_concurrency: int = PERSPECTIVE_BATCH_CONCURRENCY) -> dict:
+    """여러 관점을 동시에 분석해 하나의 응답으로 합치고, 관점별 소요 시간/오류를 함께 반환"""
+    # 중복 관점은 한 번만 분석 (요청 순서 유지)
+    perspectives = list(dict.fromkeys(p.strip() for p in perspectives if p and p.strip()))
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def run(perspective: str):
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                result = await get_perspective(situation, perspective)
+                error = None
+            except Exception as e:
+                result, error = None, str(e)
+            elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+            return perspective, result, elapsed_ms, error
+
+    merged, results = [], []
+    for perspective, result, elapsed_ms, error in await asyncio.gather(*(run(p) for p in perspectives)):
+        if result is not None:
+            merged.extend(result["perspectives"])
+        results.append({"perspective": perspective, "elapsed_ms": elapsed_ms, "error": error})
+    return {"perspectives": merged, "results": results}
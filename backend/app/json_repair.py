@@ -0,0 +1,200 @@
+# LLM 응답 JSON 관대한 파싱
+#
+# 스키마를 지정한 구조화 출력은 대부분 그대로 json.loads 로 끝나지만,
+# 출력 토큰 한도에 걸려 잘린 응답이나 코드 블록/앞뒤 설명이 붙은 응답(OpenAI, 스키마 없는 호출)은
+# 다시 LLM 을 부르지 않고 여기서 복구한다.
+
+import json
+import logging
+import re
+from typing import List, Optional, Tuple, get_args, get_origin
+
+from app.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# outcome: ok(그대로 파싱) / extracted(코드 블록·설명 제거 후 파싱) / repaired(잘린 JSON 복구) / failed
+JSON_PARSE_RESULTS = Counter("reporter_json_parse_total", "LLM 응답 JSON 파싱 결과", ["source", "outcome"])
+
+_CLOSERS = {"{": "}", "[": "]"}
+_LITERALS = ("true", "false", "null")
+# 문자열 밖에서 끝에 걸친 리터럴/숫자 조각
+_TRAILING_SCALAR = re.compile(r"[-+.\w]+$")
+
+
+class RepairedDict(dict):
+    """잘렸거나 필드가 빠진 응답을 복구한 결과 (정상 응답처럼 보이므로 캐시에 오래 남기지 않도록 표시)"""
+
+
+def was_repaired(value) -> bool:
+    return isinstance(value, RepairedDict)
+
+
+def _json_start(text: str) -> int:
+    """코드 블록 안쪽이든 앞에 설명이 붙었든 첫 JSON 객체/배열 시작 위치"""
+    starts = [i for i in (text.find("{"), text.find("[")) if i != -1]
+    return min(starts) if starts else -1
+
+
+def _scan(text: str, start: int) -> Tuple[str, List[str], bool, Optional[Tuple[int, Tuple[str, ...]]]]:
+    """start 부터 JSON 구조를 따라가며 복구에 필요한 상태를 모은다
+
+    반환: (지금까지의 출력, 닫히지 않은 괄호 스택, 문자열 안에서 끝났는지, 마지막 완결 지점)
+    닫는 괄호 앞의 꼬리 쉼표는 출력에서 뺀다.
+    """
+    out: List[str] = []
+    stack: List[str] = []
+    in_string = escape = False
+    checkpoint = None
+    for ch in text[start:]:
+        if in_string:
+            out.append(ch)
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            continue
+        if ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(_CLOSERS[ch])
+        elif ch in "}]":
+            while out and out[-1] in " \t\r\n,":
+                out.pop()
+            out.append(stack.pop())
+            if not stack:
+                return "".join(out), stack, False, None
+            checkpoint = (len(out), tuple(stack))
+            continue
+        elif ch == ",":
+            checkpoint = (len(out), tuple(stack))
+        out.append(ch)
+    if escape:
+        out.pop()
+    return "".join(out), stack, in_string, checkpoint
+
+
+def _close(text: str, stack) -> str:
+    return text + "".join(reversed(stack))
+
+
+def _complete_scalar(text: str) -> str:
+    """끝에 잘린 리터럴은 완성하고 (tru -> true), 잘린 숫자는 완결된 부분만 남긴다 (1. -> 1, - -> 제거)"""
+    match = _TRAILING_SCALAR.search(text)
+    if match is None:
+        return text
+    token, head = match.group(), text[:match.start()]
+    for literal in _LITERALS:
+        if literal.startswith(token):
+            return head + literal
+    number = token.rstrip(".eE+-")
+    try:
+        if isinstance(json.loads(number), (int, float)):
+            return head + number
+    except json.JSONDecodeError:
+        pass
+    return head
+
+
+def repair_json(text: str):
+    """잘렸거나 꼬리 쉼표가 있는 JSON 을 닫아서 파싱 (복구할 수 없으면 ValueError)"""
+    start = _json_start(text)
+    if start == -1:
+        raise ValueError("JSON 객체를 찾을 수 없습니다.")
+    body, stack, in_string, checkpoint = _scan(text, start)
+
+    candidates = []
+    # 1) 마지막 값까지 살려서 닫기: 열린 문자열을 닫고, 잘린 리터럴/숫자는 완성하고, 값이 빠진 키에는 null
+    if in_string:
+        partial = body + '"'
+    else:
+        partial = _complete_scalar(body.rstrip())
+    partial = partial.rstrip().rstrip(",").rstrip()
+    if partial.endswith(":"):
+        partial += " null"
+    candidates.append(_close(partial, stack))
+    # 2) 마지막으로 완결된 원소까지만 남기고 닫기
+    if checkpoint is not None:
+        length, snapshot = checkpoint
+        candidates.append(_close(body[:length].rstrip().rstrip(","), snapshot))
+
+    for candidate in candidates:
+        try:
+            return json.loads(candidate)
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("JSON 복구 실패")
+
+
+def parse_json(text: str, source: str = "llm"):
+    """LLM 응답 텍스트를 JSON 으로 파싱
+
+    그대로 파싱 -> 코드 블록/앞뒤 설명 제거 후 파싱 -> 잘린 JSON 복구 순으로 시도하고
+    결과를 reporter_json_parse_total{source, outcome} 에 기록한다.
+    """
+    text = (text or "").strip()
+    try:
+        value = json.loads(text)
+        JSON_PARSE_RESULTS.inc(source=source, outcome="ok")
+        return value
+    except json.JSONDecodeError:
+        pass
+
+    start = _json_start(text)
+    if start != -1:
+        try:
+            value, _ = json.JSONDecoder().raw_decode(text, start)
+            JSON_PARSE_RESULTS.inc(source=source, outcome="extracted")
+            return value
+        except json.JSONDecodeError:
+            pass
+
+    try:
+        value = repair_json(text)
+    except ValueError:
+        JSON_PARSE_RESULTS.inc(source=source, outcome="failed")
+        raise
+    logger.warning(f"잘린 JSON 응답 복구 ({source}, {len(text)}자)")
+    JSON_PARSE_RESULTS.inc(source=source, outcome="repaired")
+    return RepairedDict(value) if isinstance(value, dict) else value
+
+
+def fill_missing_fields(model, data: dict) -> dict:
+    """복구된 응답에 빠진 필드를 pydantic 모델 기준 빈 값으로 채운다 (목록은 [], 문자열은 "")
+
+    하위 모델 목록 필드는 원소마다 같은 처리를 한다.
+    필수 필드를 하나라도 빈 값으로 채웠으면 RepairedDict 로 돌려준다.
+    """
+    if not isinstance(data, dict):
+        return data
+    if _fill(model, data) and not was_repaired(data):
+        return RepairedDict(data)
+    return data
+
+
+def _fill(model, data: dict) -> bool:
+    """data 를 제자리에서 채우고 필수 필드를 채웠는지 반환"""
+    filled = False
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        origin = get_origin(annotation)
+        if data.get(name) is None:
+            # 잘린 위치에서 값 없이 닫힌 키는 null 로 복구되므로 빠진 필드와 똑같이 다룬다
+            if not field.is_required():
+                data[name] = field.get_default()
+            elif origin in (list, List):
+                data[name] = []
+                filled = True
+            elif annotation is str:
+                data[name] = ""
+                filled = True
+            continue
+        if origin in (list, List) and isinstance(data[name], list):
+            item_type = (get_args(annotation) or (None,))[0]
+            if hasattr(item_type, "model_fields"):
+                for item in data[name]:
+                    if isinstance(item, dict):
+                        filled = _fill(item_type, item) or filled
+    return filled
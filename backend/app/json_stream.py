@@ -0,0 +1,94 @@
+# 스트리밍 JSON 파서
+#
+# LLM 이 조각(chunk) 단위로 내보내는 JSON 객체를 받아서,
+# 최상위 필드의 값이 닫히는 즉시 (필드명, 값) 을 돌려준다.
+# 객체 앞뒤의 ```json 코드 블록 표시 같은 잡음은 무시한다.
+
+import json
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class TopLevelFieldParser:
+    """최상위 JSON 객체의 필드를 완성되는 순서대로 뽑아내는 증분 파서"""
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self._expect = "key"          # key -> colon -> value -> (',' 후) key
+        self._key_start = 0
+        self._key: Optional[str] = None
+        self._value_start = 0
+        self.done = False
+        self.fields = {}
+
+    def feed(self, chunk: str) -> List[Tuple[str, object]]:
+        """조각을 넣고 이번에 완성된 (필드명, 값) 목록을 반환"""
+        completed = []
+        if self.done or not chunk:
+            return completed
+        self._text += chunk
+        text = self._text
+
+        i = self._pos
+        while i < len(text) and not self.done:
+            ch = text[i]
+            if not self._started:
+                if ch == "{":
+                    self._started = True
+                    self._depth = 1
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._expect = "colon"
+                i += 1
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+            elif ch == ":" and self._depth == 1 and self._expect == "colon":
+                self._expect = "value"
+                self._value_start = i + 1
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_value(text[self._value_start:i], completed)
+                    self.done = True
+            elif ch == "," and self._depth == 1:
+                self._finish_value(text[self._value_start:i], completed)
+                self._expect = "key"
+            i += 1
+
+        self._pos = i
+        return completed
+
+    def _finish_value(self, raw: str, completed: list):
+        if self._expect != "value" or self._key is None:
+            return
+        try:
+            value = json.loads(raw.strip())
+        except json.JSONDecodeError as e:
+            logger.warning(f"스트리밍 JSON 필드 파싱 실패 ({self._key}): {e}")
+        else:
+            self.fields[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
@@ -0,0 +1,145 @@
+# 다중 패턴 키워드 매처 (Aho-Corasick)
+#
+# 카테고리별 용어 사전을 오토마톤 하나로 컴파일해 문서를 한 번만 훑으면서
+# 등장하는 모든 용어를 찾는다. 용어 수가 늘어나도 검색 비용은 문서 길이에 비례한다.
+# 통계 큐브(stats_cube)가 기사마다 어떤 사전 카테고리(범죄/음주/...)의 용어가 나왔는지 셀 때 쓴다.
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import deque
+from typing import Dict, List, Optional
+
+from app.config import KEYWORD_DICT_PATH
+
+logger = logging.getLogger(__name__)
+
+# 기본 키워드 패턴
+DEFAULT_PATTERNS = {
+    '범죄': ['흉기', '난동', '폭력', '협박', '체포', '검거', '수사'],
+    '음주': ['만취', '술', '음주', '알코올'],
+    '장소': ['노상', '길거리', '도로', '공공장소', '구로구', '서울'],
+    '법적': ['불구속', '송치', '혐의', '기소', '판결']
+}
+
+
+def load_patterns(path: str) -> Dict[str, List[str]]:
+    """용어 사전 파일 로드
+
+    - .json: {"카테고리": ["용어", ...]}
+    - 그 외: 한 줄에 "카테고리<TAB>용어" 또는 "용어" (카테고리는 파일 이름)
+    """
+    if path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return {category: [str(term) for term in terms] for category, terms in data.items()}
+
+    default_category = os.path.splitext(os.path.basename(path))[0]
+    patterns: Dict[str, List[str]] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            category, _, term = line.rpartition("\t")
+            patterns.setdefault(category or default_category, []).append(term)
+    return patterns
+
+
+class KeywordMatcher:
+    """카테고리별 용어 사전을 컴파일한 Aho-Corasick 오토마톤"""
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self.terms: List[str] = []
+        self.categories: Dict[str, str] = {}
+        for category, terms in patterns.items():
+            for term in terms:
+                term = term.lower()
+                if term and term not in self.categories:
+                    self.categories[term] = category
+                    self.terms.append(term)
+
+        # 상태 0 이 루트. goto[s][ch] -> 다음 상태, output[s] -> 상태 s 에서 끝나는 용어 번호들
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+        for term_id, term in enumerate(self.terms):
+            state = 0
+            for ch in term:
+                nxt = self._goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self._goto)
+                    self._goto[state][ch] = nxt
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = nxt
+            self._output[state].append(term_id)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._output[nxt] = self._output[nxt] + self._output[self._fail[nxt]]
+
+        self.fingerprint = hashlib.sha1("\n".join(
+            f"{self.categories[term]}\t{term}" for term in self.terms
+        ).encode("utf-8")).hexdigest()
+
+    def __len__(self):
+        return len(self.terms)
+
+    def find_ids(self, text: str) -> set:
+        """text 에 등장하는 용어 번호 집합 (text 는 소문자화되어 있어야 함)"""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for ch in text:
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
+
+    def find(self, text: str) -> List[str]:
+        """text 에 등장하는 용어 목록 (사전 순서)"""
+        return [self.terms[term_id] for term_id in sorted(self.find_ids(text.lower()))]
+
+    @property
+    def category_names(self) -> List[str]:
+        """사전의 카테고리 (처음 나온 순서)"""
+        return list(dict.fromkeys(self.categories[term] for term in self.terms))
+
+    def find_categories(self, text: str) -> set:
+        """text 에 용어가 하나라도 나온 카테고리 집합 (text 는 소문자화되어 있어야 함)"""
+        return {self.categories[self.terms[term_id]] for term_id in self.find_ids(text)}
+
+
+_matcher: Optional[KeywordMatcher] = None
+_matcher_lock = threading.Lock()
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """기본 패턴 + KEYWORD_DICT_PATH 사전으로 만든 매처 (프로세스당 한 번 컴파일)"""
+    global _matcher
+    if _matcher is None:
+        with _matcher_lock:
+            if _matcher is None:
+                patterns = {category: list(terms) for category, terms in DEFAULT_PATTERNS.items()}
+                if KEYWORD_DICT_PATH:
+                    try:
+                        for category, terms in load_patterns(KEYWORD_DICT_PATH).items():
+                            patterns.setdefault(category, []).extend(terms)
+                    except Exception as e:
+                        logger.error(f"키워드 사전 로드 실패 ({KEYWORD_DICT_PATH}): {e}")
+                _matcher = KeywordMatcher(patterns)
+                logger.info(f"키워드 매처 컴파일: 용어 {len(_matcher)}개")
+    return _matcher
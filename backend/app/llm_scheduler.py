@@ -0,0 +1,326 @@
+# 외부 LLM 호출 스케줄러 (우선순위 입장 제어 + 토큰 버킷 속도 제한)
+#
+# 프로바이더(gemini / openai)마다 스케줄러 하나를 두고 모든 호출이 여기서 차례를 받는다.
+# - 분당 요청 수 / 분당 토큰 수 토큰 버킷과 동시 호출 수 상한
+# - 우선순위: interactive(디렉팅·관점) > default(기사 검색·분석) > background(종합 요약)
+# - 같은 우선순위 안에서는 클라이언트별 라운드 로빈 (한 클라이언트가 큐를 독점하지 못하게)
+# - 429(할당량 초과)를 받으면 프로바이더 전체를 잠시 멈추고 지수 백오프 후 다시 줄을 세운다
+#
+# 토큰 수는 호출 전에 프롬프트 길이로 어림해 먼저 빼고, 응답의 사용량 메타데이터로 차이를 정산한다.
+
+import asyncio
+import contextvars
+import logging
+import random
+import re
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, nullcontext
+from typing import AsyncContextManager, Awaitable, Callable, Dict, Optional
+
+from app.config import (
+    GEMINI_RPM,
+    GEMINI_TPM,
+    OPENAI_RPM,
+    OPENAI_TPM,
+    LLM_WORKERS,
+    LLM_MAX_CONCURRENCY,
+    LLM_QUEUE_LIMIT,
+    LLM_BURST_SECONDS,
+    LLM_MAX_RETRIES,
+    LLM_BACKOFF_BASE,
+    LLM_BACKOFF_MAX,
+)
+from app.metrics import CallbackMetric, Counter, Histogram
+from app.prompt_budget import count_tokens
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE, DEFAULT, BACKGROUND = 0, 1, 2
+PRIORITY_NAMES = ("interactive", "default", "background")
+
+# 지표 단계(stage) 이름 -> 우선순위
+STAGE_PRIORITY = {
+    "llm_call": INTERACTIVE,
+    "llm_stream": INTERACTIVE,
+    "news_search_call": DEFAULT,
+    "article_analysis_call": DEFAULT,
+    "summary_call": BACKGROUND,
+}
+
+# 요청을 보낸 클라이언트 (main 의 미들웨어가 X-Client-Id 헤더나 접속 IP 로 설정)
+current_client: contextvars.ContextVar[str] = contextvars.ContextVar("llm_client", default="anonymous")
+
+QUEUE_WAIT_SECONDS = Histogram("reporter_llm_queue_wait_seconds", "LLM 호출 대기열 대기 시간(초)",
+                               ["provider", "priority"])
+RATE_LIMITED = Counter("reporter_llm_rate_limited_total", "프로바이더가 돌려준 429 응답 수", ["provider"])
+REJECTED = Counter("reporter_llm_rejected_total", "대기열이 가득 차 거절한 LLM 호출 수", ["provider", "priority"])
+
+_schedulers: Dict[str, "LLMScheduler"] = {}
+
+
+class LLMOverloaded(Exception):
+    """대기열이 가득 차서 호출을 받지 않음"""
+
+
+class TokenBucket:
+    """분당 rate 만큼 채워지는 버킷 (최대 capacity, 잔량이 음수면 빚으로 남는다)"""
+
+    def __init__(self, rate_per_minute: float, burst_seconds: float = LLM_BURST_SECONDS):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """amount 를 꺼낼 수 있을 때까지 남은 시간 (버킷이 가득 차 있으면 capacity 보다 커도 허용)"""
+        self._refill(now)
+        needed = min(amount, self.capacity)
+        return 0.0 if self.level >= needed else (needed - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= amount
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """google.genai APIError(code) / openai RateLimitError(status_code) 의 429 판별"""
+    code = getattr(exc, "code", None) or getattr(exc, "status_code", None)
+    return code == 429 or "RESOURCE_EXHAUSTED" in str(exc)
+
+
+def retry_after(exc: BaseException) -> Optional[float]:
+    """응답이 알려 준 재시도 대기 시간(초)"""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        if value:
+            return float(value)
+    except (TypeError, ValueError):
+        pass
+    match = re.search(r"retry_?delay\W+(\d+(?:\.\d+)?)s", str(exc), re.IGNORECASE)
+    return float(match.group(1)) if match else None
+
+
+def estimate_tokens(contents) -> int:
+    """프롬프트 토큰 수 어림값"""
+    return count_tokens(str(contents))
+
+
+class _Waiter:
+    __slots__ = ("future", "tokens", "client", "priority", "enqueued")
+
+    def __init__(self, future: asyncio.Future, tokens: int, client: str, priority: int):
+        self.future = future
+        self.tokens = tokens
+        self.client = client
+        self.priority = priority
+        self.enqueued = time.monotonic()
+
+
+class LLMScheduler:
+    def __init__(self, provider: str, rpm: float, tpm: float, concurrency: int = LLM_MAX_CONCURRENCY,
+                 queue_limit: int = LLM_QUEUE_LIMIT):
+        self.provider = provider
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.concurrency = max(1, concurrency)
+        self.queue_limit = queue_limit
+        # 우선순위별 {클라이언트: 대기 중인 호출}, 클라이언트 순서가 라운드 로빈 순서
+        self._queues = [OrderedDict() for _ in PRIORITY_NAMES]
+        self._queued = [0] * len(PRIORITY_NAMES)
+        self._active = 0
+        self._paused_until = 0.0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.admitted = 0
+        self.rate_limited = 0
+        self.rejected = 0
+        _schedulers[provider] = self
+
+    # --- 대기열 ---
+
+    def _head(self) -> Optional[_Waiter]:
+        """다음 차례 (가장 높은 우선순위의 라운드 로빈 첫 클라이언트, 취소된 호출은 버린다)"""
+        for priority, queue in enumerate(self._queues):
+            while queue:
+                client, waiters = next(iter(queue.items()))
+                while waiters and waiters[0].future.done():
+                    waiters.popleft()
+                    self._queued[priority] -= 1
+                if waiters:
+                    return waiters[0]
+                del queue[client]
+        return None
+
+    def _pop(self, waiter: _Waiter):
+        queue = self._queues[waiter.priority]
+        waiters = queue[waiter.client]
+        waiters.popleft()
+        self._queued[waiter.priority] -= 1
+        if waiters:
+            queue.move_to_end(waiter.client)
+        else:
+            del queue[waiter.client]
+
+    def _remove(self, waiter: _Waiter):
+        """차례를 받기 전에 취소된 호출을 대기열에서 뺀다 (대기 수 상한에 계속 세지 않도록)"""
+        queue = self._queues[waiter.priority]
+        waiters = queue.get(waiter.client)
+        if waiters is None or waiter not in waiters:
+            return  # _head 가 이미 버렸다
+        waiters.remove(waiter)
+        self._queued[waiter.priority] -= 1
+        if not waiters:
+            del queue[waiter.client]
+
+    def _dispatch(self):
+        """동시 호출 수와 버킷이 허락하는 만큼 차례를 넘긴다 (모자라면 타이머로 다시 시도)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._active < self.concurrency:
+            waiter = self._head()
+            if waiter is None:
+                return
+            now = time.monotonic()
+            delay = max(
+                self._paused_until - now,
+                self.requests.wait_time(1, now) if self.requests else 0.0,
+                self.tokens.wait_time(waiter.tokens, now) if self.tokens else 0.0,
+            )
+            if delay > 0:
+                self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+                return
+            self._pop(waiter)
+            if self.requests:
+                self.requests.take(1)
+            if self.tokens:
+                self.tokens.take(waiter.tokens)
+            self._active += 1
+            self.admitted += 1
+            QUEUE_WAIT_SECONDS.observe(now - waiter.enqueued, provider=self.provider,
+                                       priority=PRIORITY_NAMES[waiter.priority])
+            waiter.future.set_result(None)
+
+    async def acquire(self, priority: int = DEFAULT, tokens: int = 1, client: Optional[str] = None) -> _Waiter:
+        """차례가 올 때까지 대기 (대기열이 가득 차면 LLMOverloaded)"""
+        if sum(self._queued) >= self.queue_limit:
+            self.rejected += 1
+            REJECTED.inc(provider=self.provider, priority=PRIORITY_NAMES[priority])
+            raise LLMOverloaded(f"{self.provider} 호출 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.")
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), tokens,
+                         client or current_client.get(), priority)
+        self._queues[priority].setdefault(waiter.client, deque()).append(waiter)
+        self._queued[priority] += 1
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                # 차례를 받은 직후 취소된 경우 자리를 돌려준다
+                self.release(waiter)
+            else:
+                self._remove(waiter)
+                self._dispatch()
+            raise
+        return waiter
+
+    def release(self, waiter: _Waiter, used_tokens: Optional[int] = None):
+        """호출 종료 (used_tokens 를 알면 어림값과의 차이를 토큰 버킷에 정산)"""
+        self._active -= 1
+        if self.tokens and used_tokens is not None:
+            self.tokens.take(used_tokens - waiter.tokens)
+        self._dispatch()
+
+    # --- 429 ---
+
+    def note_rate_limited(self, exc: BaseException, attempt: int = 0) -> float:
+        """429 를 받으면 프로바이더 호출 전체를 백오프 시간만큼 멈춘다 (멈춘 시간 반환)"""
+        self.rate_limited += 1
+        RATE_LIMITED.inc(provider=self.provider)
+        delay = min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)) * random.uniform(0.5, 1.0)
+        delay = max(delay, retry_after(exc) or 0.0)
+        self._paused_until = max(self._paused_until, time.monotonic() + delay)
+        logger.warning(f"{self.provider} 429 응답, {delay:.1f}초 동안 호출 중지 (재시도 {attempt + 1})")
+        return delay
+
+    # --- 호출 ---
+
+    @asynccontextmanager
+    async def slot(self, priority: int = DEFAULT, tokens: int = 1):
+        """스트리밍처럼 재시도할 수 없는 호출용: 블록 실행 동안 자리 하나를 차지한다"""
+        waiter = await self.acquire(priority, tokens)
+        try:
+            yield
+        except Exception as e:
+            if is_rate_limited(e):
+                self.note_rate_limited(e)
+            raise
+        finally:
+            self.release(waiter)
+
+    async def run(self, fn: Callable[..., Awaitable], priority: int = DEFAULT, tokens: int = 1,
+                  usage: Callable[[object], Optional[int]] = lambda result: None,
+                  resource: Optional[Callable[[], AsyncContextManager]] = None):
+        """차례를 받아 fn() 실행, 429 면 백오프 후 같은 우선순위로 다시 줄을 선다
+
+        usage(result) 가 실제 사용 토큰 수를 돌려주면 토큰 버킷을 정산한다.
+        resource(예: MCP 세션 대여)를 주면 시도마다 차례를 기다리기 전에 먼저 잡고 fn(잡은 값) 으로 부른다.
+        자원을 기다리는 동안 스케줄러 자리를 차지하지 않고, 429 백오프 동안에는 자원을 놓는다.
+        """
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            async with (resource() if resource is not None else nullcontext()) as held:
+                waiter = await self.acquire(priority, tokens)
+                used = None
+                try:
+                    result = await (fn(held) if resource is not None else fn())
+                    used = usage(result)
+                    return result
+                except Exception as e:
+                    if not is_rate_limited(e) or attempt == LLM_MAX_RETRIES:
+                        raise
+                    self.note_rate_limited(e, attempt)
+                finally:
+                    self.release(waiter, used)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        return {
+            "active": self._active,
+            "concurrency": self.concurrency,
+            "queued": dict(zip(PRIORITY_NAMES, self._queued)),
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "rejected": self.rejected,
+            "paused_for": round(max(0.0, self._paused_until - now), 2),
+            "request_bucket": round(self.requests.level, 1) if self.requests else None,
+            "token_bucket": round(self.tokens.level, 1) if self.tokens else None,
+        }
+
+
+def get_scheduler(provider: str) -> LLMScheduler:
+    scheduler = _schedulers.get(provider)
+    if scheduler is None:
+        limits = {"gemini": (GEMINI_RPM, GEMINI_TPM), "openai": (OPENAI_RPM, OPENAI_TPM)}
+        rpm, tpm = limits.get(provider, (0, 0))
+        # 버킷은 프로세스 안에만 있으므로 키 전체 한도를 워커 수로 나눈다
+        scheduler = LLMScheduler(provider, rpm / LLM_WORKERS, tpm / LLM_WORKERS)
+    return scheduler
+
+
+def priority_for(stage: str) -> int:
+    return STAGE_PRIORITY.get(stage, DEFAULT)
+
+
+def stats() -> dict:
+    return {name: scheduler.stats() for name, scheduler in _schedulers.items()}
+
+
+CallbackMetric("reporter_llm_queue_depth", "우선순위별 LLM 호출 대기 수", ["provider", "priority"],
+               lambda: {(s.provider, PRIORITY_NAMES[p]): n for s in _schedulers.values() for p, n in enumerate(s._queued)})
+CallbackMetric("reporter_llm_active_slots", "스케줄러가 내준 진행 중인 LLM 호출 수", ["provider"],
+               lambda: {(s.provider,): s._active for s in _schedulers.values()})
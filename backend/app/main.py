@@ -1,7 +1,63 @@
+import asyncio
+import logging
+import sys
+import time
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
+from starlette.datastructures import Headers
 from app.api import router
-import uvicorn
+from app.config import validate_config
+from app.mcp_pool import get_naver_pool, close_naver_pool
+from app.bm25 import get_bm25_index
+from app.vector_index import get_vector_index
+from app.segments import get_segments
+from app.near_dup import get_corpus_signatures
+from app.stats_cube import get_stats_cube
+from app.gemini_utils import get_client
+from app import metrics
+from app.llm_scheduler import current_client
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up():
+    """무거운 초기화(유사 사건 BM25/벡터 색인, MinHash 서명, 추가 세그먼트, 통계 큐브, Gemini SDK, MCP 세션)를 백그라운드에서 미리 수행
+
+    서버는 이 작업을 기다리지 않고 바로 요청을 받는다. 준비 전에 들어온 요청은
+    각 모듈이 첫 사용 시점에 직접 초기화한다.
+    """
+    for name, step in (
+        ("bm25_index", lambda: asyncio.to_thread(get_bm25_index)),
+        ("vector_index", lambda: asyncio.to_thread(get_vector_index)),
+        ("minhash", lambda: asyncio.to_thread(get_corpus_signatures)),
+        ("segments", lambda: asyncio.to_thread(get_segments)),
+        ("stats_cube", lambda: asyncio.to_thread(get_stats_cube)),
+        ("gemini_client", lambda: asyncio.to_thread(get_client)),
+        ("naver_mcp_pool", lambda: get_naver_pool().start()),
+    ):
+        started = time.perf_counter()
+        try:
+            await step()
+            logger.info(f"워밍업 {name}: {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logger.error(f"워밍업 {name} 실패: {e}")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """앱 수명 주기: 설정 검증 후 백그라운드 워밍업을 시작하고 종료 시 정리"""
+    validate_config()
+    warm_up_task = asyncio.create_task(warm_up())
+    try:
+        yield
+    finally:
+        warm_up_task.cancel()
+        await close_naver_pool()
+        if "app.openai_utils" in sys.modules:
+            await sys.modules["app.openai_utils"].close_client()
+
 
 # FastAPI 앱 생성
 app = FastAPI(
@@ -29,6 +85,7 @@ app = FastAPI(
     license_info={
         "name": "MIT License",
     },
+    lifespan=lifespan,
 )
 
 # 라우터 등록 전에 CORS 미들웨어 추가
@@ -40,11 +97,68 @@ app.add_middleware(
     allow_headers=["*"],  # 모든 헤더 허용
 )
 
+def route_label(scope) -> str:
+    """지표 라벨용 경로 (라우트에 매칭되지 않은 요청은 하나로 묶어 라벨 수를 제한)"""
+    return scope["path"] if scope.get("route") is not None else "other"
+
+class RequestMetricsMiddleware:
+    """요청별 처리 시간, 상태 코드, 처리 중인 요청 수 기록 (LLM 스케줄러 공정 큐잉용 클라이언트도 지정)
+
+    순수 ASGI 미들웨어라 스트리밍 응답도 첫 바이트가 아니라 마지막 본문 조각을 보낼 때까지 잰다.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        client = scope.get("client")
+        current_client.set(Headers(scope=scope).get("x-client-id") or (client[0] if client else "anonymous"))
+        status_code = 500
+        recorded = False
+
+        def record():
+            nonlocal recorded
+            if recorded:
+                return
+            recorded = True
+            route = route_label(scope)
+            metrics.HTTP_SECONDS.observe(time.perf_counter() - started, route=route, method=scope["method"])
+            metrics.HTTP_REQUESTS.inc(route=route, method=scope["method"], status=status_code)
+
+        async def send_and_time(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                record()
+
+        with metrics.HTTP_IN_FLIGHT.track_inprogress():
+            try:
+                await self.app(scope, receive, send_and_time)
+            finally:
+                record()
+
+app.add_middleware(RequestMetricsMiddleware)
+
+# Prometheus 지표
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # 헬스 체크 엔드포인트
 @app.get("/health")
 @app.get("/api/health")  # 두 경로 모두 지원
 async def health_check():
-    return {"status": "healthy", "message": "API server is running"}
+    return {
+        "status": "healthy",
+        "message": "API server is running",
+        "naver_mcp_pool": get_naver_pool().stats(),
+    }
 
 # 루트 경로
 @app.get("/")
@@ -59,6 +173,8 @@ async def root():
 app.include_router(router, prefix="/api")
 
 if __name__ == "__main__":
+    import uvicorn
+
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
@@ -0,0 +1,288 @@
+# 네이버 검색 MCP 서버 세션 풀
+#
+# 요청마다 npx 프로세스를 띄우고 initialize 핸드셰이크를 반복하지 않도록
+# 오래 살아있는 ClientSession 들을 풀로 관리한다.
+
+import asyncio
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import TYPE_CHECKING, Optional
+
+from app.config import (
+    NAVER_CLIENT_ID,
+    NAVER_CLIENT_SECRET,
+    NAVER_MCP_COMMAND,
+    NAVER_MCP_ARGS,
+    NAVER_MCP_PASS_ENV,
+    NAVER_MCP_POOL_SIZE,
+    NAVER_MCP_HEALTH_INTERVAL,
+    NAVER_MCP_PING_TIMEOUT,
+    NAVER_MCP_ACQUIRE_TIMEOUT,
+)
+from app.metrics import STAGE_SECONDS, CallbackMetric, time_stage
+
+if TYPE_CHECKING:
+    from mcp import ClientSession, StdioServerParameters
+
+logger = logging.getLogger(__name__)
+
+
+def naver_server_params() -> "StdioServerParameters":
+    """네이버 검색 MCP 서버 실행 파라미터 (mcp 패키지는 처음 쓸 때 임포트)"""
+    from mcp import StdioServerParameters
+    return StdioServerParameters(
+        command=NAVER_MCP_COMMAND,
+        args=NAVER_MCP_ARGS,
+        env={
+            **{name: os.environ[name] for name in NAVER_MCP_PASS_ENV if name in os.environ},
+            "NAVER_CLIENT_ID": NAVER_CLIENT_ID,
+            "NAVER_CLIENT_SECRET": NAVER_CLIENT_SECRET,
+        }
+    )
+
+
+class PooledSession:
+    """MCP 서버 프로세스 하나와 그 위의 ClientSession
+
+    stdio_client / ClientSession 컨텍스트는 같은 태스크 안에서 열고 닫아야 하므로
+    전용 태스크가 컨텍스트를 붙잡고 있다가 close() 시점에 정리한다.
+    """
+
+    def __init__(self, server_params: "StdioServerParameters"):
+        self._server_params = server_params
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._error: Optional[BaseException] = None
+        self.session: Optional["ClientSession"] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.session is None:
+            raise RuntimeError(f"MCP 서버 시작 실패: {self._error}")
+
+    async def _run(self):
+        from mcp import ClientSession
+        from mcp.client.stdio import stdio_client
+        try:
+            async with stdio_client(self._server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+            logger.warning(f"MCP 세션 종료: {e}")
+        finally:
+            self.session = None
+            self._ready.set()
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def ping(self, timeout: float = NAVER_MCP_PING_TIMEOUT) -> bool:
+        """세션 헬스 체크"""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=timeout)
+            return True
+        except Exception as e:
+            logger.warning(f"MCP 세션 ping 실패: {e}")
+            return False
+
+    async def close(self, timeout: float = 5.0):
+        self._closing.set()
+        if self._task is None or self._task.done():
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except (asyncio.TimeoutError, Exception):
+            self._task.cancel()
+
+
+class MCPSessionPool:
+    """크기가 제한된 MCP 세션 풀
+
+    - 동시에 빌려줄 수 있는 세션 수(=띄울 수 있는 프로세스 수)는 size 로 제한
+    - 놀고 있는 세션은 주기적으로 ping 해서 죽은 세션은 교체
+    - 사용 중 오류가 난 세션은 ping 으로 확인 후 죽었으면 폐기 (다음 요청에서 재시작)
+    """
+
+    def __init__(self, server_params: "StdioServerParameters", size: int = NAVER_MCP_POOL_SIZE,
+                 health_interval: float = NAVER_MCP_HEALTH_INTERVAL):
+        self._server_params = server_params
+        self.size = max(1, size)
+        self._health_interval = health_interval
+        self._slots = asyncio.Semaphore(self.size)
+        self._idle: "asyncio.Queue[PooledSession]" = asyncio.Queue()
+        self._sessions: set = set()
+        self._spawning = 0                    # 띄우는 중인 세션 수 (살아있는 세션 수에 포함)
+        self._changed = asyncio.Condition()   # 세션 반납/폐기 알림
+        self._health_task: Optional[asyncio.Task] = None
+        self._closed = False
+        self.restarts = 0
+
+    async def start(self, warm: int = 1):
+        """풀 시작: warm 개수만큼 미리 세션을 띄우고 헬스 체크 루프 시작"""
+        self._closed = False
+        for _ in range(min(warm, self.size)):
+            try:
+                self._idle.put_nowait(await self._spawn())
+            except Exception as e:
+                logger.error(f"MCP 세션 예열 실패: {e}")
+        if self._health_interval > 0 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self):
+        self._closed = True
+        if self._health_task is not None:
+            self._health_task.cancel()
+            self._health_task = None
+        sessions = list(self._sessions)
+        self._sessions.clear()
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        await asyncio.gather(*(s.close() for s in sessions), return_exceptions=True)
+
+    async def _spawn(self) -> PooledSession:
+        pooled = PooledSession(self._server_params)
+        with time_stage("mcp_session_setup"):
+            await pooled.start()
+        self._sessions.add(pooled)
+        logger.info(f"MCP 세션 생성 (현재 {len(self._sessions)}/{self.size})")
+        return pooled
+
+    def _live(self) -> int:
+        return len(self._sessions) + self._spawning
+
+    async def _discard(self, pooled: PooledSession):
+        self._sessions.discard(pooled)
+        await pooled.close()
+        await self._notify()
+
+    async def _release(self, pooled: PooledSession):
+        """놀고 있는 세션으로 되돌림 (size 를 넘는 세션은 닫는다)"""
+        if len(self._sessions) > self.size:
+            await self._discard(pooled)
+            return
+        self._idle.put_nowait(pooled)
+        await self._notify()
+
+    async def _notify(self):
+        async with self._changed:
+            self._changed.notify_all()
+
+    async def _checkout(self) -> PooledSession:
+        """놀고 있는 세션을 꺼내고, 없으면 살아있는 세션이 size 보다 적을 때만 새로 띄운다
+
+        헬스 체크가 ping 하느라 잠시 꺼내 둔 세션이 있으면 새로 띄우지 않고 돌아올 때까지 기다린다.
+        """
+        async with self._changed:
+            while True:
+                while not self._idle.empty():
+                    pooled = self._idle.get_nowait()
+                    if pooled.alive:
+                        return pooled
+                    self.restarts += 1
+                    self._sessions.discard(pooled)
+                    await pooled.close()
+                if self._live() < self.size:
+                    break
+                await self._changed.wait()
+            self._spawning += 1
+        try:
+            return await self._spawn()
+        finally:
+            self._spawning -= 1
+
+    @asynccontextmanager
+    async def session(self, timeout: Optional[float] = NAVER_MCP_ACQUIRE_TIMEOUT):
+        """풀에서 세션을 빌려 쓰고 반납 (timeout 초 안에 빌리지 못하면 TimeoutError)"""
+        if self._closed:
+            raise RuntimeError("MCP 세션 풀이 종료되었습니다.")
+        acquire_started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"MCP 세션을 {timeout:g}초 안에 빌리지 못했습니다.") from None
+        try:
+            pooled = await self._checkout()
+            STAGE_SECONDS.observe(time.perf_counter() - acquire_started, stage="mcp_session_acquire")
+            healthy = True
+            try:
+                yield pooled.session
+            except BaseException:
+                healthy = await pooled.ping()
+                raise
+            finally:
+                if healthy and pooled.alive and not self._closed:
+                    await self._release(pooled)
+                else:
+                    self.restarts += 1
+                    await self._discard(pooled)
+        finally:
+            self._slots.release()
+
+    async def _health_loop(self):
+        while True:
+            await asyncio.sleep(self._health_interval)
+            try:
+                await self.check_health()
+            except Exception as e:
+                logger.error(f"MCP 헬스 체크 오류: {e}")
+
+    async def check_health(self):
+        """놀고 있는 세션들을 ping 해서 죽은 세션 폐기"""
+        checked = []
+        while not self._idle.empty():
+            checked.append(self._idle.get_nowait())
+        for pooled in checked:
+            if await pooled.ping():
+                await self._release(pooled)
+            else:
+                self.restarts += 1
+                await self._discard(pooled)
+
+    def stats(self) -> dict:
+        return {
+            "size": self.size,
+            "sessions": len(self._sessions),
+            "idle": self._idle.qsize(),
+            "restarts": self.restarts,
+        }
+
+
+_naver_pool: Optional[MCPSessionPool] = None
+
+
+def get_naver_pool() -> MCPSessionPool:
+    """네이버 검색 MCP 세션 풀 (프로세스당 하나)"""
+    global _naver_pool
+    if _naver_pool is None:
+        _naver_pool = MCPSessionPool(naver_server_params())
+    return _naver_pool
+
+
+def _pool_metrics() -> dict:
+    if _naver_pool is None:
+        return {}
+    stats = _naver_pool.stats()
+    return {(state,): stats[state] for state in ("size", "sessions", "idle")}
+
+
+CallbackMetric("reporter_mcp_pool_sessions", "네이버 MCP 세션 풀 상태별 세션 수", ["state"], _pool_metrics)
+CallbackMetric("reporter_mcp_pool_restarts_total", "네이버 MCP 세션 재시작 수", [],
+               lambda: {(): _naver_pool.restarts} if _naver_pool is not None else {}, kind="counter")
+
+
+async def close_naver_pool():
+    global _naver_pool
+    if _naver_pool is not None:
+        await _naver_pool.close()
+        _naver_pool = None
@@ -0,0 +1,228 @@
+# 단계별 지연 시간 / 토큰 / 동시 처리 지표
+#
+# Prometheus 텍스트 형식(0.0.4)으로 /metrics 에 노출한다.
+# 외부 의존성 없이 Counter / Gauge / Histogram 만 간단히 구현한다.
+
+import math
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# LLM 호출은 수 초 단위까지 길어지므로 기본 버킷을 넉넉하게 잡는다
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+_registry: List["_Metric"] = []
+
+INF_LABEL = 'le="+Inf"'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, help: str, labelnames: Iterable[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _key(self, labels: dict) -> Tuple[str, ...]:
+        return tuple(str(labels.get(n, "")) for n in self.labelnames)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        return "\n".join(lines + self.samples())
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    @contextmanager
+    def track_inprogress(self, **labels):
+        """블록 실행 중에만 1 증가"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class CallbackMetric(_Metric):
+    """렌더링 시점에 fn() 으로 값을 읽는 지표 (fn 은 {라벨 값 튜플: 값} 반환)
+
+    다른 모듈이 이미 들고 있는 카운터(캐시 적중 수, 풀 크기 등)를 그대로 노출할 때 쓴다.
+    """
+
+    def __init__(self, name, help, labelnames, fn: Callable[[], Dict[Tuple[str, ...], float]],
+                 kind: str = "gauge"):
+        super().__init__(name, help, labelnames)
+        self.kind = kind
+        self._fn = fn
+
+    def samples(self):
+        try:
+            items = sorted(self._fn().items())
+        except Exception:
+            return []
+        return [f"{self.name}{_format_labels(self.labelnames, k)} {_format_value(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 값 -> [버킷별 개수..., 합계, 개수]
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """블록 실행 시간(초) 기록 (예외가 나도 기록)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        lines = []
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, INF_LABEL)} {state[-1]}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(state[-2])}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {state[-1]}")
+        return lines
+
+
+def render() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로"""
+    return "\n".join(metric.render() for metric in _registry) + "\n"
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# 처리 단계별 지연 시간
+# - llm_call: 프로바이더를 거친 LLM 호출 (디렉팅/관점)
+# - llm_stream: 디렉팅 스트리밍 전체
+# - article_analysis_call: 기사 한 건 분석 호출
+# - news_search_call: 네이버 검색 (Gemini 도구 호출 왕복 + MCP 도구 실행)
+# - mcp_session_acquire: 풀에서 세션을 빌리기까지 대기
+# - mcp_session_setup: MCP 서버 프로세스 실행 + initialize 핸드셰이크
+# - json_parse: LLM 응답 JSON 파싱
+# - summary_call: 기사 종합 분석 호출
+# - response_build: API 응답 모델 구성
+STAGE_SECONDS = Histogram("reporter_stage_duration_seconds", "처리 단계별 소요 시간(초)", ["stage"])
+
+LLM_TOKENS = Counter("reporter_llm_tokens_total", "LLM 사용량 메타데이터 기준 토큰 수", ["provider", "model", "type"])
+LLM_CALLS = Counter("reporter_llm_calls_total", "LLM 호출 수", ["provider", "stage", "outcome"])
+LLM_IN_FLIGHT = Gauge("reporter_llm_in_flight", "진행 중인 LLM 호출 수", ["provider"])
+
+HTTP_IN_FLIGHT = Gauge("reporter_http_requests_in_flight", "처리 중인 HTTP 요청 수")
+HTTP_REQUESTS = Counter("reporter_http_requests_total", "HTTP 요청 수", ["route", "method", "status"])
+HTTP_SECONDS = Histogram("reporter_http_request_duration_seconds", "HTTP 요청 처리 시간(초)", ["route", "method"])
+
+
+def time_stage(stage: str):
+    """with time_stage("json_parse"): ... 형태로 단계 소요 시간 기록"""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+@contextmanager
+def track_llm_call(provider: str, stage: str):
+    """LLM 호출 한 번의 소요 시간, 진행 중 개수, 성공/실패 수 기록"""
+    outcome = "error"
+    with LLM_IN_FLIGHT.track_inprogress(provider=provider), time_stage(stage):
+        try:
+            yield
+            outcome = "ok"
+        finally:
+            LLM_CALLS.inc(provider=provider, stage=stage, outcome=outcome)
+
+
+def record_gemini_usage(model: str, response):
+    """Gemini 응답의 usage_metadata 에서 입력/출력 토큰 수 기록"""
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return
+    for kind, field in (("prompt", "prompt_token_count"), ("response", "candidates_token_count")):
+        count = getattr(usage, field, None)
+        if count:
+            LLM_TOKENS.inc(count, provider="gemini", model=model, type=kind)
+
+
+def record_openai_usage(model: str, response):
+    """OpenAI 응답의 usage 에서 입력/출력 토큰 수 기록"""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    for kind, field in (("prompt", "prompt_tokens"), ("response", "completion_tokens")):
+        count = getattr(usage, field, None)
+        if count:
+            LLM_TOKENS.inc(count, provider="openai", model=model, type=kind)
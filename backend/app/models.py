@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from typing import Annotated, List, Optional, Dict
 
 # 요청 모델들
 class SituationRequest(BaseModel):
@@ -9,6 +9,25 @@ class PerspectiveRequest(BaseModel):
     situation: str = Field(..., description="현장 상황 설명")
     perspective: str = Field(..., description="분석 관점", example="사회적 관점")
 
+class PerspectiveBatchRequest(BaseModel):
+    situation: str = Field(..., description="현장 상황 설명")
+    perspectives: List[Annotated[str, Field(max_length=100)]] = Field(
+        ..., min_length=1, max_length=10, description="분석 관점 목록 (최대 10개, 관점당 100자 이내)",
+        example=["사회적 관점", "법적 관점"])
+
+class SimilarCaseRequest(BaseModel):
+    situation: str = Field(..., description="현장 상황 설명")
+    limit: int = Field(5, ge=1, le=20, description="반환할 사건 수")
+
+class IngestArticle(BaseModel):
+    category: str = Field(..., max_length=50, description="카테고리 (예: accident)", example="accident")
+    date: str = Field("", max_length=30, description="기사 날짜", example="2024-05-01")
+    title: str = Field(..., min_length=1, max_length=300, description="기사 제목 (300자 이내)")
+    body_prep: str = Field(..., min_length=1, max_length=20000, description="전처리된 기사 본문 (2만 자 이내)")
+
+class IngestRequest(BaseModel):
+    articles: List[IngestArticle] = Field(..., min_length=1, max_length=500, description="추가할 기사 목록 (최대 500건)")
+
 class TopicRequest(BaseModel):
     topic: str
 
@@ -29,6 +48,8 @@ class SimilarCase(BaseModel):
     date: str = Field(..., description="사건 날짜", example="2023-11-12")
     title: str = Field(..., description="사건 제목")
     summary: str = Field(..., description="사건 요약")
+    score: Optional[float] = Field(None, description="유사도 점수 (BM25 또는 코사인 유사도)")
+    source: Optional[str] = Field(None, description="출처 CSV 파일")
 
 class NewsArticle(BaseModel):
     title: str
@@ -38,14 +59,18 @@ class NewsArticle(BaseModel):
     summary: Optional[str] = None
     content: Optional[str] = None
 
-class ArticleAnalysis(BaseModel):
-    article_index: int  # NewsArticle의 인덱스
+class ArticleAnalysisContent(BaseModel):
+    # Gemini 기사 분석 응답 스키마 (article_index 는 서버에서 붙인다)
     title: str
     angles: List[str]
     issues: List[str]
     framing: Optional[str] = None
     implications: List[str]
 
+class ArticleAnalysis(ArticleAnalysisContent):
+    article_index: int  # NewsArticle의 인덱스
+    duplicates: List[int] = Field(default_factory=list, description="이 기사와 거의 같아 분석을 생략한 기사 인덱스")
+
 # 1단계: 네이버 뉴스 검색 결과 반환
 class NewsSearchResponse(BaseModel):
     news_articles: str  # 네이버 뉴스에서 검색된 기사 원문 텍스트
@@ -58,6 +83,7 @@ class NewsAnalyzeRequest(BaseModel):
 class NewsAnalyzeResponse(BaseModel):
     article_analyses: List[ArticleAnalysis]
     summary: str
+    partial: bool = Field(False, description="처리 시간 예산을 넘겨 일부 기사 분석이나 종합 분석이 빠졌는지")
 
 class Perspective(BaseModel):
     viewpoint: str
@@ -68,6 +94,27 @@ class Perspective(BaseModel):
 class PerspectiveResponse(BaseModel):
     perspectives: List[Perspective]
 
+class StatisticsResponse(BaseModel):
+    total: int = Field(..., description="조건에 맞는 기사 수")
+    by_category: Dict[str, int] = Field(..., description="카테고리별 기사 수")
+    by_month: Dict[str, int] = Field(..., description="월(YYYY-MM)별 기사 수")
+    by_region: Dict[str, int] = Field(..., description="지역 키워드가 나온 기사 수")
+    by_topic: Dict[str, int] = Field(default_factory=dict,
+                                     description="키워드 사전 카테고리(범죄/음주/장소/법적, KEYWORD_DICT_PATH)의 용어가 나온 기사 수")
+
+class IngestResponse(BaseModel):
+    segment: str = Field(..., description="새로 만든 세그먼트 이름")
+    rows: int = Field(..., description="추가된 기사 수")
+    segments: int = Field(..., description="활성 세그먼트 수")
+
+class PerspectiveResult(BaseModel):
+    perspective: str = Field(..., description="요청한 관점")
+    elapsed_ms: float = Field(..., description="해당 관점 분석 소요 시간(ms)")
+    error: Optional[str] = Field(None, description="실패한 경우 오류 메시지")
+
+class PerspectiveBatchResponse(PerspectiveResponse):
+    results: List[PerspectiveResult] = Field(..., description="관점별 소요 시간과 오류")
+
 # 에러 응답 모델
 class ErrorResponse(BaseModel):
     error: str = Field(..., description="에러 메시지")
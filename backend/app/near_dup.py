@@ -0,0 +1,254 @@
+# 거의 같은 기사 묶기 (MinHash + LSH)
+#
+# 네이버 검색은 연합뉴스 기사를 받아 조금 고쳐 쓴 기사들을 서로 다른 "유사 기사"로 돌려주고,
+# 유사 사건 검색도 카테고리 CSV 가 달라 두 번 들어간 같은 기사를 함께 돌려준다.
+# 텍스트를 공백/문장부호를 뺀 문자 SHINGLE_SIZE-gram 집합으로 보고 MinHash 서명을 만든 뒤,
+# 서명을 MINHASH_BANDS 개 띠로 나눠 한 띠라도 같은 것만 후보로 삼고(LSH),
+# 서명 일치 비율(자카드 유사도 추정치)이 NEAR_DUP_THRESHOLD 이상이면 앞서 나온 대표 기사의 사본으로 본다.
+#
+# 오프라인 코퍼스의 서명은 MINHASH_DIR 에 .npy 로 저장해 np.load(mmap_mode="r") 로 연다.
+# 오프라인 빌드: python -m app.near_dup
+
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import threading
+import unicodedata
+import zlib
+from collections import defaultdict
+from typing import Callable, List, Optional
+
+import numpy as np
+
+from app.config import MINHASH_DIR, MINHASH_PERMUTATIONS, MINHASH_BANDS, NEAR_DUP_THRESHOLD
+from app.corpus import Corpus, get_corpus, manifest_key
+from app.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+MINHASH_VERSION = 1
+SHINGLE_SIZE = 4
+HASH_SEED = 20240601
+PRIME = 4294967291  # 2^32 보다 작은 가장 큰 소수 (서명 값이 uint32 에 들어간다)
+EMPTY = np.uint32(0xFFFFFFFF)  # 글자가 없는 텍스트의 서명 값 (어떤 것과도 같은 기사로 보지 않는다)
+
+NEAR_DUPLICATES = Counter("reporter_near_duplicates_total", "거의 같은 기사로 묶여 빠진 수", ["source"])
+
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def shingle_hashes(text: str, size: int = SHINGLE_SIZE) -> np.ndarray:
+    """공백/문장부호를 뺀 문자 size-gram 의 crc32 (중복 제거)"""
+    text = _NON_WORD.sub("", unicodedata.normalize("NFC", text or "").lower())
+    if not text:
+        return np.zeros(0, dtype=np.uint64)
+    if len(text) <= size:
+        return np.asarray([zlib.crc32(text.encode("utf-8"))], dtype=np.uint64)
+    hashes = {zlib.crc32(text[i:i + size].encode("utf-8")) for i in range(len(text) - size + 1)}
+    return np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+
+
+class MinHasher:
+    """h(x) = (a * x + b) mod PRIME 해시 num_perm 개의 최솟값 서명"""
+
+    def __init__(self, num_perm: int = MINHASH_PERMUTATIONS, seed: int = HASH_SEED):
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.seed = seed
+        # a < 2^31, x < 2^32 이므로 a * x + b 가 uint64 를 넘지 않는다
+        self.a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)[:, None]
+        self.b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)[:, None]
+
+    @property
+    def name(self) -> str:
+        return f"minhash-{self.num_perm}-{SHINGLE_SIZE}-{self.seed}"
+
+    def signature(self, text: str) -> np.ndarray:
+        shingles = shingle_hashes(text)
+        if not len(shingles):
+            return np.full(self.num_perm, EMPTY, dtype=np.uint32)
+        return ((self.a * shingles[None, :] + self.b) % PRIME).min(axis=1).astype(np.uint32)
+
+    def signatures(self, texts: List[str]) -> np.ndarray:
+        result = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for i, text in enumerate(texts):
+            result[i] = self.signature(text)
+        return result
+
+
+_hasher: Optional[MinHasher] = None
+
+
+def get_hasher() -> MinHasher:
+    global _hasher
+    if _hasher is None:
+        _hasher = MinHasher()
+    return _hasher
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """서명 일치 비율 = 자카드 유사도 추정치 (빈 텍스트는 0)"""
+    if a[0] == EMPTY or b[0] == EMPTY:
+        return 0.0
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+class NearDuplicateFilter:
+    """서명을 들어오는 순서대로 받아, 앞서 받은 대표와 거의 같으면 그 대표의 순번을 돌려준다
+
+    대표 서명만 띠별 버킷에 넣고, 새 서명과 띠가 하나라도 같은 대표하고만 유사도를 비교한다.
+    """
+
+    def __init__(self, threshold: float = NEAR_DUP_THRESHOLD, bands: int = MINHASH_BANDS):
+        self.threshold = threshold
+        self.bands = bands
+        self._buckets = defaultdict(list)  # (띠 번호, 띠 값) -> 대표 순번
+        self._signatures: List[np.ndarray] = []
+
+    def _band_keys(self, signature: np.ndarray):
+        rows = len(signature) // self.bands
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, signature: np.ndarray) -> Optional[int]:
+        """같은 기사로 볼 앞선 대표의 순번, 새 대표면 None"""
+        signature = np.asarray(signature)
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        if signature[0] == EMPTY:
+            return None
+        keys = self._band_keys(signature)
+        checked = set()
+        for key in keys:
+            for rep in self._buckets.get(key, ()):
+                if rep not in checked:
+                    checked.add(rep)
+                    if similarity(signature, self._signatures[rep]) >= self.threshold:
+                        return rep
+        for key in keys:
+            self._buckets[key].append(position)
+        return None
+
+
+def cluster_labels(signatures: np.ndarray) -> List[int]:
+    """항목별 대표 순번 (대표 자신은 자기 순번, 앞쪽 항목이 대표가 된다)"""
+    seen = NearDuplicateFilter()
+    labels = []
+    for i, signature in enumerate(signatures):
+        rep = seen.add(signature)
+        labels.append(i if rep is None else rep)
+    return labels
+
+
+def unique_hits(hits: list, signature_of: Callable, source: str) -> list:
+    """점수순 검색 결과에서 앞쪽 결과와 거의 같은 항목을 뺀다 (signature_of(hit) -> 서명)"""
+    seen = NearDuplicateFilter()
+    result = [hit for hit in hits if seen.add(signature_of(hit)) is None]
+    if len(result) < len(hits):
+        NEAR_DUPLICATES.inc(len(hits) - len(result), source=source)
+    return result
+
+
+class CorpusSignatures:
+    """코퍼스 행별 MinHash 서명 (title + body_prep)"""
+
+    def __init__(self, corpus: Corpus, signatures: np.ndarray, key: str):
+        self.corpus = corpus
+        self.signatures = signatures  # 행 x num_perm (uint32)
+        self.key = key                # 코퍼스 지문 + 해시 설정
+
+    def __len__(self):
+        return len(self.signatures)
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        return self.signatures[row]
+
+    @classmethod
+    def build(cls, corpus: Corpus = None, hasher: MinHasher = None) -> "CorpusSignatures":
+        corpus = corpus or get_corpus()
+        hasher = hasher or get_hasher()
+        titles, bodies = corpus.column("title"), corpus.column("body_prep")
+        signatures = np.empty((len(corpus), hasher.num_perm), dtype=np.uint32)
+        for row, (title, body) in enumerate(zip(titles, bodies)):
+            signatures[row] = hasher.signature(f"{title} {body}")
+        logger.info(f"MinHash 서명 생성: 문서 {len(corpus)}건, 해시 {hasher.num_perm}개")
+        return cls(corpus, signatures, signature_key(corpus, hasher))
+
+    def save(self, root: str = MINHASH_DIR):
+        os.makedirs(root, exist_ok=True)
+        target = os.path.join(root, self.key)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{self.key}.", dir=root)
+        try:
+            np.save(os.path.join(tmp_dir, "signatures.npy"), self.signatures)
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"version": MINHASH_VERSION}, f)
+            if os.path.exists(target):
+                shutil.rmtree(target, ignore_errors=True)
+            os.rename(tmp_dir, target)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        for name in os.listdir(root):
+            if name != self.key and not name.startswith("."):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    @classmethod
+    def load(cls, corpus: Corpus = None, hasher: MinHasher = None,
+             root: str = MINHASH_DIR) -> Optional["CorpusSignatures"]:
+        """코퍼스와 해시 설정에 맞는 서명이 저장되어 있으면 연다 (없으면 None)"""
+        corpus = corpus or get_corpus()
+        key = signature_key(corpus, hasher or get_hasher())
+        path = os.path.join(root, key)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                if json.load(f).get("version") != MINHASH_VERSION:
+                    return None
+            signatures = np.load(os.path.join(path, "signatures.npy"), mmap_mode="r")
+            if len(signatures) != len(corpus):
+                return None
+            return cls(corpus, signatures, key)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"MinHash 서명 로드 실패: {e}")
+            return None
+
+
+def signature_key(corpus: Corpus, hasher: MinHasher) -> str:
+    payload = f"{MINHASH_VERSION}:{manifest_key(corpus.manifest)}:{hasher.name}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+_signatures: Optional[CorpusSignatures] = None
+_signatures_lock = threading.Lock()
+
+
+def get_corpus_signatures() -> CorpusSignatures:
+    """코퍼스 MinHash 서명 (코퍼스가 바뀌었으면 다시 만들어 저장)"""
+    global _signatures
+    corpus = get_corpus()
+    if _signatures is not None and _signatures.corpus is corpus:
+        return _signatures
+    with _signatures_lock:
+        if _signatures is not None and _signatures.corpus is corpus:
+            return _signatures
+        signatures = CorpusSignatures.load(corpus)
+        if signatures is None:
+            signatures = CorpusSignatures.build(corpus)
+            try:
+                signatures.save()
+            except OSError as e:
+                logger.warning(f"MinHash 서명 저장 실패: {e}")
+        _signatures = signatures
+        return _signatures
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    signatures = CorpusSignatures.build()
+    signatures.save()
+    labels = cluster_labels(signatures.signatures)
+    duplicates = sum(1 for i, label in enumerate(labels) if label != i)
+    print(f"MinHash 서명 저장 완료: {MINHASH_DIR} (문서 {len(signatures)}건, 거의 같은 기사 {duplicates}건)")
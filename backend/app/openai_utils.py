@@ -1,47 +1,93 @@
-# OpenAI API 연동 유틸 (더미 함수)
+# OpenAI API 연동 유틸
+#
+# 비동기 OpenAI 클라이언트를 사용해 이벤트 루프를 막지 않는다.
+# HTTP 커넥션 풀은 프로세스 안에서 공유한다.
 
 import os
-import json
-import re
-from openai import OpenAI
-from app.config import AZURE_OPENAI_API_KEY
-from app.data_utils import search_similar_cases
+import asyncio
+import httpx
+from openai import AsyncOpenAI
+from app.config import (
+    AZURE_OPENAI_API_KEY,
+    OPENAI_MODEL,
+    OPENAI_BASE_URL,
+    OPENAI_TIMEOUT,
+    OPENAI_CONNECT_TIMEOUT,
+    OPENAI_MAX_CONNECTIONS,
+    OPENAI_MAX_KEEPALIVE,
+    OPENAI_MAX_RETRIES,
+)
+from app.data_utils import search_similar_cases, get_statistics
+from app.metrics import track_llm_call, record_openai_usage
+from app.llm_scheduler import get_scheduler, priority_for, estimate_tokens
+from app.json_repair import parse_json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 공유 HTTP 커넥션 풀 (keep-alive 재사용, 연결/전체 타임아웃 분리)
+http_client = httpx.AsyncClient(
+    limits=httpx.Limits(
+        max_connections=OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=OPENAI_MAX_KEEPALIVE,
+        keepalive_expiry=30.0,
+    ),
+    timeout=httpx.Timeout(OPENAI_TIMEOUT, connect=OPENAI_CONNECT_TIMEOUT),
+)
+
 # OpenAI 클라이언트 초기화
 try:
-    client = OpenAI(api_key=AZURE_OPENAI_API_KEY)
+    client = AsyncOpenAI(
+        api_key=AZURE_OPENAI_API_KEY,
+        base_url=OPENAI_BASE_URL,
+        http_client=http_client,
+        max_retries=OPENAI_MAX_RETRIES,
+    )
     logger.info("OpenAI 클라이언트 초기화 성공")
 except Exception as e:
     logger.error(f"OpenAI 클라이언트 초기화 실패: {e}")
     client = None
 
+async def close_client():
+    """공유 HTTP 커넥션 풀 정리 (앱 종료 시)"""
+    await http_client.aclose()
+
+async def complete(prompt: str, system: str = None, temperature: float = 0.7, max_tokens: int = 2000,
+                   json_mode: bool = False) -> str:
+    """채팅 완성 한 번 호출 후 텍스트 반환 (json_mode 면 JSON 객체로만 응답하도록 강제)"""
+    if not client:
+        raise RuntimeError("OpenAI API 클라이언트가 초기화되지 않았습니다.")
+    messages = []
+    if system:
+        messages.append({"role": "system", "content": system})
+    messages.append({"role": "user", "content": prompt})
+
+    async def call():
+        with track_llm_call("openai", "llm_call"):
+            return await client.chat.completions.create(
+                model=OPENAI_MODEL,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                **({"response_format": {"type": "json_object"}} if json_mode else {})
+            )
+
+    response = await get_scheduler("openai").run(
+        call, priority_for("llm_call"), estimate_tokens(messages) + max_tokens,
+        usage=lambda r: getattr(getattr(r, "usage", None), "total_tokens", None),
+    )
+    record_openai_usage(OPENAI_MODEL, response)
+    return (response.choices[0].message.content or "").strip()
+
 def extract_json_from_text(text: str) -> dict:
-    """텍스트에서 JSON 추출"""
+    """텍스트에서 JSON 추출 (코드 블록/앞뒤 설명은 건너뛰고, 잘린 JSON 은 복구)"""
     try:
-        # JSON 블록 찾기 (```json...``` 또는 {...})
-        json_pattern = r'```json\s*(.*?)\s*```'
-        match = re.search(json_pattern, text, re.DOTALL)
-        
-        if match:
-            json_str = match.group(1)
-        else:
-            # 중괄호로 시작하는 JSON 찾기
-            brace_start = text.find('{')
-            brace_end = text.rfind('}')
-            if brace_start != -1 and brace_end != -1:
-                json_str = text[brace_start:brace_end+1]
-            else:
-                json_str = text
-        
-        return json.loads(json_str)
+        return parse_json(text, source="openai")
     except Exception as e:
         logger.error(f"JSON 추출 실패: {e}")
         return None
 
-def get_directing(situation):
+async def get_directing(situation):
     """현장 상황을 바탕으로 AI 디렉팅 제공"""
     
     if not client:
@@ -89,20 +135,13 @@ JSON 형식 외에는 다른 텍스트를 포함하지 마세요.
     try:
         logger.info(f"OpenAI API 호출 시작 - 상황: {situation[:50]}...")
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",  # gpt-4 대신 더 안정적인 gpt-3.5-turbo 사용
-            messages=[
-                {
-                    "role": "system", 
-                    "content": "당신은 30년 경력의 노련한 선배 기자입니다. 구조적이고 비판적인 취재 디렉팅을 JSON 형식으로만 제공합니다."
-                },
-                {"role": "user", "content": prompt}
-            ],
+        content = await complete(
+            prompt,
+            system="당신은 30년 경력의 노련한 선배 기자입니다. 구조적이고 비판적인 취재 디렉팅을 JSON 형식으로만 제공합니다.",
             temperature=0.7,
-            max_tokens=2000
+            max_tokens=2000,
+            json_mode=True,
         )
-        
-        content = response.choices[0].message.content.strip()
         logger.info(f"OpenAI 응답 받음: {content[:100]}...")
         
         # JSON 파싱 시도
@@ -134,7 +173,7 @@ JSON 형식 외에는 다른 텍스트를 포함하지 마세요.
             "checklist": ["시스템 점검"]
         }
 
-def get_deep_dive(situation):
+async def get_deep_dive(situation):
     """CSV 데이터 기반 심화 분석"""
     
     if not client:
@@ -147,17 +186,26 @@ def get_deep_dive(situation):
     
     # 데이터에서 유사 사건 검색
     try:
-        similar_cases = search_similar_cases(situation)
+        similar_cases = await asyncio.to_thread(search_similar_cases, situation)
         logger.info(f"유사 사건 검색 완료: {len(similar_cases) if similar_cases else 0}건")
     except Exception as e:
         logger.error(f"유사 사건 검색 오류: {e}")
         similar_cases = "유사 사건 데이터를 찾을 수 없습니다."
+
+    # 카테고리/월/지역별 기사 수 (미리 집계한 통계 큐브)
+    try:
+        statistics = await asyncio.to_thread(get_statistics)
+    except Exception as e:
+        logger.error(f"통계 조회 오류: {e}")
+        statistics = "통계 데이터를 찾을 수 없습니다."
     
     prompt = f"""
 현장 상황: {situation}
 
 유사 사건/데이터: {similar_cases}
 
+기사 통계: {statistics}
+
 위 데이터를 바탕으로 심화 분석을 제공해주세요.
 
 반드시 다음 JSON 형식으로만 응답해주세요:
@@ -181,17 +229,13 @@ JSON 형식 외에는 다른 텍스트를 포함하지 마세요.
     try:
         logger.info("심화 분석 OpenAI API 호출 시작")
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "당신은 데이터 분석 전문 기자입니다. JSON 형식으로만 응답합니다."},
-                {"role": "user", "content": prompt}
-            ],
+        content = await complete(
+            prompt,
+            system="당신은 데이터 분석 전문 기자입니다. JSON 형식으로만 응답합니다.",
             temperature=0.7,
-            max_tokens=1500
+            max_tokens=1500,
+            json_mode=True,
         )
-        
-        content = response.choices[0].message.content.strip()
         logger.info(f"심화 분석 응답 받음: {content[:100]}...")
         
         parsed_json = extract_json_from_text(content)
@@ -217,7 +261,7 @@ JSON 형식 외에는 다른 텍스트를 포함하지 마세요.
             "additionalQuestions": ["시스템 점검이 필요합니다."]
         }
 
-def get_perspective(situation, perspective):
+async def get_perspective(situation, perspective):
     """관점 확장 분석"""
     
     if not client:
@@ -249,17 +293,13 @@ JSON 형식 외에는 다른 텍스트를 포함하지 마세요.
     try:
         logger.info(f"관점 확장 OpenAI API 호출 시작 - 관점: {perspective}")
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": f"당신은 {perspective} 분야 전문 기자입니다. JSON 형식으로만 응답합니다."},
-                {"role": "user", "content": prompt}
-            ],
+        content = await complete(
+            prompt,
+            system=f"당신은 {perspective} 분야 전문 기자입니다. JSON 형식으로만 응답합니다.",
             temperature=0.7,
-            max_tokens=1200
+            max_tokens=1200,
+            json_mode=True,
         )
-        
-        content = response.choices[0].message.content.strip()
         logger.info(f"관점 확장 응답 받음: {content[:100]}...")
         
         parsed_json = extract_json_from_text(content)
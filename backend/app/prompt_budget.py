@@ -0,0 +1,145 @@
+# 토큰 예산 안에서 종합 분석 프롬프트 조립
+#
+# 기사별 분석 결과(dict 목록)를 Python repr 대신 따옴표/괄호 없는 줄 단위 텍스트로 직렬화하고,
+# 여러 기사에 반복되는 쟁점/보도 각도/시사점은 "공통" 항목으로 한 번만 적는다.
+# 예산(SUMMARY_PROMPT_TOKEN_BUDGET)을 넘으면 가치가 낮은 내용부터 줄인다:
+# 기사 본문 발췌 -> 기사별 시사점 -> 기사별 보도 각도 -> 항목 수 -> 뒤쪽 기사.
+# 그래서 기사가 몇 건이 들어와도 종합 분석 호출의 입력 크기(와 지연 시간)가 일정 범위 안에 머문다.
+
+import re
+from collections import Counter
+from typing import Dict, List, Optional
+
+from app.config import SUMMARY_PROMPT_TOKEN_BUDGET, SUMMARY_SNIPPET_CHARS
+from app.metrics import Histogram
+from app.response_cache import normalize_text
+
+PROMPT_TOKENS = Histogram("reporter_prompt_tokens", "조립한 프롬프트의 추정 토큰 수", ["prompt"],
+                          buckets=(250, 500, 1000, 2000, 4000, 8000, 16000, 32000))
+
+LIST_FIELDS = ("issues", "angles", "implications")
+FIELD_LABELS = {"issues": "쟁점", "angles": "보도 각도", "implications": "시사점", "framing": "프레이밍"}
+
+_HANGUL = re.compile(r"[ᄀ-ᇿ㄰-㆏가-힣一-鿿]")
+
+SUMMARY_INSTRUCTION = """다음은 여러 유사 뉴스 기사와 기사별 보도 각도/쟁점/프레이밍/시사점 분석 결과입니다.
+여러 기사에 반복된 항목은 [공통] 에 (기사 수)와 함께 한 번만 적었습니다.
+
+이 기사들에서 반복적으로 등장하는 쟁점, 공통된 프레임, 사회적 시사점, 차이점 등을 종합적으로 요약해줘.
+1. 반복 쟁점/프레임
+2. 차이점
+3. 사회적 시사점
+4. 추가 취재 포인트
+간결하고 명확하게 정리해줘."""
+
+
+def count_tokens(text: str) -> int:
+    """토큰 수 어림값 (한글/한자는 1.5자당 1토큰, 그 밖의 글자는 4자당 1토큰, 공백 제외)"""
+    text = str(text)
+    wide = len(_HANGUL.findall(text))
+    other = len(text) - wide - sum(1 for ch in text if ch.isspace())
+    return max(1, round(wide / 1.5 + other / 4))
+
+
+def _key(item: str) -> str:
+    return normalize_text(item).lower().rstrip(".")
+
+
+def dedup_items(analyses: List[dict]) -> Dict[str, List[tuple]]:
+    """필드별로 두 기사 이상에 나온 항목 [(항목, 기사 수)] (많이 나온 순)
+
+    같은 기사 안의 중복도 한 번으로 센다.
+    """
+    common = {}
+    for field in LIST_FIELDS:
+        counts, first_seen = Counter(), {}
+        for analysis in analyses:
+            keys = set()
+            for item in analysis.get(field) or []:
+                key = _key(item)
+                if key and key not in keys:
+                    keys.add(key)
+                    counts[key] += 1
+                    first_seen.setdefault(key, normalize_text(item))
+        common[field] = [(first_seen[k], n) for k, n in counts.most_common() if n > 1]
+    return common
+
+
+def _unique(items, exclude: set, limit: Optional[int]) -> List[str]:
+    seen, result = set(exclude), []
+    for item in items or []:
+        key = _key(item)
+        if key and key not in seen:
+            seen.add(key)
+            result.append(normalize_text(item))
+    return result[:limit] if limit is not None else result
+
+
+def _snippet(text: str, chars: int) -> str:
+    text = normalize_text(text)
+    return text if len(text) <= chars else text[:chars].rstrip() + "…"
+
+
+def render_summary_context(analyses: List[dict], articles: List[str], snippet_chars: int,
+                           fields=("issues", "angles", "implications"), max_items: Optional[int] = None,
+                           max_articles: Optional[int] = None) -> str:
+    """기사별 분석 결과를 줄 단위 텍스트로 직렬화 (공통 항목은 [공통] 에 한 번만)"""
+    common = dedup_items(analyses)
+    lines = []
+    if any(common.values()):
+        lines.append("[공통]")
+        for field in LIST_FIELDS:
+            if common[field]:
+                lines.append(f"{FIELD_LABELS[field]}: " + "; ".join(f"{item}({n})" for item, n in common[field]))
+    common_keys = {field: {_key(item) for item, _ in common[field]} for field in LIST_FIELDS}
+
+    shown = analyses if max_articles is None else analyses[:max_articles]
+    for i, analysis in enumerate(shown):
+        index = analysis.get("article_index", i)
+        lines.append("")
+        lines.append(f"[기사 {index + 1}] {normalize_text(analysis.get('title') or '')}")
+        # 기사 텍스트 첫 줄은 제목이므로 발췌는 그다음부터
+        body = "\n".join(articles[index].splitlines()[1:]) if 0 <= index < len(articles) else ""
+        if snippet_chars > 0 and body:
+            lines.append(f"발췌: {_snippet(body, snippet_chars)}")
+        if analysis.get("framing"):
+            lines.append(f"{FIELD_LABELS['framing']}: {normalize_text(analysis['framing'])}")
+        for field in fields:
+            items = _unique(analysis.get(field), common_keys[field], max_items)
+            if items:
+                lines.append(f"{FIELD_LABELS[field]}: " + "; ".join(items))
+    if len(shown) < len(analyses):
+        lines.append("")
+        lines.append(f"(그 밖의 기사 {len(analyses) - len(shown)}건은 예산 때문에 생략)")
+    return "\n".join(lines)
+
+
+def build_summary_prompt(analyses: List[dict], articles: List[str],
+                         budget: int = SUMMARY_PROMPT_TOKEN_BUDGET) -> str:
+    """종합 분석 프롬프트 (추정 토큰 수가 budget 을 넘지 않도록 덜 중요한 내용부터 줄인다)"""
+    remaining = budget - count_tokens(SUMMARY_INSTRUCTION)
+    levels = [
+        {"snippet_chars": SUMMARY_SNIPPET_CHARS},
+        {"snippet_chars": SUMMARY_SNIPPET_CHARS // 2},
+        {"snippet_chars": 0},
+        {"snippet_chars": 0, "fields": ("issues", "angles")},
+        {"snippet_chars": 0, "fields": ("issues",)},
+        {"snippet_chars": 0, "fields": ("issues",), "max_items": 2},
+    ]
+    context = None
+    for level in levels:
+        context = render_summary_context(analyses, articles, **level)
+        if count_tokens(context) <= remaining:
+            break
+    else:
+        # 그래도 넘치면 뒤쪽 기사부터 생략 (공통 항목에는 이미 모든 기사가 반영되어 있다)
+        shown = len(analyses)
+        while shown > 1 and count_tokens(context) > remaining:
+            shown -= 1
+            context = render_summary_context(analyses, articles, **levels[-1], max_articles=shown)
+        if count_tokens(context) > remaining:
+            context = context[:max(0, int(remaining * 1.5))]
+
+    prompt = f"{SUMMARY_INSTRUCTION}\n\n{context}"
+    PROMPT_TOKENS.observe(count_tokens(prompt), prompt="summary")
+    return prompt
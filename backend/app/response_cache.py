@@ -0,0 +1,267 @@
+# LLM 응답 캐시 (메모리 LRU + SQLite 2단 구성)
+#
+# 같은 상황/관점으로 반복 요청이 들어오면 Gemini 를 다시 부르지 않고 캐시에서 돌려준다.
+# - 1단: 프로세스 내 LRU (TTL 적용)
+# - 2단: SQLite 파일 (재시작 후에도 유지, 같은 서버의 워커끼리 공유)
+# 무효화하면 SQLite 의 종류별 세대 번호를 올리고, 각 워커는 RESPONSE_CACHE_GENERATION_CHECK 초마다
+# 세대 번호를 확인해 바뀐 종류의 메모리 항목을 버린다.
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from contextlib import closing
+from typing import Optional
+
+from app.config import (
+    RESPONSE_CACHE_ENABLED,
+    RESPONSE_CACHE_DB_PATH,
+    RESPONSE_CACHE_TTL,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_GENERATION_CHECK,
+)
+from app.metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+ALL_KINDS = "*"  # 전체 무효화의 세대 번호 키
+
+
+def normalize_text(text: str) -> str:
+    """캐시 키용 정규화: 유니코드 NFC + 공백 정리"""
+    return " ".join(unicodedata.normalize("NFC", text or "").split())
+
+
+class ResponseCache:
+    def __init__(self, db_path: Optional[str] = RESPONSE_CACHE_DB_PATH, ttl: float = RESPONSE_CACHE_TTL,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, enabled: bool = RESPONSE_CACHE_ENABLED,
+                 generation_check: float = RESPONSE_CACHE_GENERATION_CHECK):
+        self.enabled = enabled
+        self.db_path = db_path if enabled else None
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lru: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (expires_at, kind, value_json)
+        self._lock = threading.Lock()
+        self.generation_check = generation_check
+        self._generations: Optional[dict] = None  # kind -> 세대 번호 (마지막으로 확인한 값)
+        self._generations_checked = 0.0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "sets": 0, "disk_errors": 0,
+                          "remote_invalidations": 0}
+        self._provider_sets: dict = {}  # 프로바이더별 저장 수
+        if self.db_path:
+            try:
+                self._init_db()
+            except Exception as e:
+                logger.error(f"응답 캐시 DB 초기화 실패, 메모리 캐시만 사용: {e}")
+                self.db_path = None
+
+    @staticmethod
+    def make_key(kind: str, situation: str, perspective: Optional[str] = None,
+                 model: str = "", prompt_version: str = "") -> str:
+        raw = json.dumps([kind, normalize_text(situation), normalize_text(perspective or ""), model, prompt_version],
+                         ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # --- SQLite 단 ---
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache ("
+                " key TEXT PRIMARY KEY, kind TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, created_at REAL NOT NULL, provider TEXT)"
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(response_cache)")}
+            if "provider" not in columns:
+                conn.execute("ALTER TABLE response_cache ADD COLUMN provider TEXT")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_kind ON response_cache(kind)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS response_cache_generation ("
+                " kind TEXT PRIMARY KEY, generation INTEGER NOT NULL)"
+            )
+
+    def _disk_get(self, key: str) -> Optional[tuple]:
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT kind, value, expires_at FROM response_cache WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        return row
+
+    def _disk_set(self, key: str, kind: str, value_json: str, expires_at: float, provider: Optional[str]):
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (key, kind, value, expires_at, created_at, provider)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, value_json, expires_at, time.time(), provider),
+            )
+            conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (time.time(),))
+
+    def _disk_invalidate(self, kind: Optional[str]) -> int:
+        with closing(self._connect()) as conn, conn:
+            if kind:
+                cur = conn.execute("DELETE FROM response_cache WHERE kind = ?", (kind,))
+            else:
+                cur = conn.execute("DELETE FROM response_cache")
+            conn.execute(
+                "INSERT INTO response_cache_generation (kind, generation) VALUES (?, 1)"
+                " ON CONFLICT(kind) DO UPDATE SET generation = generation + 1",
+                (kind or ALL_KINDS,),
+            )
+            return cur.rowcount
+
+    def _disk_generations(self) -> dict:
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT kind, generation FROM response_cache_generation").fetchall())
+
+    # --- 메모리 단 ---
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is None:
+                return None
+            expires_at, _, value_json = entry
+            if expires_at <= time.time():
+                del self._lru[key]
+                return None
+            self._lru.move_to_end(key)
+            return value_json
+
+    def _memory_set(self, key: str, kind: str, value_json: str, expires_at: float):
+        with self._lock:
+            self._lru[key] = (expires_at, kind, value_json)
+            self._lru.move_to_end(key)
+            while len(self._lru) > self.max_entries:
+                self._lru.popitem(last=False)
+
+    def _memory_drop(self, kind: Optional[str]) -> int:
+        with self._lock:
+            keys = [k for k, (_, k_kind, _) in self._lru.items() if not kind or k_kind == kind]
+            for k in keys:
+                del self._lru[k]
+        return len(keys)
+
+    async def _sync_generations(self):
+        """다른 워커가 무효화했으면(세대 번호가 바뀌었으면) 해당 종류의 메모리 항목을 버린다"""
+        now = time.monotonic()
+        if not self.db_path or now - self._generations_checked < self.generation_check:
+            return
+        self._generations_checked = now
+        try:
+            generations = await asyncio.to_thread(self._disk_generations)
+        except Exception as e:
+            self._counters["disk_errors"] += 1
+            logger.warning(f"응답 캐시 세대 번호 조회 실패: {e}")
+            return
+        previous, self._generations = self._generations, generations
+        if previous is None or previous == generations:
+            return
+        changed = {k for k in set(previous) | set(generations) if previous.get(k) != generations.get(k)}
+        self._counters["remote_invalidations"] += 1
+        if ALL_KINDS in changed:
+            self._memory_drop(None)
+        else:
+            for kind in changed:
+                self._memory_drop(kind)
+
+    # --- 공개 API ---
+
+    async def get(self, key: str):
+        if not self.enabled:
+            return None
+        await self._sync_generations()
+        value_json = self._memory_get(key)
+        if value_json is not None:
+            self._counters["memory_hits"] += 1
+            return json.loads(value_json)
+
+        if self.db_path:
+            try:
+                row = await asyncio.to_thread(self._disk_get, key)
+            except Exception as e:
+                self._counters["disk_errors"] += 1
+                logger.warning(f"응답 캐시 조회 실패: {e}")
+                row = None
+            if row is not None:
+                kind, value_json, expires_at = row
+                self._memory_set(key, kind, value_json, expires_at)
+                self._counters["disk_hits"] += 1
+                return json.loads(value_json)
+
+        self._counters["misses"] += 1
+        return None
+
+    async def set(self, key: str, kind: str, value, provider: Optional[str] = None):
+        """provider: 실제로 응답한 프로바이더 (헤지로 백업이 응답했을 수 있어 키의 model 과 다를 수 있다)"""
+        if not self.enabled:
+            return
+        value_json = json.dumps(value, ensure_ascii=False)
+        expires_at = time.time() + self.ttl
+        self._memory_set(key, kind, value_json, expires_at)
+        self._counters["sets"] += 1
+        if provider:
+            self._provider_sets[provider] = self._provider_sets.get(provider, 0) + 1
+        if self.db_path:
+            try:
+                await asyncio.to_thread(self._disk_set, key, kind, value_json, expires_at, provider)
+            except Exception as e:
+                self._counters["disk_errors"] += 1
+                logger.warning(f"응답 캐시 저장 실패: {e}")
+
+    async def invalidate(self, kind: Optional[str] = None) -> int:
+        """kind 가 없으면 전체, 있으면 해당 종류의 항목만 삭제하고 삭제 건수 반환
+
+        다른 워커의 메모리 단은 SQLite 세대 번호를 보고 RESPONSE_CACHE_GENERATION_CHECK 초 안에 비운다.
+        """
+        removed = self._memory_drop(kind)
+        if self.db_path:
+            removed = max(removed, await asyncio.to_thread(self._disk_invalidate, kind))
+            # 자기가 올린 세대 번호는 알고 있는 값에 바로 반영 (다음 확인 때 자기 항목을 다시 버리지 않도록)
+            if self._generations is not None:
+                name = kind or ALL_KINDS
+                self._generations[name] = self._generations.get(name, 0) + 1
+        return removed
+
+    def stats(self) -> dict:
+        hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+        total = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "sets_by_provider": dict(self._provider_sets),
+            "memory_entries": len(self._lru),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "enabled": self.enabled,
+            "disk_enabled": bool(self.db_path),
+        }
+
+
+_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """응답 캐시 (프로세스당 하나)"""
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
+
+
+CallbackMetric("reporter_response_cache_events_total", "응답 캐시 적중/미스/저장 수", ["event"],
+               lambda: {(k,): v for k, v in _cache._counters.items()} if _cache is not None else {},
+               kind="counter")
+CallbackMetric("reporter_response_cache_entries", "메모리 응답 캐시 항목 수", [],
+               lambda: {(): len(_cache._lru)} if _cache is not None else {})
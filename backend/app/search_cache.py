@@ -0,0 +1,170 @@
+# 네이버 뉴스 검색 결과 캐시 (메모리 LRU + TTL + stale-while-revalidate)
+#
+# 같은 사건을 여러 기자가 몇 분 사이에 검색하면 MCP 검색 + Gemini 도구 호출 루프를 매번 다시 돈다.
+# 주제를 정규화(공백/문장부호/조사/단어 순서)한 키와 max_results 로 검색 결과 텍스트를 잠시 보관한다.
+# - SEARCH_CACHE_TTL 안: 캐시에서 바로 반환
+# - 그 뒤 SEARCH_CACHE_STALE 초까지: 이전 결과를 바로 반환하고 백그라운드에서 다시 검색해 교체
+# - 그보다 오래됐거나 없으면: 검색해서 저장
+# 뉴스는 금방 낡으므로 응답 캐시(response_cache)와 달리 디스크에 남기지 않는다.
+
+import asyncio
+import logging
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from app.config import SEARCH_CACHE_TTL, SEARCH_CACHE_STALE, SEARCH_CACHE_MAX_ENTRIES
+from app.metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+# 단어 끝에서 떼어 낼 조사 (긴 것부터 확인)
+PARTICLES = sorted([
+    "에서는", "으로는", "에게서", "이라는", "께서", "에서", "에게", "한테", "으로", "라는", "이랑", "하고", "까지", "부터",
+    "보다", "처럼", "마저", "조차", "은", "는", "이", "가", "을", "를", "의", "에", "로", "와", "과", "도", "만", "랑",
+], key=len, reverse=True)
+
+# 한 글자 조사처럼 끝나지만 명사의 일부인 끝말 ("고속도로" 의 "로", "어린이" 의 "이" 는 떼지 않는다)
+NOUN_ENDINGS = (
+    "도로", "경로", "속도", "온도", "제도", "정도", "강도", "어린이", "놀이", "전문가", "물가", "국가", "평가",
+    "혐의", "회의", "합의", "협의", "결과", "효과", "불만", "미만",
+)
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def _strip_particle(word: str) -> str:
+    """단어 끝 조사 하나를 뗀다
+
+    두 글자 이상 조사는 떼고도 두 글자 이상 남을 때 ("구로구에서" -> "구로구"),
+    한 글자 조사는 세 글자 이상 단어이고 NOUN_ENDINGS 로 끝나지 않을 때만 뗀다 ("경찰이" -> "경찰", "오이" 는 그대로).
+    """
+    for particle in PARTICLES:
+        if not word.endswith(particle) or len(word) - len(particle) < 2:
+            continue
+        if len(particle) == 1 and word.endswith(NOUN_ENDINGS):
+            return word
+        return word[:-len(particle)]
+    return word
+
+
+def normalize_topic(topic: str) -> str:
+    """검색 주제 정규화: "구로구 흉기 난동 사건을" / "흉기난동  구로구에서 사건" 처럼 띄어쓰기·조사·순서만 다른 주제를 같게
+
+    NFC + 소문자, 문장부호 제거, 단어 끝 조사 제거 후 띄어쓰기를 무시하도록 남은 글자들을 정렬해 잇는다.
+    (같은 글자들을 다르게 배열한 주제끼리도 같은 키가 되지만, 장소/사건명이 함께 들어가는 검색 주제에서는 드물다)
+    """
+    text = unicodedata.normalize("NFC", topic or "").lower()
+    words = [_strip_particle(word) for word in _NON_WORD.sub(" ", text).replace("_", " ").split()]
+    return "".join(sorted("".join(words)))
+
+
+class SearchCache:
+    def __init__(self, ttl: float = SEARCH_CACHE_TTL, stale: float = SEARCH_CACHE_STALE,
+                 max_entries: int = SEARCH_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.stale = stale
+        self.max_entries = max_entries
+        self.enabled = ttl > 0 and max_entries > 0
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()  # key -> (fetched_at, text)
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "sets": 0, "evictions": 0,
+                          "refreshes": 0, "refresh_errors": 0}
+
+    @staticmethod
+    def make_key(topic: str, max_results: int) -> str:
+        return f"{normalize_topic(topic)}|{max_results}"
+
+    def get(self, key: str) -> Optional[Tuple[str, bool]]:
+        """(검색 결과 텍스트, 오래됐는지) 또는 None"""
+        if not self.enabled:
+            return None
+        entry = self._entries.get(key)
+        if entry is not None:
+            age = time.monotonic() - entry[0]
+            if age <= self.ttl + self.stale:
+                self._entries.move_to_end(key)
+                stale = age > self.ttl
+                self._counters["stale_hits" if stale else "hits"] += 1
+                return entry[1], stale
+            del self._entries[key]
+        self._counters["misses"] += 1
+        return None
+
+    def set(self, key: str, text: str):
+        # 빈 결과는 저장하지 않는다 (다음 요청이 다시 검색하도록)
+        if not self.enabled or not (text or "").strip():
+            return
+        self._entries[key] = (time.monotonic(), text)
+        self._entries.move_to_end(key)
+        self._counters["sets"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def refresh(self, key: str, fetch: Callable[[], Awaitable[str]]):
+        """백그라운드에서 다시 검색해 교체 (같은 키의 갱신이 이미 진행 중이면 무시)"""
+        if key in self._refreshing:
+            return
+
+        async def run():
+            try:
+                self.set(key, await fetch())
+                self._counters["refreshes"] += 1
+            except Exception as e:
+                self._counters["refresh_errors"] += 1
+                logger.warning(f"검색 캐시 갱신 실패 (이전 결과 유지): {e}")
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(run())
+
+    async def get_or_fetch(self, key: str, fetch: Callable[[], Awaitable[str]]) -> str:
+        cached = self.get(key)
+        if cached is not None:
+            text, stale = cached
+            if stale:
+                self.refresh(key, fetch)
+            return text
+        text = await fetch()
+        self.set(key, text)
+        return text
+
+    def invalidate(self) -> int:
+        removed = len(self._entries)
+        self._entries.clear()
+        return removed
+
+    def stats(self) -> dict:
+        hits = self._counters["hits"] + self._counters["stale_hits"]
+        total = hits + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "entries": len(self._entries),
+            "refreshing": len(self._refreshing),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "stale_seconds": self.stale,
+            "enabled": self.enabled,
+        }
+
+
+_cache: Optional[SearchCache] = None
+
+
+def get_search_cache() -> SearchCache:
+    """검색 결과 캐시 (프로세스당 하나)"""
+    global _cache
+    if _cache is None:
+        _cache = SearchCache()
+    return _cache
+
+
+CallbackMetric("reporter_search_cache_events_total", "뉴스 검색 캐시 적중/미스/갱신 수", ["event"],
+               lambda: {(k,): v for k, v in _cache._counters.items()} if _cache is not None else {},
+               kind="counter")
+CallbackMetric("reporter_search_cache_entries", "뉴스 검색 캐시 항목 수", [],
+               lambda: {(): len(_cache._entries)} if _cache is not None else {})
@@ -0,0 +1,310 @@
+# 추가 기사 세그먼트 (append-only 수집)
+#
+# CSV 로 만든 기본 코퍼스는 그대로 두고, 새로 들어온 기사는 작은 델타 세그먼트로 쌓는다.
+# 세그먼트 하나는 기본 코퍼스와 같은 열 파일(write_corpus) + 그 행들만의 BM25 / 벡터 색인 / MinHash 서명이므로
+# 수집 비용은 새 기사 수에만 비례한다. 유사 사건 검색은 기본 코퍼스와 모든 세그먼트를 함께 찾는다.
+#
+# 활성 세그먼트 목록은 SEGMENTS_DIR/segments.json 하나에 두고 os.replace 로 바꾼다.
+# 세그먼트가 SEGMENT_MERGE_THRESHOLD 개를 넘으면 백그라운드 스레드가 하나로 합친다
+# (합치는 동안 들어온 세그먼트는 그대로 남는다).
+#
+# 수집: python -m app.segments ingest new_articles.csv --category accident
+# 병합: python -m app.segments merge
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from app.config import SEGMENTS_DIR, SEGMENT_MERGE_THRESHOLD, CSV_FILES
+from app.corpus import Corpus, TEXT_COLUMNS, write_corpus
+from app.bm25 import BM25Index
+from app.vector_index import VectorIndex
+from app.near_dup import CorpusSignatures
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 안의 잠금만 사용
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "segments.json"
+
+
+class Segment:
+    """델타 세그먼트 하나 (코퍼스 + BM25 색인 + 벡터 색인 + MinHash 서명)"""
+
+    def __init__(self, name: str, corpus: Corpus, bm25: BM25Index, vectors: VectorIndex,
+                 minhash: CorpusSignatures):
+        self.name = name
+        self.corpus = corpus
+        self.bm25 = bm25
+        self.vectors = vectors
+        self.minhash = minhash
+
+    def __len__(self):
+        return len(self.corpus)
+
+    @classmethod
+    def open(cls, path: str) -> Optional["Segment"]:
+        """세그먼트 디렉터리를 연다 (색인이 없거나 임베딩 모델이 바뀌었으면 이 세그먼트만 다시 색인)"""
+        corpus = Corpus.open(path)
+        if corpus is None:
+            return None
+        # 병합 후 지워져도 읽을 수 있도록 열 파일을 미리 열어 둔다
+        for name in TEXT_COLUMNS:
+            corpus.column(name)
+        bm25 = BM25Index.load(corpus, root=os.path.join(path, "bm25"))
+        if bm25 is None:
+            bm25 = BM25Index.build(corpus)
+            bm25.save(os.path.join(path, "bm25"))
+        vectors = VectorIndex.load(corpus, root=os.path.join(path, "vectors"))
+        if vectors is None:
+            vectors = VectorIndex.build(corpus)
+            vectors.save(os.path.join(path, "vectors"))
+        minhash = CorpusSignatures.load(corpus, root=os.path.join(path, "minhash"))
+        if minhash is None:
+            minhash = CorpusSignatures.build(corpus)
+            minhash.save(os.path.join(path, "minhash"))
+        return cls(os.path.basename(path), corpus, bm25, vectors, minhash)
+
+
+def normalize_category(category: str) -> str:
+    """"accident" / "accident.csv" -> "accident.csv" (CSV_FILES 에 없으면 ValueError)"""
+    name = category if category.endswith(".csv") else f"{category}.csv"
+    if name not in CSV_FILES:
+        raise ValueError(f"알 수 없는 카테고리: {category}")
+    return name
+
+
+def _write_segment(directory: str, articles: List[dict], seq: int):
+    """기사 목록 -> 세그먼트 파일 (카테고리 순서는 CSV_FILES 기준)"""
+    categories = sorted({a["category"] for a in articles}, key=CSV_FILES.index)
+    source_pos = {c: i for i, c in enumerate(categories)}
+    ordered = sorted(articles, key=lambda a: source_pos[a["category"]])
+    columns = {name: [str(a.get(name) or "") for a in ordered] for name in TEXT_COLUMNS}
+    source_ids = [source_pos[a["category"]] for a in ordered]
+    sources = [{"file": c, "rows": source_ids.count(i), "columns": list(TEXT_COLUMNS)}
+               for i, c in enumerate(categories)]
+    write_corpus(directory, columns, source_ids, sources, {f"segment:{seq}": [seq, len(ordered)]})
+
+
+class SegmentStore:
+    """SEGMENTS_DIR 의 세그먼트 목록 관리"""
+
+    def __init__(self, root: str = SEGMENTS_DIR):
+        self.root = root
+        self._lock = threading.Lock()
+        self._loaded: Dict[str, Segment] = {}
+        self._active: List[Segment] = []
+        self._manifest_stamp = None
+        self._merging = False
+
+    @contextmanager
+    def _locked(self):
+        """같은 프로세스의 스레드 + 다른 워커 프로세스 사이 잠금 (segments.json 갱신용)"""
+        os.makedirs(self.root, exist_ok=True)
+        with self._lock, open(os.path.join(self.root, ".lock"), "w") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            yield
+
+    def _read_manifest(self) -> dict:
+        try:
+            with open(os.path.join(self.root, MANIFEST_FILE), encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"next_seq": 1, "segments": []}
+
+    def _write_manifest(self, manifest: dict):
+        tmp_path = os.path.join(self.root, f".{MANIFEST_FILE}.{os.getpid()}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, os.path.join(self.root, MANIFEST_FILE))
+
+    def segments(self) -> List[Segment]:
+        """활성 세그먼트 (segments.json 이 바뀌었을 때만 다시 읽는다)"""
+        try:
+            st = os.stat(os.path.join(self.root, MANIFEST_FILE))
+            stamp = (st.st_mtime_ns, st.st_size, st.st_ino)
+        except FileNotFoundError:
+            return []
+        if stamp == self._manifest_stamp:
+            return self._active
+        with self._lock:
+            names = self._read_manifest()["segments"]
+            active = []
+            for name in names:
+                segment = self._loaded.get(name) or Segment.open(os.path.join(self.root, name))
+                if segment is None:
+                    logger.warning(f"세그먼트를 열 수 없습니다: {name}")
+                    continue
+                active.append(segment)
+            self._loaded = {s.name: s for s in active}
+            self._active = active
+            self._manifest_stamp = stamp
+            return active
+
+    def _build(self, articles: List[dict], seq: int) -> str:
+        """임시 디렉터리에 세그먼트 + 색인을 만들고 최종 이름으로 옮긴다"""
+        name = f"{seq:08d}"
+        tmp_dir = tempfile.mkdtemp(prefix=f".{name}.", dir=self.root)
+        try:
+            _write_segment(tmp_dir, articles, seq)
+            corpus = Corpus.open(tmp_dir)
+            BM25Index.build(corpus).save(os.path.join(tmp_dir, "bm25"))
+            VectorIndex.build(corpus).save(os.path.join(tmp_dir, "vectors"))
+            CorpusSignatures.build(corpus).save(os.path.join(tmp_dir, "minhash"))
+            os.rename(tmp_dir, os.path.join(self.root, name))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        return name
+
+    def _next_seq(self) -> int:
+        with self._locked():
+            manifest = self._read_manifest()
+            seq = manifest["next_seq"]
+            manifest["next_seq"] = seq + 1
+            self._write_manifest(manifest)
+            return seq
+
+    def ingest(self, articles: List[dict], background_merge: bool = True) -> dict:
+        """기사 목록을 새 세그먼트로 추가 (각 기사: category, date, title, body_prep)
+
+        제목과 본문이 모두 빈 기사는 건너뛴다. 잘못된 카테고리는 ValueError.
+        세그먼트가 너무 많아지면 병합한다 (background_merge=False 면 이 자리에서).
+        """
+        articles = [
+            {**a, "category": normalize_category(a["category"])}
+            for a in articles if (a.get("title") or "").strip() or (a.get("body_prep") or "").strip()
+        ]
+        if not articles:
+            raise ValueError("추가할 기사가 없습니다.")
+
+        seq = self._next_seq()
+        name = self._build(articles, seq)
+        with self._locked():
+            manifest = self._read_manifest()
+            manifest["segments"].append(name)
+            self._write_manifest(manifest)
+            count = len(manifest["segments"])
+        logger.info(f"세그먼트 추가: {name} ({len(articles)}건, 활성 세그먼트 {count}개)")
+
+        if count > SEGMENT_MERGE_THRESHOLD:
+            if background_merge:
+                self.merge_in_background()
+            else:
+                self.merge()
+        return {"segment": name, "rows": len(articles), "segments": count}
+
+    def merge(self) -> Optional[str]:
+        """현재 활성 세그먼트를 하나로 합친다 (합칠 게 없으면 None)"""
+        with self._locked():
+            names = list(self._read_manifest()["segments"])
+        if len(names) < 2:
+            return None
+
+        articles = []
+        for name in names:
+            corpus = Corpus.open(os.path.join(self.root, name))
+            if corpus is None:
+                continue
+            columns = {col: list(corpus.column(col)) for col in TEXT_COLUMNS}
+            for row in range(len(corpus)):
+                articles.append({"category": corpus.source(row), **{col: columns[col][row] for col in TEXT_COLUMNS}})
+
+        merged = self._build(articles, self._next_seq())
+        with self._locked():
+            manifest = self._read_manifest()
+            # 다른 워커(또는 CLI)가 그사이 같은 세그먼트를 먼저 병합했으면 이번 결과는 버린다
+            committed = all(name in manifest["segments"] for name in names)
+            if committed:
+                # 병합하는 동안 추가된 세그먼트는 뒤에 그대로 둔다
+                manifest["segments"] = [merged] + [n for n in manifest["segments"] if n not in names]
+                self._write_manifest(manifest)
+        if not committed:
+            shutil.rmtree(os.path.join(self.root, merged), ignore_errors=True)
+            logger.info(f"세그먼트 병합 취소: 다른 프로세스가 먼저 병합했습니다 ({merged} 삭제)")
+            return None
+        for name in names:
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+        logger.info(f"세그먼트 병합: {len(names)}개 -> {merged} ({len(articles)}건)")
+        return merged
+
+    def merge_in_background(self):
+        """병합을 데몬 스레드로 실행 (이미 병합 중이면 무시)"""
+        with self._lock:
+            if self._merging:
+                return
+            self._merging = True
+
+        def run():
+            try:
+                self.merge()
+            except Exception as e:
+                logger.error(f"세그먼트 병합 실패: {e}")
+            finally:
+                with self._lock:
+                    self._merging = False
+
+        threading.Thread(target=run, name="segment-merge", daemon=True).start()
+
+    def stats(self) -> dict:
+        segments = self.segments()
+        return {
+            "segments": len(segments),
+            "rows": sum(len(s) for s in segments),
+            "merging": self._merging,
+        }
+
+
+_store: Optional[SegmentStore] = None
+_store_lock = threading.Lock()
+
+
+def get_segment_store() -> SegmentStore:
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SegmentStore()
+        return _store
+
+
+def get_segments() -> List[Segment]:
+    return get_segment_store().segments()
+
+
+def read_articles_csv(path: str, category: Optional[str] = None) -> List[dict]:
+    """기사 CSV (date, title, body_prep 열) 읽기, category 가 없으면 파일 이름으로 정한다"""
+    import pandas as pd
+
+    df = pd.read_csv(path, usecols=lambda c: c in TEXT_COLUMNS)
+    df = df.where(df.notna(), "")
+    category = category or os.path.basename(path)
+    return [{"category": category, **record} for record in df.astype(str).to_dict("records")]
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="추가 기사 세그먼트 수집/병합")
+    commands = parser.add_subparsers(dest="command", required=True)
+    ingest_cmd = commands.add_parser("ingest", help="CSV 기사를 새 세그먼트로 추가")
+    ingest_cmd.add_argument("csv")
+    ingest_cmd.add_argument("--category", help="카테고리 (기본: CSV 파일 이름)")
+    commands.add_parser("merge", help="활성 세그먼트를 하나로 병합")
+    args = parser.parse_args()
+
+    store = get_segment_store()
+    if args.command == "ingest":
+        result = store.ingest(read_articles_csv(args.csv, args.category), background_merge=False)
+        print(f"세그먼트 추가 완료: {result['segment']} ({result['rows']}건, 활성 세그먼트 {result['segments']}개)")
+    else:
+        merged = store.merge()
+        print(f"세그먼트 병합 완료: {merged}" if merged else "병합할 세그먼트가 없습니다.")
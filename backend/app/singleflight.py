@@ -0,0 +1,75 @@
+# 동일 요청 합치기 (singleflight)
+#
+# 같은 키로 동시에 들어온 호출은 먼저 시작된 하나의 작업 결과를 함께 기다린다.
+# 작업은 별도 태스크로 돌기 때문에 먼저 호출한 쪽이 취소돼도 나머지는 결과를 받을 수 있고,
+# 기다리는 쪽이 모두 취소되면 작업도 취소한다.
+
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List
+from app.metrics import CallbackMetric
+
+logger = logging.getLogger(__name__)
+
+_groups: List["SingleFlight"] = []
+
+
+class _Call:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, _Call] = {}
+        self.calls = 0
+        self.executions = 0
+        self.deduplicated = 0
+        _groups.append(self)
+
+    async def do(self, key: str, fn: Callable[[], Awaitable]):
+        """key 로 진행 중인 작업이 있으면 그 결과를 기다리고, 없으면 fn() 을 실행"""
+        self.calls += 1
+        call = self._inflight.get(key)
+        if call is None:
+            call = _Call(asyncio.create_task(fn()))
+            self._inflight[key] = call
+            self.executions += 1
+            call.task.add_done_callback(lambda _, key=key, call=call: self._forget(key, call))
+        else:
+            self.deduplicated += 1
+            logger.debug(f"singleflight[{self.name}] 진행 중인 요청에 합류: {key[:40]}")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        except asyncio.CancelledError:
+            if call.waiters == 1 and not call.task.done():
+                call.task.cancel()
+            raise
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: str, call: _Call):
+        if self._inflight.get(key) is call:
+            del self._inflight[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "deduplicated": self.deduplicated,
+            "in_flight": len(self._inflight),
+        }
+
+
+def all_stats() -> dict:
+    return {group.name: group.stats() for group in _groups}
+
+
+CallbackMetric("reporter_singleflight_in_flight", "그룹별 진행 중인 합쳐진 작업 수", ["group"],
+               lambda: {(g.name,): len(g._inflight) for g in _groups})
+CallbackMetric("reporter_singleflight_deduplicated_total", "진행 중인 작업에 합류한 호출 수", ["group"],
+               lambda: {(g.name,): g.deduplicated for g in _groups}, kind="counter")
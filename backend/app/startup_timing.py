@@ -0,0 +1,70 @@
+# 콜드 스타트 측정 모드
+#
+# 새 인터프리터에서 `python -X importtime` 으로 대상 모듈을 임포트하고
+# 모듈별 임포트 비용을 집계해 보여준다.
+#
+#   python -m app.startup_timing              # app.main 기준, 상위 25개
+#   python -m app.startup_timing app.api -n 40
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(module: str) -> list:
+    """(모듈명, self_us, cumulative_us, 깊이) 목록"""
+    env = {**os.environ, "PYTHONPATH": BACKEND_DIR}
+    env.setdefault("GEMINI_API_KEY", "startup-timing")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "임포트 실패")
+
+    rows = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return rows
+
+
+def report(module: str, top: int):
+    rows = measure_imports(module)
+    total_us = max((cumulative for _, _, cumulative, _ in rows), default=0)
+
+    # 최상위 패키지별 self 시간 합계 (google.genai, pandas, mcp ...)
+    by_package = defaultdict(int)
+    for name, self_us, _, _ in rows:
+        parts = name.split(".")
+        package = ".".join(parts[:2]) if parts[0] in ("app", "google") else parts[0]
+        by_package[package] += self_us
+
+    print(f"{module} 임포트 총 {total_us / 1000:.1f} ms\n")
+    print(f"{'패키지':<40} {'ms':>10}")
+    for package, self_us in sorted(by_package.items(), key=lambda x: -x[1])[:top]:
+        print(f"{package:<40} {self_us / 1000:>10.1f}")
+
+    print(f"\n{'app 모듈 (누적)':<40} {'ms':>10}")
+    for name, _, cumulative_us, _ in sorted(rows, key=lambda x: -x[2]):
+        if name.startswith("app."):
+            print(f"{name:<40} {cumulative_us / 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모듈별 임포트 비용 측정")
+    parser.add_argument("module", nargs="?", default="app.main")
+    parser.add_argument("-n", "--top", type=int, default=25)
+    args = parser.parse_args()
+    report(args.module, args.top)
+
+
+if __name__ == "__main__":
+    main()
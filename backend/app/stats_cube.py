@@ -0,0 +1,273 @@
+# 기사 통계 집계 큐브
+#
+# 카테고리(CSV) x 월 x 지역 키워드 / 키워드 사전 카테고리(keyword_matcher)별 기사 수를 코퍼스에서 한 번 집계해 .npz 로 저장해 두고,
+# 통계 조회는 이 작은 배열만 잘라서 더한다 (원본 CSV 나 기사 본문은 읽지 않는다).
+# CSV(mtime/size)나 키워드 사전이 바뀌면 다시 집계한다. 추가 세그먼트(segments)의 기사는 세그먼트별로 따로 집계해 더한다.
+#
+# 오프라인 빌드: python -m app.stats_cube
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.config import STATS_CUBE_DIR, STATS_REGION_KEYWORDS
+from app.corpus import Corpus, csv_manifest, get_corpus
+from app.keyword_matcher import get_keyword_matcher
+
+logger = logging.getLogger(__name__)
+
+CUBE_VERSION = 2
+UNKNOWN_MONTH = "날짜 불명"
+MONTH_PATTERN = re.compile(r"^\d{4}-\d{2}$")
+
+
+def cube_key(manifest: dict) -> str:
+    payload = json.dumps({"version": CUBE_VERSION, "files": manifest, "regions": STATS_REGION_KEYWORDS,
+                          "keywords": get_keyword_matcher().fingerprint}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class StatsCube:
+    """카테고리 x 월 (x 지역 키워드) 기사 수
+
+    - docs[c, m]: 카테고리 c, 월 m 의 기사 수
+    - region_docs[c, m, r]: 그중 지역 키워드 r 이 제목/본문에 나온 기사 수 (한 기사가 여러 지역에 셀 수 있음)
+    - topic_docs[c, m, t]: 그중 키워드 사전 카테고리 t 의 용어가 하나라도 나온 기사 수
+    """
+
+    def __init__(self, categories: List[str], months: List[str], regions: List[str],
+                 docs: np.ndarray, region_docs: np.ndarray, manifest: dict,
+                 topics: List[str], topic_docs: np.ndarray):
+        self.categories = categories  # CSV 파일 이름 (행이 없는 CSV 도 포함)
+        self.months = months          # "YYYY-MM" 오름차순, 날짜 불명은 맨 뒤
+        self.regions = regions
+        self.docs = docs
+        self.region_docs = region_docs
+        self.manifest = manifest
+        self.topics = topics
+        self.topic_docs = topic_docs
+        self._category_pos = {c: i for i, c in enumerate(categories)}
+
+    @classmethod
+    def build(cls, corpus: Corpus = None) -> "StatsCube":
+        """코퍼스에서 집계 (pandas group-by 로 한 번에 계산)"""
+        import pandas as pd
+
+        corpus = corpus or get_corpus()
+        categories = [s["file"] for s in corpus.sources]
+        regions = list(STATS_REGION_KEYWORDS)
+
+        dates = pd.to_datetime(pd.Series(list(corpus.column("date")), dtype="string"), errors="coerce", format="mixed")
+        months = dates.dt.strftime("%Y-%m").fillna(UNKNOWN_MONTH)
+        month_labels = sorted(m for m in months.unique() if m != UNKNOWN_MONTH)
+        if (months == UNKNOWN_MONTH).any():
+            month_labels.append(UNKNOWN_MONTH)
+
+        frame = pd.DataFrame({
+            "category": np.asarray(corpus.source_ids, dtype=np.int64),
+            "month": pd.Categorical(months, categories=month_labels).codes.astype(np.int64),
+        })
+        texts = pd.Series(list(corpus.column("title")), dtype="string").str.cat(
+            pd.Series(list(corpus.column("body_prep")), dtype="string"), sep="\n").str.lower()
+        for r, region in enumerate(regions):
+            frame[f"r{r}"] = texts.str.contains(region.lower(), regex=False).fillna(False).astype(np.int64)
+        # 사전 카테고리는 용어가 많을 수 있으므로 Aho-Corasick 로 기사마다 한 번만 훑는다
+        matcher = get_keyword_matcher()
+        topics = matcher.category_names
+        topic_pos = {t: i for i, t in enumerate(topics)}
+        hits = np.zeros((len(frame), len(topics)), dtype=np.int64)
+        for row, text in enumerate(texts.fillna("")):
+            for topic in matcher.find_categories(text):
+                hits[row, topic_pos[topic]] = 1
+        for t in range(len(topics)):
+            frame[f"t{t}"] = hits[:, t]
+
+        shape = (len(categories), len(month_labels))
+        docs = np.zeros(shape, dtype=np.int64)
+        region_docs = np.zeros(shape + (len(regions),), dtype=np.int64)
+        topic_docs = np.zeros(shape + (len(topics),), dtype=np.int64)
+        if len(frame):
+            grouped = frame.groupby(["category", "month"], sort=False)
+            sizes = grouped.size()
+            c_idx = sizes.index.get_level_values(0).to_numpy()
+            m_idx = sizes.index.get_level_values(1).to_numpy()
+            docs[c_idx, m_idx] = sizes.to_numpy()
+            if regions:
+                sums = grouped[[f"r{r}" for r in range(len(regions))]].sum()
+                region_docs[sums.index.get_level_values(0).to_numpy(),
+                            sums.index.get_level_values(1).to_numpy()] = sums.to_numpy()
+            if topics:
+                sums = grouped[[f"t{t}" for t in range(len(topics))]].sum()
+                topic_docs[sums.index.get_level_values(0).to_numpy(),
+                           sums.index.get_level_values(1).to_numpy()] = sums.to_numpy()
+
+        logger.info(f"통계 큐브 생성: 카테고리 {len(categories)}, 월 {len(month_labels)}, 지역 {len(regions)}, "
+                    f"사전 카테고리 {len(topics)}")
+        return cls(categories, month_labels, regions, docs, region_docs, corpus.manifest, topics, topic_docs)
+
+    @classmethod
+    def combine(cls, cubes: List["StatsCube"]) -> "StatsCube":
+        """여러 큐브(기본 코퍼스 + 추가 세그먼트)의 기사 수를 합친 큐브 (카테고리/월은 합집합)"""
+        base = cubes[0]
+        categories = list(dict.fromkeys(c for cube in cubes for c in cube.categories))
+        months = sorted({m for cube in cubes for m in cube.months if m != UNKNOWN_MONTH})
+        if any(UNKNOWN_MONTH in cube.months for cube in cubes):
+            months.append(UNKNOWN_MONTH)
+        c_pos = {c: i for i, c in enumerate(categories)}
+        m_pos = {m: i for i, m in enumerate(months)}
+        docs = np.zeros((len(categories), len(months)), dtype=np.int64)
+        region_docs = np.zeros(docs.shape + (len(base.regions),), dtype=np.int64)
+        topic_docs = np.zeros(docs.shape + (len(base.topics),), dtype=np.int64)
+        for cube in cubes:
+            rows = np.ix_([c_pos[c] for c in cube.categories], [m_pos[m] for m in cube.months])
+            docs[rows] += cube.docs
+            region_docs[rows] += cube.region_docs
+            topic_docs[rows] += cube.topic_docs
+        return cls(categories, months, base.regions, docs, region_docs, base.manifest, base.topics, topic_docs)
+
+    def save(self, root: str = STATS_CUBE_DIR):
+        os.makedirs(root, exist_ok=True)
+        path = os.path.join(root, f"{cube_key(self.manifest)}.npz")
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        meta = json.dumps({
+            "categories": self.categories,
+            "months": self.months,
+            "regions": self.regions,
+            "topics": self.topics,
+            "manifest": self.manifest,
+        }, ensure_ascii=False)
+        np.savez(tmp_path, docs=self.docs, region_docs=self.region_docs, topic_docs=self.topic_docs,
+                 meta=np.array(meta))
+        os.replace(tmp_path, path)
+        for name in os.listdir(root):
+            if name.endswith(".npz") and os.path.join(root, name) != path and ".tmp" not in name:
+                os.remove(os.path.join(root, name))
+
+    @classmethod
+    def load(cls, root: str = STATS_CUBE_DIR) -> Optional["StatsCube"]:
+        """현재 CSV 에 맞는 큐브가 저장되어 있으면 로드"""
+        manifest = csv_manifest()
+        path = os.path.join(root, f"{cube_key(manifest)}.npz")
+        if not os.path.exists(path):
+            return None
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                return cls(meta["categories"], meta["months"], meta["regions"],
+                           data["docs"], data["region_docs"], manifest, meta["topics"], data["topic_docs"])
+        except Exception as e:
+            logger.warning(f"통계 큐브 로드 실패: {e}")
+            return None
+
+    def summary(self) -> Dict[str, dict]:
+        """CSV 별 기사 수 (get_statistics_summary 형식)"""
+        counts = self.docs.sum(axis=1)
+        return {
+            category: {'count': int(count), 'categories': category.replace('.csv', '')}
+            for category, count in zip(self.categories, counts)
+        }
+
+    def query(self, category: Optional[str] = None, start_month: Optional[str] = None,
+              end_month: Optional[str] = None) -> dict:
+        """카테고리/기간(YYYY-MM, 양끝 포함)으로 잘라 카테고리별/월별/지역별/사전 카테고리별 기사 수 반환
+
+        기간을 지정하면 날짜 불명 기사는 빠진다.
+        """
+        c_mask = np.ones(len(self.categories), dtype=bool)
+        if category:
+            name = category if category.endswith(".csv") else f"{category}.csv"
+            if name not in self._category_pos:
+                raise KeyError(f"알 수 없는 카테고리: {category}")
+            c_mask[:] = False
+            c_mask[self._category_pos[name]] = True
+
+        for month in (start_month, end_month):
+            if month and not MONTH_PATTERN.match(month):
+                raise ValueError(f"기간은 YYYY-MM 형식이어야 합니다: {month}")
+
+        m_mask = np.ones(len(self.months), dtype=bool)
+        if start_month or end_month:
+            labels = np.array(self.months, dtype=object)
+            m_mask = labels != UNKNOWN_MONTH
+            if start_month:
+                m_mask &= labels >= start_month
+            if end_month:
+                m_mask &= labels <= end_month
+
+        docs = self.docs[np.ix_(c_mask, m_mask)]
+        region_docs = self.region_docs[np.ix_(c_mask, m_mask)] if self.regions else None
+        topic_docs = self.topic_docs[np.ix_(c_mask, m_mask)] if self.topics else None
+        by_category = docs.sum(axis=1)
+        by_month = docs.sum(axis=0)
+        by_region = region_docs.sum(axis=(0, 1)) if region_docs is not None else []
+        by_topic = topic_docs.sum(axis=(0, 1)) if topic_docs is not None else []
+
+        categories = [c.replace('.csv', '') for c, keep in zip(self.categories, c_mask) if keep]
+        months = [m for m, keep in zip(self.months, m_mask) if keep]
+        return {
+            "total": int(docs.sum()),
+            "by_category": {c: int(n) for c, n in zip(categories, by_category)},
+            "by_month": {m: int(n) for m, n in zip(months, by_month) if n},
+            "by_region": {r: int(n) for r, n in zip(self.regions, by_region) if n},
+            "by_topic": {t: int(n) for t, n in zip(self.topics, by_topic) if n},
+        }
+
+
+_cube: Optional[StatsCube] = None
+_cube_lock = threading.Lock()
+
+
+def get_stats_cube() -> StatsCube:
+    """통계 큐브 (CSV 가 바뀌었으면 다시 집계해 저장)"""
+    global _cube
+    if _cube is not None and _cube.manifest == csv_manifest():
+        return _cube
+    with _cube_lock:
+        if _cube is not None and _cube.manifest == csv_manifest():
+            return _cube
+        cube = StatsCube.load()
+        if cube is None:
+            cube = StatsCube.build()
+            try:
+                cube.save()
+            except OSError as e:
+                logger.warning(f"통계 큐브 저장 실패: {e}")
+        _cube = cube
+        return _cube
+
+
+_segment_cubes: Dict[str, StatsCube] = {}
+_combined: Optional[tuple] = None  # ((기본 큐브 id, 세그먼트 이름들), 합친 큐브)
+
+
+def get_combined_cube(segments) -> StatsCube:
+    """기본 코퍼스 큐브에 추가 세그먼트(segments.get_segments())의 기사 수를 더한 큐브
+
+    세그먼트 큐브는 작아서 메모리에서 바로 집계하고, 활성 세그먼트 목록이 바뀔 때만 다시 합친다.
+    """
+    global _combined, _segment_cubes
+    base = get_stats_cube()
+    if not segments:
+        return base
+    key = (id(base), tuple(segment.name for segment in segments))
+    if _combined is not None and _combined[0] == key:
+        return _combined[1]
+    with _cube_lock:
+        cubes = {s.name: _segment_cubes.get(s.name) or StatsCube.build(s.corpus) for s in segments}
+        _segment_cubes = cubes
+        combined = StatsCube.combine([base] + list(cubes.values()))
+        _combined = (key, combined)
+        return combined
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    cube = StatsCube.build()
+    cube.save()
+    print(f"통계 큐브 저장 완료: {STATS_CUBE_DIR} (카테고리 {len(cube.categories)}, 월 {len(cube.months)})")
@@ -0,0 +1,301 @@
+# 유사 사건 의미 검색용 로컬 벡터 색인
+#
+# 코퍼스의 모든 기사(title + body_prep)를 float32 임베딩 행렬로 만들어 디스크에 두고,
+# IVF(역파일) 방식 근사 최근접 검색으로 상황 설명과 코사인 유사도가 높은 기사를 찾는다.
+#
+# - 임베딩: EMBEDDING_MODEL 이 지정되어 있고 sentence-transformers 가 설치되어 있으면 로컬 모델,
+#   아니면 어절/문자 n-gram 을 해시해 고정 차원에 흩뿌린 벡터 (네트워크, 추가 패키지 불필요)
+# - 색인: 구형 k-means 로 벡터를 n_lists 개 묶음으로 나누고, 벡터를 묶음 순서대로 저장해 둔다.
+#   검색은 질의와 가까운 중심 nprobe 개의 묶음만 연속 구간으로 읽어 내적한다.
+#
+# 파일은 .npy 로 저장해 np.load(mmap_mode="r") 로 연다. 오프라인 빌드: python -m app.vector_index
+
+import hashlib
+import json
+import logging
+import math
+import os
+import shutil
+import tempfile
+import threading
+import zlib
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from app.config import VECTOR_INDEX_DIR, EMBEDDING_MODEL, EMBEDDING_DIM, VECTOR_NPROBE, NEAR_DUP_OVERFETCH
+from app.bm25 import tokenize, top_k_indices
+from app.corpus import Corpus, get_corpus, manifest_key
+from app.near_dup import unique_hits
+
+logger = logging.getLogger(__name__)
+
+VECTOR_VERSION = 1
+ENCODE_BATCH = 512
+KMEANS_ITERATIONS = 10
+KMEANS_SAMPLE_PER_LIST = 64  # k-means 학습에 묶음당 이 정도 표본만 쓴다
+
+
+@lru_cache(maxsize=1 << 16)
+def _hash_bucket(dim: int, gram: str) -> Tuple[int, float]:
+    """gram 이 누적될 차원과 부호 (메서드에 lru_cache 를 달면 인스턴스가 캐시에 붙잡히므로 모듈 함수로 둔다)"""
+    h = zlib.crc32(gram.encode("utf-8"))
+    return h % dim, (1.0 if h & 0x80000000 else -1.0)
+
+
+class HashingEmbedder:
+    """어절 + 문자 2/3-gram 을 부호 있는 해시로 dim 차원에 누적한 뒤 L2 정규화 (1 + log tf 가중)"""
+
+    def __init__(self, dim: int = EMBEDDING_DIM):
+        self.dim = dim
+        self.name = f"hash-{dim}"
+
+    def _features(self, text: str):
+        grams = tokenize(text)
+        for word in text.lower().split():
+            grams[f"#{word}"] += 1
+        return grams
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, text in enumerate(texts):
+            for gram, tf in self._features(text).items():
+                col, sign = _hash_bucket(self.dim, gram)
+                vectors[i, col] += sign * (1.0 + math.log(tf))
+        return _normalize(vectors)
+
+
+class SentenceTransformerEmbedder:
+    """로컬 sentence-transformers 모델 (모델 파일은 미리 받아 두어야 한다)"""
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import SentenceTransformer
+
+        self.model = SentenceTransformer(model_name)
+        self.dim = self.model.get_sentence_embedding_dimension()
+        self.name = f"st-{model_name}"
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        vectors = self.model.encode(texts, batch_size=64, normalize_embeddings=True, show_progress_bar=False)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """설정된 임베딩 모델 (sentence-transformers 가 없으면 해시 임베딩으로 대체)"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if EMBEDDING_MODEL:
+                try:
+                    _embedder = SentenceTransformerEmbedder(EMBEDDING_MODEL)
+                except ImportError:
+                    logger.warning("sentence-transformers 가 설치되어 있지 않아 해시 임베딩을 사용합니다.")
+            if _embedder is None:
+                _embedder = HashingEmbedder()
+        return _embedder
+
+
+def document_text(title: str, body: str) -> str:
+    return f"{title}\n{title}\n{body}"  # 제목은 두 번 넣어 본문보다 무겁게
+
+
+def spherical_kmeans(vectors: np.ndarray, n_lists: int, seed: int = 0) -> np.ndarray:
+    """정규화된 벡터의 구형 k-means 중심 (표본으로 학습)"""
+    rng = np.random.default_rng(seed)
+    sample_size = min(len(vectors), n_lists * KMEANS_SAMPLE_PER_LIST)
+    sample = np.asarray(vectors[np.sort(rng.choice(len(vectors), sample_size, replace=False))])
+    centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+    for _ in range(KMEANS_ITERATIONS):
+        assign = np.argmax(sample @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, sample)
+        filled = np.bincount(assign, minlength=n_lists) > 0
+        centroids[filled] = sums[filled]  # 빈 묶음은 이전 중심을 그대로 둔다
+        _normalize(centroids)
+    return centroids
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    """벡터별 가장 가까운 중심 번호 (큰 행렬을 한 번에 만들지 않도록 나눠서 계산)"""
+    assign = np.empty(len(vectors), dtype=np.int32)
+    for start in range(0, len(vectors), 8192):
+        block = np.asarray(vectors[start:start + 8192])
+        assign[start:start + len(block)] = np.argmax(block @ centroids.T, axis=1)
+    return assign
+
+
+class VectorIndex:
+    """IVF 벡터 색인
+
+    - centroids[l]: 묶음 l 의 중심
+    - vectors / rows: 묶음 순서로 정렬된 임베딩과 그 코퍼스 행 번호
+    - offsets[l]:offsets[l + 1]: 묶음 l 의 구간
+    """
+
+    def __init__(self, corpus: Corpus, embedder, centroids: np.ndarray, offsets: np.ndarray,
+                 vectors: np.ndarray, rows: np.ndarray, key: str):
+        self.corpus = corpus
+        self.embedder = embedder
+        self.centroids = centroids
+        self.offsets = offsets
+        self.vectors = vectors
+        self.rows = rows
+        self.key = key
+
+    def __len__(self):
+        return len(self.rows)
+
+    @classmethod
+    def build(cls, corpus: Corpus = None, embedder=None) -> "VectorIndex":
+        corpus = corpus or get_corpus()
+        embedder = embedder or get_embedder()
+        rows = corpus.rows_with("title", "body_prep").astype(np.int32)
+        titles, bodies = corpus.column("title"), corpus.column("body_prep")
+
+        vectors = np.zeros((len(rows), embedder.dim), dtype=np.float32)
+        for start in range(0, len(rows), ENCODE_BATCH):
+            batch = rows[start:start + ENCODE_BATCH]
+            vectors[start:start + len(batch)] = embedder.encode(
+                [document_text(titles[row], bodies[row]) for row in batch])
+
+        n_lists = max(1, min(4096, round(math.sqrt(len(rows)))))
+        if len(rows):
+            centroids = spherical_kmeans(vectors, n_lists)
+            assign = assign_lists(vectors, centroids)
+        else:
+            centroids = np.zeros((0, embedder.dim), dtype=np.float32)
+            assign = np.zeros(0, dtype=np.int32)
+        order = np.argsort(assign, kind="stable")
+        offsets = np.zeros(len(centroids) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assign, minlength=len(centroids)), out=offsets[1:])
+
+        logger.info(f"벡터 색인 생성: 문서 {len(rows)}건, {embedder.name}, 묶음 {len(centroids)}개")
+        return cls(corpus, embedder, centroids, offsets, vectors[order], rows[order],
+                   index_key(corpus, embedder))
+
+    def save(self, root: str = VECTOR_INDEX_DIR):
+        os.makedirs(root, exist_ok=True)
+        target = os.path.join(root, self.key)
+        tmp_dir = tempfile.mkdtemp(prefix=f".{self.key}.", dir=root)
+        try:
+            for name in ("centroids", "offsets", "vectors", "rows"):
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+            with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+                json.dump({"version": VECTOR_VERSION, "embedder": self.embedder.name}, f, ensure_ascii=False)
+            if os.path.exists(target):
+                shutil.rmtree(target, ignore_errors=True)
+            os.rename(tmp_dir, target)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+        for name in os.listdir(root):
+            if name != self.key and not name.startswith("."):
+                shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+    @classmethod
+    def load(cls, corpus: Corpus = None, embedder=None, root: str = VECTOR_INDEX_DIR) -> Optional["VectorIndex"]:
+        """코퍼스와 임베딩 모델에 맞는 색인이 저장되어 있으면 연다 (없으면 None)"""
+        corpus = corpus or get_corpus()
+        embedder = embedder or get_embedder()
+        key = index_key(corpus, embedder)
+        path = os.path.join(root, key)
+        try:
+            with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            if meta.get("version") != VECTOR_VERSION:
+                return None
+            arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+                      for name in ("centroids", "offsets", "vectors", "rows")}
+            return cls(corpus, embedder, np.asarray(arrays["centroids"]), np.asarray(arrays["offsets"]),
+                       arrays["vectors"], arrays["rows"], key)
+        except (OSError, ValueError) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"벡터 색인 로드 실패: {e}")
+            return None
+
+    def top_k(self, text: str, k: int = 5, nprobe: int = VECTOR_NPROBE) -> List[Tuple[int, float]]:
+        """코사인 유사도 상위 k 개 (코퍼스 행 번호, 유사도), 질의와 가까운 nprobe 개 묶음만 탐색"""
+        return self.top_k_vector(self.embedder.encode([text])[0], k, nprobe)
+
+    def top_k_vector(self, query: np.ndarray, k: int = 5, nprobe: int = VECTOR_NPROBE) -> List[Tuple[int, float]]:
+        if not len(self.rows) or not query.any():
+            return []
+        lists = np.arange(len(self.centroids))
+        nprobe = max(1, nprobe)
+        if nprobe < len(lists):
+            lists = np.argpartition(self.centroids @ query, -nprobe)[-nprobe:]
+        spans = [(int(self.offsets[l]), int(self.offsets[l + 1])) for l in np.sort(lists)]
+        positions = np.concatenate([np.arange(start, end) for start, end in spans])
+        scores = np.concatenate([np.asarray(self.vectors[start:end]) @ query for start, end in spans])
+        return [(int(self.rows[positions[i]]), float(scores[i])) for i in top_k_indices(scores, k)]
+
+    def search(self, text: str, limit: int = 5, nprobe: int = VECTOR_NPROBE) -> List[dict]:
+        """유사 사건 결과 (코사인 유사도 내림차순, 점수 포함)"""
+        return search_indexes([self], text, limit, nprobe)
+
+
+def search_indexes(indexes: List[VectorIndex], text: str, limit: int = 5,
+                   nprobe: int = VECTOR_NPROBE, signatures: list = None) -> List[dict]:
+    """여러 색인(기본 코퍼스 + 추가 세그먼트)을 함께 검색해 코사인 유사도순으로 합친다
+
+    signatures(색인별 CorpusSignatures)를 주면 앞쪽 결과와 거의 같은 기사는 뺀다.
+    """
+    if not indexes:
+        return []
+    query = indexes[0].embedder.encode([text])[0]
+    k = limit * NEAR_DUP_OVERFETCH if signatures else limit
+    hits = []
+    for i, index in enumerate(indexes):
+        hits.extend((score, i, row) for row, score in index.top_k_vector(query, k, nprobe))
+    hits.sort(key=lambda hit: -hit[0])
+    if signatures:
+        hits = unique_hits(hits, lambda hit: signatures[hit[1]][hit[2]], source="similar_cases")
+    return [{**indexes[i].corpus.case(row), 'score': round(score, 4)} for score, i, row in hits[:limit]]
+
+
+def index_key(corpus: Corpus, embedder) -> str:
+    payload = f"{VECTOR_VERSION}:{manifest_key(corpus.manifest)}:{embedder.name}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+_index: Optional[VectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index() -> VectorIndex:
+    """벡터 색인 (코퍼스가 바뀌었으면 다시 빌드해 저장)"""
+    global _index
+    corpus = get_corpus()
+    if _index is not None and _index.corpus is corpus:
+        return _index
+    with _index_lock:
+        if _index is not None and _index.corpus is corpus:
+            return _index
+        index = VectorIndex.load(corpus)
+        if index is None:
+            index = VectorIndex.build(corpus)
+            try:
+                index.save()
+            except OSError as e:
+                logger.warning(f"벡터 색인 저장 실패: {e}")
+        _index = index
+        return _index
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    index = VectorIndex.build()
+    index.save()
+    print(f"벡터 색인 저장 완료: {VECTOR_INDEX_DIR} (문서 {len(index)}건, {index.embedder.name}, "
+          f"묶음 {len(index.centroids)}개)")
@@ -0,0 +1,115 @@
+# 벤치마크용 가짜 genai.Client
+#
+# client.aio.models.generate_content / generate_content_stream 만 흉내 낸다.
+# 프롬프트 종류(디렉팅/관점/기사 분석/뉴스 검색/종합 요약)에 맞는 고정 응답을
+# 설정한 지연 시간 뒤에 돌려주고, tools 에 MCP 세션이 있으면 실제로 도구를 호출한다.
+
+import asyncio
+import json
+import random
+import re
+from types import SimpleNamespace
+
+DIRECTING = {
+    "issues": ["정신질환자 관리 체계의 공백", "주취 폭력 대응 매뉴얼", "지역 치안 인력 부족"],
+    "questions": [
+        {"target": "경찰/수사기관", "questions": ["출동까지 걸린 시간은?", "용의자 추적 상황은?"]},
+        {"target": "피해자/목격자", "questions": ["당시 상황은 어땠나?", "평소 용의자를 본 적이 있나?"]},
+    ],
+    "angles": ["제도 공백", "지역 안전"],
+    "interpretation": "개인 일탈이 아니라 반복되는 관리 체계의 문제로 볼 수 있다.",
+    "additionalPoints": ["최근 3년 유사 사건 통계", "지자체 정신건강 예산"],
+    "checklist": ["현장 CCTV 위치 확인", "목격자 연락처 확보"],
+}
+
+
+class FakeResponse:
+    def __init__(self, text: str, prompt_tokens: int, output_tokens: int):
+        self.text = text
+        self.usage_metadata = SimpleNamespace(
+            prompt_token_count=prompt_tokens,
+            candidates_token_count=output_tokens,
+            total_token_count=prompt_tokens + output_tokens,
+        )
+
+
+def _contents_text(contents) -> str:
+    return contents if isinstance(contents, str) else str(contents)
+
+
+def fake_answer(prompt: str, config=None) -> str:
+    """프롬프트 종류에 맞는 고정 응답 (구조화 출력을 요청하면 코드 블록 없이 JSON 만)"""
+    match = re.search(r"'(.+?)' 관점에서", prompt)
+    if match:
+        return json.dumps({"perspectives": [{
+            "viewpoint": match.group(1),
+            "issues": ["쟁점 1", "쟁점 2"],
+            "questions": ["질문 1", "질문 2"],
+            "implications": ["시사점 1", "시사점 2"],
+        }]}, ensure_ascii=False)
+    if "기사 한 건" in prompt:
+        title = re.search(r"기사:\s*\n\s*(.+)", prompt)
+        return json.dumps({
+            "title": title.group(1).strip()[:60] if title else "기사",
+            "angles": ["사건 경위 중심", "제도 비판"],
+            "issues": ["재발 방지 대책", "수사 적정성"],
+            "framing": "지역 안전 문제로 프레이밍",
+            "implications": ["관리 체계 점검 필요"],
+        }, ensure_ascii=False)
+    if '"checklist"' in prompt:
+        text = json.dumps(DIRECTING, ensure_ascii=False, indent=2)
+        if getattr(config, "response_mime_type", None) == "application/json":
+            return text
+        return "```json\n" + text + "\n```"
+    return "1. 반복 쟁점: 관리 체계 공백\n2. 차이점: 책임 주체에 대한 시각\n3. 사회적 시사점: 제도 보완 필요"
+
+
+class FakeModels:
+    def __init__(self, latency: float, jitter: float):
+        self.latency = latency
+        self.jitter = jitter
+        self.calls = 0
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    async def _call_mcp_tools(self, prompt: str, tools) -> str:
+        for tool in tools or []:
+            if hasattr(tool, "call_tool") and hasattr(tool, "list_tools"):
+                listed = await tool.list_tools()
+                query = re.search(r"'(.+?)'", prompt)
+                result = await tool.call_tool(listed.tools[0].name, {"query": query.group(1) if query else prompt})
+                return "\n".join(getattr(c, "text", "") for c in result.content)
+        return None
+
+    async def generate_content(self, model: str, contents, config=None):
+        self.calls += 1
+        prompt = _contents_text(contents)
+        tool_text = await self._call_mcp_tools(prompt, getattr(config, "tools", None))
+        await asyncio.sleep(self._delay())
+        text = tool_text if tool_text is not None else fake_answer(prompt, config)
+        return FakeResponse(text, len(prompt) // 2, len(text) // 2)
+
+    async def generate_content_stream(self, model: str, contents, config=None):
+        self.calls += 1
+        prompt = _contents_text(contents)
+        tool_text = await self._call_mcp_tools(prompt, getattr(config, "tools", None))
+        text = tool_text if tool_text is not None else fake_answer(prompt, config)
+        chunk_size = 32
+        pieces = [text[i:i + chunk_size] for i in range(0, len(text), chunk_size)] or [""]
+        delay = self._delay() / len(pieces)
+
+        async def stream():
+            for piece in pieces:
+                await asyncio.sleep(delay)
+                yield FakeResponse(piece, len(prompt) // 2, len(piece) // 2)
+
+        return stream()
+
+
+class FakeGenaiClient:
+    """genai.Client 대용 (aio.models 만 제공)"""
+
+    def __init__(self, latency: float = 0.5, jitter: float = 0.1):
+        self.models = FakeModels(latency, jitter)
+        self.aio = SimpleNamespace(models=self.models)
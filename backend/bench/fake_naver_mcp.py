@@ -0,0 +1,40 @@
+# 벤치마크용 가짜 네이버 검색 MCP 서버 (stdio)
+#
+# 실제 @isnow890/naver-search-mcp 대신 띄워서 네트워크 없이 MCP 세션/도구 호출 비용만 측정한다.
+# FAKE_MCP_LATENCY (초) 만큼 기다린 뒤 가짜 기사 목록을 돌려준다.
+
+import asyncio
+import os
+
+from mcp.server.fastmcp import FastMCP
+
+LATENCY = float(os.getenv("FAKE_MCP_LATENCY", "0.05"))
+
+mcp = FastMCP("fake-naver-search")
+
+# 기사마다 본문을 다르게 해서 거의 같은 기사 묶기(near_dup)에 합쳐지지 않게 한다
+LEADS = [
+    "경찰이 수사에 나섰다. 주민들은 재발 방지 대책을 요구했다.",
+    "구청은 긴급 대책 회의를 열고 현장 점검 일정을 발표했다.",
+    "전문가들은 관리 인력 부족과 예산 문제를 원인으로 지적했다.",
+    "피해자 가족은 당국의 늑장 대응을 비판하며 책임자 처벌을 촉구했다.",
+    "시의회는 관련 조례 개정안을 다음 회기에 상정하기로 했다.",
+]
+
+
+@mcp.tool()
+async def search_news(query: str, display: int = 3) -> str:
+    """네이버 뉴스 검색 (가짜)"""
+    await asyncio.sleep(LATENCY)
+    items = []
+    for i in range(1, display + 1):
+        items.append(
+            f"{i}. [{query}] 관련 보도 {i}\n"
+            f"   언론사: 가짜일보 | 날짜: 2024-01-0{i}\n"
+            f"   요약: {query} 사건과 관련해 {LEADS[(i - 1) % len(LEADS)]}"
+        )
+    return "\n".join(items)
+
+
+if __name__ == "__main__":
+    mcp.run()
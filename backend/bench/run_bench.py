@@ -0,0 +1,255 @@
+# 백엔드 오프라인 벤치마크
+#
+# app.main 의 FastAPI 앱을 같은 프로세스에서 uvicorn 으로 띄우고,
+# Gemini 는 지연 시간을 조절할 수 있는 가짜 클라이언트로, 네이버 MCP 는 가짜 stdio 서버로 바꿔
+# 엔드포인트별 동시 부하를 걸어 p50/p95/p99 와 초당 처리량을 측정한다.
+#
+# 사용법 (backend 디렉터리에서):
+#   python -m bench.run_bench --requests 200 --concurrency 20 --gemini-latency 0.5
+#   python -m bench.run_bench --compare bench/results/<이전 결과>.json
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+
+ENDPOINTS = ["direct", "perspective", "news-search", "news-analyze", "news-research"]
+
+SITUATION = "구로구에서 만취 남성이 흉기를 들고 행인을 위협했다. 경찰이 출동했지만 용의자는 도주한 상태다."
+ARTICLES = "\n".join(
+    f"{i}. 구로구 흉기 난동 관련 보도 {i}\n   요약: {summary}"
+    for i, summary in enumerate([
+        "만취 남성이 흉기를 들고 행인을 위협했다. 경찰이 수사 중이다.",
+        "구청은 주택가 순찰을 늘리고 방범 카메라를 추가로 설치하기로 했다.",
+        "전문가들은 주취 폭력 대응 매뉴얼의 공백을 지적했다.",
+    ], start=1)
+)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="AI 취재 디렉터 백엔드 오프라인 벤치마크")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="측정할 엔드포인트 (쉼표 구분)")
+    parser.add_argument("--requests", type=int, default=100, help="엔드포인트별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수")
+    parser.add_argument("--gemini-latency", type=float, default=0.5, help="가짜 Gemini 평균 지연(초)")
+    parser.add_argument("--gemini-jitter", type=float, default=0.1, help="가짜 Gemini 지연 편차(초)")
+    parser.add_argument("--mcp-latency", type=float, default=0.05, help="가짜 MCP 도구 지연(초)")
+    parser.add_argument("--repeat-inputs", action="store_true",
+                        help="모든 요청에 같은 입력 사용 (캐시/요청 합치기 효과 측정)")
+    parser.add_argument("--enable-cache", action="store_true", help="응답 캐시 사용")
+    parser.add_argument("--llm-rpm", type=float, default=0,
+                        help="LLM 스케줄러 분당 요청 한도 (기본 0 = 제한 없음, 운영 한도를 재려면 지정)")
+    parser.add_argument("--llm-tpm", type=float, default=0, help="LLM 스케줄러 분당 토큰 한도 (기본 0 = 제한 없음)")
+    parser.add_argument("--label", default="", help="결과 파일에 붙일 이름")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON 경로")
+    parser.add_argument("--no-save", action="store_true", help="결과 파일 저장 안 함")
+    return parser.parse_args()
+
+
+def configure_environment(args):
+    """app 모듈을 임포트하기 전에 가짜 MCP 서버와 캐시 설정을 환경 변수로 지정"""
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    os.environ["NAVER_MCP_COMMAND"] = sys.executable
+    os.environ["NAVER_MCP_ARGS"] = os.path.join(BENCH_DIR, "fake_naver_mcp.py")
+    os.environ["FAKE_MCP_LATENCY"] = str(args.mcp_latency)
+    # naver_server_params 는 명시한 환경 변수만 서버 프로세스에 넘기므로 지연 설정을 넘기도록 지정
+    os.environ["NAVER_MCP_PASS_ENV"] = "FAKE_MCP_LATENCY"
+    os.environ["RESPONSE_CACHE_ENABLED"] = "true" if args.enable_cache else "false"
+    # 운영 기본 한도(분당 300회)가 걸려 있으면 가짜 Gemini 지연 대신 토큰 버킷 속도를 재게 되므로 기본은 끈다
+    for provider in ("GEMINI", "OPENAI"):
+        os.environ[f"{provider}_RPM"] = str(args.llm_rpm)
+        os.environ[f"{provider}_TPM"] = str(args.llm_tpm)
+    os.environ["LLM_WORKERS"] = "1"
+    if BACKEND_DIR not in sys.path:
+        sys.path.insert(0, BACKEND_DIR)
+
+
+def install_fake_gemini(args):
+    from bench.fake_gemini import FakeGenaiClient
+    from app import gemini_utils
+
+    fake = FakeGenaiClient(latency=args.gemini_latency, jitter=args.gemini_jitter)
+    gemini_utils.client = fake
+    return fake
+
+
+def request_body(endpoint: str, i: int, repeat: bool) -> dict:
+    suffix = "" if repeat else f" (사례 {i})"
+    if endpoint == "direct":
+        return {"situation": SITUATION + suffix}
+    if endpoint == "perspective":
+        return {"situation": SITUATION + suffix, "perspective": "법적 관점"}
+    if endpoint in ("news-search", "news-research"):
+        return {"topic": "구로구 흉기 난동" + suffix}
+    if endpoint == "news-analyze":
+        return {"news_articles": ARTICLES + suffix}
+    raise ValueError(f"알 수 없는 엔드포인트: {endpoint}")
+
+
+def percentile(ordered, p):
+    if not ordered:
+        return None
+    idx = min(len(ordered) - 1, max(0, int(round(p / 100 * (len(ordered) - 1)))))
+    return ordered[idx]
+
+
+async def run_endpoint(http, base_url: str, endpoint: str, args) -> dict:
+    import httpx
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies, errors = [], 0
+
+    async def one(i: int):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await http.post(f"{base_url}/api/{endpoint}", json=request_body(endpoint, i, args.repeat_inputs))
+                ok = response.status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            elapsed = time.perf_counter() - started
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(args.requests)))
+    wall = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+
+    def ms(value):
+        return round(value * 1000, 1) if value is not None else None
+
+    return {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "rps": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": ms(percentile(ordered, 50)),
+        "p95_ms": ms(percentile(ordered, 95)),
+        "p99_ms": ms(percentile(ordered, 99)),
+        "max_ms": ms(ordered[-1] if ordered else None),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def run(args) -> dict:
+    import httpx
+    import uvicorn
+
+    fake = install_fake_gemini(args)
+    from app.main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        if server_task.done():
+            raise RuntimeError("벤치마크 서버 시작 실패")
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        async with httpx.AsyncClient(timeout=120, limits=limits) as http:
+            for endpoint in [e.strip() for e in args.endpoints.split(",") if e.strip()]:
+                calls_before = fake.models.calls
+                results[endpoint] = await run_endpoint(http, base_url, endpoint, args)
+                results[endpoint]["gemini_calls"] = fake.models.calls - calls_before
+                print_row(endpoint, results[endpoint])
+    finally:
+        server.should_exit = True
+        await server_task
+    return results
+
+
+def print_row(endpoint: str, row: dict):
+    print(f"{endpoint:<14} ok={row['ok']:<5} err={row['errors']:<4} rps={row['rps']!s:<8} "
+          f"p50={row['p50_ms']!s:<8} p95={row['p95_ms']!s:<8} p99={row['p99_ms']!s:<8} "
+          f"gemini_calls={row.get('gemini_calls')}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return "unknown"
+
+
+def compare(current: dict, previous_path: str):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = json.load(f)
+    print(f"\n비교 대상: {previous_path} ({previous.get('revision')})")
+    settings = previous.get("settings", {})
+    if (settings.get("llm_rpm"), settings.get("llm_tpm")) != (current["settings"]["llm_rpm"], current["settings"]["llm_tpm"]):
+        # llm_rpm 이 없는 이전 결과는 운영 기본 한도로 잰 것이라 그대로 비교할 수 없다
+        print("주의: LLM 호출 한도 설정이 달라 수치를 그대로 비교할 수 없습니다. 기준 결과를 다시 만드세요.")
+    for endpoint, row in current["results"].items():
+        old = previous.get("results", {}).get(endpoint)
+        if not old:
+            continue
+        deltas = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            if row.get(key) is not None and old.get(key):
+                deltas.append(f"{key} {old[key]} -> {row[key]} ({(row[key] - old[key]) / old[key] * 100:+.1f}%)")
+        print(f"{endpoint:<14} " + ", ".join(deltas))
+
+
+def main():
+    args = parse_args()
+    configure_environment(args)
+    results = asyncio.run(run(args))
+
+    report = {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "label": args.label,
+        "settings": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "gemini_latency": args.gemini_latency,
+            "gemini_jitter": args.gemini_jitter,
+            "mcp_latency": args.mcp_latency,
+            "repeat_inputs": args.repeat_inputs,
+            "enable_cache": args.enable_cache,
+            "llm_rpm": args.llm_rpm,
+            "llm_tpm": args.llm_tpm,
+        },
+        "results": results,
+    }
+
+    if not args.no_save:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        name = f"{datetime.now():%Y%m%d-%H%M%S}-{report['revision']}{'-' + args.label if args.label else ''}.json"
+        path = os.path.join(RESULTS_DIR, name)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\n결과 저장: {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
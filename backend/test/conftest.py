@@ -0,0 +1,13 @@
+# 단위 테스트 공통 설정
+#
+# test_naver_search.py / test_notion.py 는 실제 Gemini·네이버·Notion 을 부르는 수동 실행 스크립트라 수집하지 않는다.
+# 실행: backend 디렉터리에서 python -m pytest -q test
+
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+collect_ignore = ["test_naver_search.py", "test_notion.py"]
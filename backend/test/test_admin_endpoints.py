@@ -0,0 +1,61 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app import api
+
+ARTICLE = {"category": "accident", "date": "2024-05-01", "title": "지하철역 난동", "body_prep": "지하철역 에서 난동"}
+
+
+class FakeStore:
+    def __init__(self):
+        self.ingested = []
+
+    def ingest(self, articles):
+        self.ingested.extend(articles)
+        return {"segment": "seg-1", "rows": len(articles), "segments": 1}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    store = FakeStore()
+    monkeypatch.setattr(api, "get_segment_store", lambda: store)
+    app = FastAPI()
+    app.include_router(api.router, prefix="/api")
+    client = TestClient(app)
+    client.store = store
+    return client
+
+
+def test_admin_endpoints_are_closed_without_a_configured_token(client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "")
+    assert client.post("/api/ingest", json={"articles": [ARTICLE]}).status_code == 403
+    assert client.delete("/api/cache", headers={"X-Admin-Token": ""}).status_code == 403
+    assert client.store.ingested == []
+
+
+def test_wrong_token_is_rejected(client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/ingest", json={"articles": [ARTICLE]}).status_code == 401
+    assert client.delete("/api/cache", headers={"X-Admin-Token": "guess"}).status_code == 401
+
+
+def test_ingest_with_token(client, monkeypatch):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    response = client.post("/api/ingest", json={"articles": [ARTICLE]}, headers={"X-Admin-Token": "secret"})
+    assert response.status_code == 200
+    assert response.json()["rows"] == 1
+    assert client.store.ingested[0]["title"] == "지하철역 난동"
+
+
+@pytest.mark.parametrize("body", [
+    {"articles": []},
+    {"articles": [ARTICLE] * 501},
+    {"articles": [dict(ARTICLE, title="가" * 301)]},
+    {"articles": [dict(ARTICLE, body_prep="")]},
+    {"articles": [dict(ARTICLE, body_prep="가" * 20001)]},
+])
+def test_ingest_bounds(client, monkeypatch, body):
+    monkeypatch.setattr(api, "ADMIN_TOKEN", "secret")
+    assert client.post("/api/ingest", json=body, headers={"X-Admin-Token": "secret"}).status_code == 422
+    assert client.store.ingested == []
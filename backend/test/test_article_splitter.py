@@ -0,0 +1,53 @@
+import pytest
+
+from app.gemini_utils import ArticleSplitter, article_title, split_articles
+
+RESULT = """다음은 검색된 기사입니다:
+
+1. **구로구 아파트 흉기 난동**
+주민 두 명이 다쳤다.
+
+2) 경찰, 30대 남성 체포
+현행범으로 체포했다.
+
+### 3. 범행 동기 조사
+경찰이 동기를 조사 중이다."""
+
+
+def test_split_articles_drops_the_preamble():
+    articles = split_articles(RESULT)
+    assert len(articles) == 3
+    assert articles[0].startswith("1. **구로구")
+    assert articles[2].endswith("조사 중이다.")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("", []),
+    ("번호 없는 검색 결과", ["번호 없는 검색 결과"]),
+    ("[1] 첫 기사\n내용\n[2] 둘째 기사", ["[1] 첫 기사\n내용", "[2] 둘째 기사"]),
+])
+def test_split_articles_edge_cases(text, expected):
+    assert split_articles(text) == expected
+
+
+def test_article_title_strips_markers():
+    assert [article_title(a) for a in split_articles(RESULT)] == [
+        "구로구 아파트 흉기 난동", "경찰, 30대 남성 체포", "범행 동기 조사"]
+
+
+@pytest.mark.parametrize("step", [1, 5, 17, len(RESULT)])
+def test_splitter_matches_split_articles_for_any_chunking(step):
+    splitter = ArticleSplitter()
+    emitted = []
+    for i in range(0, len(RESULT), step):
+        emitted += splitter.feed(RESULT[i:i + step])
+    emitted += splitter.close()
+    assert emitted == split_articles(RESULT)
+
+
+def test_splitter_waits_for_the_next_marker():
+    splitter = ArticleSplitter()
+    assert splitter.feed("1. 첫 기사\n내용") == []
+    assert splitter.feed("\n2. 둘째") == ["1. 첫 기사\n내용"]
+    assert splitter.close() == ["2. 둘째"]
+    assert splitter.close() == []
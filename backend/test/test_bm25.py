@@ -0,0 +1,86 @@
+import math
+
+import numpy as np
+import pytest
+
+from app.bm25 import BM25_B, BM25_K1, BM25Index, document_terms, tokenize, top_k_indices
+from app.corpus import Corpus, write_corpus
+
+ROWS = [
+    # (source, title, body)
+    (0, "구로구 흉기 난동", "만취 남성 이 흉기 를 들고 행인 을 위협 했다"),
+    (0, "강남 교차로 버스 추돌", "출근길 버스 가 승용차 를 들이받았다"),
+    (0, "공원 산책로 정비", "구청 이 산책로 를 새로 단장 했다"),
+    (1, "흉기 소지 처벌 강화", "흉기 를 들고 위협 하면 처벌 이 무거워진다"),
+    (2, "본문 없는 기사", ""),
+]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    columns = {"date": [""] * len(ROWS), "title": [r[1] for r in ROWS], "body_prep": [r[2] for r in ROWS]}
+    sources = [{"file": "accident.csv", "rows": 3, "columns": ["title", "body_prep"]},
+               {"file": "law.csv", "rows": 1, "columns": ["title", "body_prep"]},
+               # body_prep 열이 없던 CSV 의 행은 색인하지 않는다
+               {"file": "region.csv", "rows": 1, "columns": ["title"]}]
+    write_corpus(str(tmp_path), columns, [r[0] for r in ROWS], sources, {"accident.csv": [1, 1]})
+    return Corpus.open(str(tmp_path))
+
+
+def brute_force_scores(query, docs):
+    """색인을 쓰지 않고 문서마다 BM25 식을 그대로 계산"""
+    terms = [document_terms(title, body) for title, body in docs]
+    lengths = [sum(t.values()) for t in terms]
+    avgdl = sum(lengths) / len(lengths)
+    scores = []
+    for grams, length in zip(terms, lengths):
+        score = 0.0
+        for gram in tokenize(query):
+            df = sum(1 for t in terms if gram in t)
+            if not df:
+                continue
+            tf = grams.get(gram, 0)
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / avgdl)
+            score += math.log1p((len(docs) - df + 0.5) / (df + 0.5)) * tf * (BM25_K1 + 1) / (tf + norm)
+        scores.append(score)
+    return scores
+
+
+def test_tokenize_uses_word_ngrams():
+    assert tokenize("흉기를 든 남성") == {"흉기": 1, "기를": 1, "흉기를": 1, "든": 1, "남성": 1}
+
+
+def test_scores_match_brute_force(corpus):
+    index = BM25Index.build(corpus)
+    docs = [(r[1], r[2]) for r in ROWS[:4]]
+    for query in ("흉기 위협", "버스 추돌 사고", "산책로"):
+        assert index.scores(query) == pytest.approx(brute_force_scores(query, docs), rel=1e-5)
+
+
+def test_ranking_order(corpus):
+    index = BM25Index.build(corpus)
+    assert len(index) == 4
+    results = index.search("흉기 위협 처벌", limit=5)
+    # 점수가 0 인 문서는 빠지고, 질의 어절이 제목과 본문에 더 많이 나온 기사가 앞선다
+    assert [r["title"] for r in results] == ["흉기 소지 처벌 강화", "구로구 흉기 난동"]
+    assert results[0]["score"] > results[1]["score"] > 0
+    assert results[0]["source"] == "law.csv"
+    assert index.search("버스", limit=1)[0]["title"] == "강남 교차로 버스 추돌"
+    assert index.search("색인에 없는 말") == []
+
+
+def test_top_k_breaks_ties_by_corpus_order():
+    scores = np.array([0.5, 2.0, 0.0, 2.0, 1.0])
+    assert top_k_indices(scores, 3).tolist() == [1, 3, 4]
+    assert top_k_indices(scores, 10).tolist() == [1, 3, 4, 0]
+
+
+def test_save_and_load_give_same_scores(corpus, tmp_path):
+    root = str(tmp_path / "bm25")
+    index = BM25Index.build(corpus)
+    index.save(root)
+    loaded = BM25Index.load(corpus, root)
+    assert loaded.vocab == index.vocab
+    assert loaded.rows.tolist() == index.rows.tolist()
+    assert loaded.scores("흉기 위협") == pytest.approx(index.scores("흉기 위협"))
+    assert BM25Index.load(corpus, str(tmp_path / "없는 곳")) is None
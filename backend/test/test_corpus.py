@@ -0,0 +1,82 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app import corpus as corpus_module
+from app.corpus import Corpus, StringColumn, write_corpus
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    data = tmp_path / "data"
+    data.mkdir()
+    pd.DataFrame({
+        "date": ["2024-05-01", None],
+        "title": ["구로구 흉기 난동", "긴 제목 " * 30],
+        "body_prep": ["만취 남성 이 흉기 를 휘둘렀다", "본문 " * 120],
+    }).to_csv(data / "accident.csv", index=False)
+    # date 열이 없는 CSV 는 빈 문자열로 채운다
+    pd.DataFrame({"title": ["개정 도로교통법 시행"], "body_prep": ["음주 운전 처벌 강화"]}).to_csv(
+        data / "law.csv", index=False)
+    monkeypatch.setattr(corpus_module, "DATA_DIR", str(data))
+    monkeypatch.setattr(corpus_module, "CSV_FILES", ["accident.csv", "law.csv", "health.csv"])
+    return data
+
+
+def test_string_column_round_trip(tmp_path):
+    values = ["", "가나다", "abc", "한글 섞인 text " * 1000]
+    write_corpus(str(tmp_path), {"date": values, "title": values, "body_prep": values},
+                 [0] * len(values), [{"file": "x.csv", "rows": len(values), "columns": ["title"]}], {})
+    column = Corpus.open(str(tmp_path)).column("title")
+    assert isinstance(column, StringColumn)
+    assert len(column) == len(values)
+    assert [column[i] for i in range(len(values))] == values
+    assert list(column) == values
+
+
+def test_build_reads_columns_as_memory_maps(data_dir, tmp_path):
+    corpus = Corpus.build(str(tmp_path / "corpus"))
+    assert len(corpus) == 3
+    assert corpus.count_by_source() == {"accident.csv": 2, "law.csv": 1}
+    assert list(corpus.column("title"))[2] == "개정 도로교통법 시행"
+    assert list(corpus.column("date")) == ["2024-05-01", "", ""]
+    assert isinstance(corpus.column("body_prep").data, np.memmap)
+    assert corpus.source(2) == "law.csv"
+    assert corpus.has_columns(0, "date") and not corpus.has_columns(2, "date")
+    assert corpus.rows_with("date", "title").tolist() == [0, 1]
+    with pytest.raises(KeyError):
+        corpus.column("category")
+
+
+def test_case_trims_long_fields(data_dir, tmp_path):
+    corpus = Corpus.build(str(tmp_path / "corpus"))
+    first, second = corpus.case(0), corpus.case(1)
+    assert first == {"date": "2024-05-01", "title": "구로구 흉기 난동",
+                     "summary": "만취 남성 이 흉기 를 휘둘렀다", "source": "accident.csv"}
+    assert second["date"] == "날짜 불명"
+    assert len(second["title"]) == 103 and second["title"].endswith("...")
+    assert len(second["summary"]) == 203
+
+
+def test_changed_csv_needs_a_rebuild(data_dir, tmp_path):
+    root = str(tmp_path / "corpus")
+    first = Corpus.build(root)
+    assert Corpus.load(root).path == first.path
+
+    pd.DataFrame({"title": ["새 보건 기사"], "body_prep": ["독감 유행"]}).to_csv(
+        data_dir / "health.csv", index=False)
+    # CSV 지문이 바뀌면 이전 변환 결과는 쓰지 않는다
+    assert Corpus.load(root) is None
+    second = Corpus.build(root)
+    assert second.path != first.path
+    assert len(second) == 4 and second.source(3) == "health.csv"
+    # 이전 지문의 디렉터리는 정리된다
+    assert os.listdir(root) == [os.path.basename(second.path)]
+
+
+def test_other_version_is_ignored(data_dir, tmp_path, monkeypatch):
+    path = Corpus.build(str(tmp_path / "corpus")).path
+    monkeypatch.setattr(corpus_module, "CORPUS_VERSION", corpus_module.CORPUS_VERSION + 1)
+    assert Corpus.open(path) is None
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from app import deadline
+from app.deadline import CLIENT_CLOSED_REQUEST, Deadline, cancel_on_disconnect, request_deadline
+
+
+class FakeRequest:
+    """헤더와 receive 만 있는 가짜 요청 (disconnect 를 set 하면 연결 끊김 메시지가 온다)"""
+
+    def __init__(self, headers=None):
+        self.headers = headers or {}
+        self.disconnect = asyncio.Event()
+
+    async def receive(self):
+        await self.disconnect.wait()
+        return {"type": "http.disconnect"}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_header_overrides_route_budget_within_bounds(monkeypatch):
+    monkeypatch.setattr(deadline, "REQUEST_TIMEOUT_MAX", 100)
+
+    async def budgets():
+        return [request_deadline(FakeRequest(headers), 45).budget for headers in (
+            {}, {"x-request-timeout": "10"}, {"x-request-timeout": "0.1"},
+            {"x-request-timeout": "999"}, {"x-request-timeout": "곧"},
+        )]
+
+    assert run(budgets()) == [45, 10.0, 1.0, 100, 45]
+
+
+def test_deadline_timeout_raises_when_expired():
+    async def scenario():
+        limit = Deadline(0.02)
+        assert not limit.expired and 0 < limit.remaining() <= 0.02
+        with pytest.raises(TimeoutError):
+            async with limit.timeout():
+                await asyncio.sleep(1)
+        assert limit.expired and limit.remaining() == 0.0
+
+    run(scenario())
+
+
+def test_finished_work_returns_its_result():
+    async def scenario():
+        request = FakeRequest()
+
+        async def work():
+            await asyncio.sleep(0)
+            return "결과"
+
+        return await cancel_on_disconnect(request, work(), "test")
+
+    assert run(scenario()) == "결과"
+
+
+def test_work_errors_propagate():
+    async def scenario():
+        async def work():
+            raise ValueError("분석 실패")
+
+        await cancel_on_disconnect(FakeRequest(), work(), "test")
+
+    with pytest.raises(ValueError, match="분석 실패"):
+        run(scenario())
+
+
+def test_disconnect_cancels_work_with_499():
+    cancelled = []
+
+    async def scenario():
+        request = FakeRequest()
+
+        async def work():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(True)
+                raise
+
+        async def hang_up():
+            await asyncio.sleep(0.01)
+            request.disconnect.set()
+
+        asyncio.create_task(hang_up())
+        with pytest.raises(HTTPException) as exc_info:
+            await cancel_on_disconnect(request, work(), "test")
+        await asyncio.sleep(0)
+        return exc_info.value
+
+    error = run(scenario())
+    assert error.status_code == CLIENT_CLOSED_REQUEST
+    assert cancelled == [True]
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from app import ai_providers
+from app.ai_providers import AIProvider, HedgedRouter, LatencyTracker
+
+
+class FakeProvider(AIProvider):
+    """latency 초 뒤에 응답하는 가짜 프로바이더 (error 가 있으면 그 예외, 취소되면 cancelled 에 기록)"""
+
+    def __init__(self, name, latency, text="응답", error=None):
+        self.name = name
+        self.latency = latency
+        self.text = text
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def complete(self, prompt, temperature=0.2, schema=None):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return self.text
+
+
+@pytest.fixture(autouse=True)
+def short_delays(monkeypatch):
+    monkeypatch.setattr(ai_providers, "AI_HEDGE_DEFAULT_DELAY", 0.02)
+    monkeypatch.setattr(ai_providers, "AI_HEDGE_MIN_DELAY", 0.01)
+    monkeypatch.setattr(ai_providers, "AI_HEDGE_MAX_DELAY", 0.5)
+    monkeypatch.setattr(ai_providers, "AI_HEDGE_MIN_SAMPLES", 3)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_percentile_and_censored_samples():
+    tracker = LatencyTracker(window=4)
+    assert tracker.percentile(50) is None
+    for seconds in (0.1, 0.2, 0.3):
+        tracker.record(seconds)
+    tracker.record(0.9, censored=True)
+    assert tracker.percentile(0) == 0.1
+    assert tracker.percentile(100) == 0.9
+    # 창 크기를 넘으면 오래된 표본부터 빠진다
+    tracker.record(1.0)
+    assert sorted(tracker.samples) == [0.2, 0.3, 0.9, 1.0]
+    assert tracker.stats()["censored"] == 1
+
+
+def test_hedge_delay_follows_primary_latency():
+    router = HedgedRouter(FakeProvider("primary", 0), [FakeProvider("backup", 0)])
+    assert router.hedge_delay() == 0.02  # 표본이 모자라면 기본값
+    for seconds in (0.1, 0.2, 0.3):
+        router.latency["primary"].record(seconds)
+    assert router.hedge_delay() == pytest.approx(0.3)
+    router.latency["primary"].record(5.0)
+    assert router.hedge_delay() == 0.5  # 상한
+
+
+def test_fast_primary_needs_no_hedge():
+    primary, backup = FakeProvider("primary", 0.001, "기본"), FakeProvider("backup", 0.001, "백업")
+    router = HedgedRouter(primary, [backup])
+    assert run(router.complete_with_provider("질문")) == ("기본", "primary")
+    assert backup.calls == 0
+    assert router.hedges == 0
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary, backup = FakeProvider("primary", 1.0, "기본"), FakeProvider("backup", 0.001, "백업")
+    router = HedgedRouter(primary, [backup])
+
+    async def scenario():
+        result = await router.complete_with_provider("질문")
+        await asyncio.sleep(0)  # 취소가 기본 프로바이더 호출까지 전달되도록 한 번 양보
+        return result
+
+    assert run(scenario()) == ("백업", "backup")
+    assert router.hedges == 1
+    assert router.wins == {"primary": 0, "backup": 1}
+    assert primary.cancelled == 1
+    # 취소된 호출의 지연은 중도 절단 표본으로 남는다
+    assert router.latency["primary"].censored == 1
+    assert router.latency["primary"].percentile(50) >= 0.02
+
+
+def test_failed_primary_launches_backup_without_waiting():
+    primary = FakeProvider("primary", 0, error=RuntimeError("500"))
+    backup = FakeProvider("backup", 0.001, "백업")
+    router = HedgedRouter(primary, [backup])
+    assert run(router.complete("질문")) == "백업"
+    assert router.hedges == 0
+    assert router.latency["primary"].errors == 1
+
+
+def test_invalid_answer_counts_as_failure():
+    primary, backup = FakeProvider("primary", 0, "깨진 JSON"), FakeProvider("backup", 0.001, '{"ok": true}')
+    router = HedgedRouter(primary, [backup])
+
+    def parse(text):
+        if not text.startswith("{"):
+            raise ValueError("JSON 아님")
+        return text
+
+    assert run(router.complete("질문", parse=parse)) == '{"ok": true}'
+
+
+def test_all_providers_failing_raises_every_error():
+    router = HedgedRouter(FakeProvider("primary", 0, error=RuntimeError("기본 오류")),
+                          [FakeProvider("backup", 0, error=RuntimeError("백업 오류"))])
+    with pytest.raises(Exception, match="primary: 기본 오류; backup: 백업 오류"):
+        run(router.complete("질문"))
+
+
+def test_cancelling_the_caller_cancels_in_flight_calls():
+    primary, backup = FakeProvider("primary", 1.0), FakeProvider("backup", 1.0)
+    router = HedgedRouter(primary, [backup])
+
+    async def scenario():
+        task = asyncio.create_task(router.complete("질문"))
+        await asyncio.sleep(0.05)  # 헤지까지 나간 뒤 취소
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0)
+
+    run(scenario())
+    assert (primary.cancelled, backup.cancelled) == (1, 1)
@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from app.gemini_utils import cache_unless_repaired, parse_directing_response
+from app.json_repair import fill_missing_fields, parse_json, repair_json, was_repaired
+from app.models import DirectorResponse, PerspectiveResponse
+
+
+class FakeCache:
+    def __init__(self):
+        self.entries = {}
+
+    async def set(self, key, kind, value, provider=None):
+        self.entries[key] = (kind, value, provider)
+
+
+def test_well_formed_json_is_not_marked():
+    value = parse_json('{"a": [1, 2], "b": "x"}')
+    assert value == {"a": [1, 2], "b": "x"}
+    assert not was_repaired(value)
+
+
+def test_code_fence_and_prose_are_skipped():
+    text = '결과는 다음과 같습니다.\n```json\n{"a": 1, "b": [true, null]}\n```\n참고하세요.'
+    value = parse_json(text)
+    assert value == {"a": 1, "b": [True, None]}
+    assert not was_repaired(value)
+
+
+def test_trailing_commas_are_dropped():
+    assert repair_json('{"a": [1, 2,], "b": 3,}') == {"a": [1, 2], "b": 3}
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": "잘린 문장', {"a": "잘린 문장"}),
+    ('{"a": "끝이 \\', {"a": "끝이 "}),
+    ('{"a": ["x", "y', {"a": ["x", "y"]}),
+    ('{"a": 1, "b":', {"a": 1, "b": None}),
+    ('{"a": 1, "b"', {"a": 1}),
+    ('{"a": {"b": [1, {"c": 2', {"a": {"b": [1, {"c": 2}]}}),
+])
+def test_truncated_structures_are_closed(text, expected):
+    value = parse_json(text)
+    assert value == expected
+    assert was_repaired(value)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": tru', {"a": True}),
+    ('{"a": f', {"a": False}),
+    ('{"a": nu', {"a": None}),
+    ('{"a": 1.', {"a": 1}),
+    ('{"a": 1.5e', {"a": 1.5}),
+    ('{"a": -', {"a": None}),
+    ('{"a": [1, 2, fal', {"a": [1, 2, False]}),
+])
+def test_truncated_literals_and_numbers_are_completed(text, expected):
+    assert repair_json(text) == expected
+
+
+def test_unrecoverable_text_raises():
+    with pytest.raises(ValueError):
+        parse_json("JSON 이 아닌 설명만 있는 응답")
+
+
+def test_missing_fields_are_filled_and_marked():
+    data = fill_missing_fields(DirectorResponse, {"issues": ["쟁점"], "questions": [{"target": "경찰"}]})
+    assert was_repaired(data)
+    assert data["angles"] == [] and data["interpretation"] == ""
+    assert data["questions"] == [{"target": "경찰", "questions": []}]
+    DirectorResponse(**data)
+
+
+def test_complete_answer_is_not_marked_by_fill():
+    data = {"perspectives": [{"viewpoint": "법적", "issues": [], "questions": [], "implications": []}]}
+    assert not was_repaired(fill_missing_fields(PerspectiveResponse, data))
+
+
+def test_truncated_directing_answer_is_not_cached():
+    cache = FakeCache()
+    text = '{"issues": ["쟁점 1"], "questions": [], "angles": ["각도"], "interpretation": "해석이 잘'
+    result = parse_directing_response(text)
+    assert was_repaired(result)
+    DirectorResponse(**result)
+    asyncio.run(cache_unless_repaired(cache, "k", "directing", result, "gemini"))
+    assert cache.entries == {}
+
+    asyncio.run(cache_unless_repaired(cache, "k", "directing", dict(result), "gemini"))
+    assert cache.entries["k"][0] == "directing"
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from app.json_stream import TopLevelFieldParser
+
+ANSWER = {
+    "issues": ["흉기 \"난동\"", "치안 공백"],
+    "questions": [{"target": "경찰", "questions": ["출동 시간은?", "중괄호 } 와 [ 대괄호"]}],
+    "interpretation": "역슬래시 \\ 와 줄바꿈\n이 든 해석",
+    "count": 3,
+    "urgent": True,
+    "note": None,
+}
+
+
+def feed_all(chunks):
+    parser = TopLevelFieldParser()
+    completed = []
+    for chunk in chunks:
+        completed.extend(parser.feed(chunk))
+    return parser, completed
+
+
+def test_whole_object_in_one_chunk():
+    parser, completed = feed_all([json.dumps(ANSWER, ensure_ascii=False)])
+    assert completed == list(ANSWER.items())
+    assert parser.done and parser.fields == ANSWER
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7])
+def test_fields_survive_any_chunk_split(size):
+    # 문자열 안의 따옴표/역슬래시 이스케이프와 괄호가 조각 경계에 걸쳐도 같은 결과가 나와야 한다
+    text = json.dumps(ANSWER, ensure_ascii=False)
+    parser, completed = feed_all([text[i:i + size] for i in range(0, len(text), size)])
+    assert completed == list(ANSWER.items())
+    assert parser.done
+
+
+def test_field_is_emitted_as_soon_as_it_closes():
+    parser = TopLevelFieldParser()
+    assert parser.feed('{"issues": ["a", "b"') == []
+    assert parser.feed('], "ang') == [("issues", ["a", "b"])]
+    assert parser.feed('les": ["c"]}') == [("angles", ["c"])]
+    assert parser.done
+
+
+def test_code_fence_around_object_is_ignored():
+    parser, completed = feed_all(['```json\n{"a": ', '1}\n```'])
+    assert completed == [("a", 1)]
+    # 객체가 닫힌 뒤의 조각은 무시한다
+    assert parser.feed('{"b": 2}') == []
+
+
+def test_truncated_stream_keeps_completed_fields_only():
+    parser, completed = feed_all(['{"a": [1, 2], "b": "잘린 문'])
+    assert completed == [("a", [1, 2])]
+    assert not parser.done
+    assert parser.fields == {"a": [1, 2]}
+
+
+def test_invalid_value_is_skipped():
+    parser, completed = feed_all(['{"a": tru, "b": 2}'])
+    assert completed == [("b", 2)]
+    assert parser.done
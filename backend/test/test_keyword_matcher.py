@@ -0,0 +1,36 @@
+import json
+
+from app.keyword_matcher import KeywordMatcher, load_patterns
+
+
+def test_overlapping_terms_are_all_found():
+    matcher = KeywordMatcher({"a": ["he", "she", "his", "hers"]})
+    assert matcher.find("ushers") == ["he", "she", "hers"]
+
+
+def test_terms_are_matched_case_insensitively_in_one_pass():
+    matcher = KeywordMatcher({"범죄": ["흉기", "난동"], "장소": ["서울", "구로구"], "기관": ["KTX"]})
+    assert matcher.find("서울 구로구에서 흉기 난동, ktx 운행 중단") == ["흉기", "난동", "서울", "구로구", "ktx"]
+    assert matcher.find_categories("구로구 흉기 사건") == {"범죄", "장소"}
+    assert matcher.find_categories("관련 없는 문장") == set()
+
+
+def test_duplicate_terms_keep_the_first_category():
+    matcher = KeywordMatcher({"장소": ["서울"], "지역": ["서울", "부산"]})
+    assert matcher.category_names == ["장소", "지역"]
+    assert matcher.find_categories("서울") == {"장소"}
+
+
+def test_fingerprint_follows_the_dictionary():
+    assert KeywordMatcher({"a": ["x"]}).fingerprint == KeywordMatcher({"a": ["x"]}).fingerprint
+    assert KeywordMatcher({"a": ["x"]}).fingerprint != KeywordMatcher({"a": ["x", "y"]}).fingerprint
+
+
+def test_load_patterns_from_json_and_tsv(tmp_path):
+    json_path = tmp_path / "terms.json"
+    json_path.write_text(json.dumps({"음주": ["만취", "음주운전"]}, ensure_ascii=False), encoding="utf-8")
+    assert load_patterns(str(json_path)) == {"음주": ["만취", "음주운전"]}
+
+    tsv_path = tmp_path / "재난.txt"
+    tsv_path.write_text("# 주석\n화재\n교통\t추돌\n\n", encoding="utf-8")
+    assert load_patterns(str(tsv_path)) == {"재난": ["화재"], "교통": ["추돌"]}
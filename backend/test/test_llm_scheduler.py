@@ -0,0 +1,149 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from app import llm_scheduler
+from app.llm_scheduler import BACKGROUND, DEFAULT, INTERACTIVE, LLMOverloaded, LLMScheduler, TokenBucket
+
+
+class RateLimited(Exception):
+    code = 429
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def admit_order(scheduler, calls):
+    """자리 하나를 붙잡아 둔 채 calls=[(이름, 우선순위, 클라이언트)] 를 줄 세운 뒤 풀어서 차례를 받은 순서를 돌려준다"""
+    order = []
+    holder = await scheduler.acquire(DEFAULT, client="holder")
+
+    async def call(name, priority, client):
+        waiter = await scheduler.acquire(priority, client=client)
+        order.append(name)
+        scheduler.release(waiter)
+
+    tasks = [asyncio.create_task(call(*c)) for c in calls]
+    await asyncio.sleep(0)
+    scheduler.release(holder)
+    await asyncio.gather(*tasks)
+    return order
+
+
+def test_higher_priority_goes_first():
+    scheduler = LLMScheduler("test-priority", rpm=0, tpm=0, concurrency=1)
+    order = run(admit_order(scheduler, [
+        ("summary", BACKGROUND, "a"), ("analysis", DEFAULT, "a"), ("directing", INTERACTIVE, "a"),
+    ]))
+    assert order == ["directing", "analysis", "summary"]
+
+
+def test_clients_take_turns_within_a_priority():
+    scheduler = LLMScheduler("test-round-robin", rpm=0, tpm=0, concurrency=1)
+    order = run(admit_order(scheduler, [
+        ("a1", DEFAULT, "a"), ("a2", DEFAULT, "a"), ("a3", DEFAULT, "a"), ("b1", DEFAULT, "b"),
+    ]))
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(60, burst_seconds=2)  # 초당 1, 최대 2
+    now = bucket.updated
+    assert bucket.wait_time(2, now) == 0
+    bucket.take(2)
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1) == 0
+    # 버킷이 가득 차 있으면 capacity 보다 큰 요청도 통과시키고 빚으로 남긴다
+    assert bucket.wait_time(10, now + 5) == 0
+
+
+def test_rate_limited_call_is_requeued(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "LLM_BACKOFF_BASE", 0.01)
+    scheduler = LLMScheduler("test-429", rpm=0, tpm=0, concurrency=2)
+    attempts = []
+
+    async def fn():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise RateLimited("RESOURCE_EXHAUSTED")
+        return "ok"
+
+    assert run(scheduler.run(fn)) == "ok"
+    assert len(attempts) == 2
+    assert scheduler.rate_limited == 1
+    assert scheduler.stats()["active"] == 0
+
+
+def test_resource_is_held_outside_the_slot(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "LLM_BACKOFF_BASE", 0.01)
+    scheduler = LLMScheduler("test-resource", rpm=0, tpm=0, concurrency=1)
+    events = []
+
+    @asynccontextmanager
+    async def session():
+        # 자원을 기다리는 동안에는 스케줄러 자리를 차지하지 않아야 한다
+        assert scheduler.stats()["active"] == 0
+        events.append("borrow")
+        try:
+            yield "session"
+        finally:
+            events.append("return")
+
+    async def fn(held):
+        events.append(held)
+        if events.count(held) == 1:
+            raise RateLimited("RESOURCE_EXHAUSTED")
+        return "ok"
+
+    assert run(scheduler.run(fn, resource=session)) == "ok"
+    # 429 백오프 동안에는 자원을 돌려줬다가 다시 빌린다
+    assert events == ["borrow", "session", "return", "borrow", "session", "return"]
+    assert scheduler.stats()["active"] == 0
+
+
+def test_other_errors_are_not_retried():
+    scheduler = LLMScheduler("test-error", rpm=0, tpm=0)
+
+    async def fn():
+        raise ValueError("bad request")
+
+    with pytest.raises(ValueError):
+        run(scheduler.run(fn))
+    assert scheduler.admitted == 1
+
+
+def test_cancelled_waiters_leave_the_queue():
+    scheduler = LLMScheduler("test-cancel", rpm=0, tpm=0, concurrency=1, queue_limit=2)
+
+    async def scenario():
+        holder = await scheduler.acquire(DEFAULT, client="holder")
+        first = asyncio.create_task(scheduler.acquire(DEFAULT, client="a"))
+        second = asyncio.create_task(scheduler.acquire(DEFAULT, client="a"))
+        await asyncio.sleep(0)
+        with pytest.raises(LLMOverloaded):
+            await scheduler.acquire(DEFAULT, client="b")
+        # 맨 앞이 아닌 대기 호출을 취소해도 대기 수에서 빠져야 한다
+        second.cancel()
+        await asyncio.gather(second, return_exceptions=True)
+        assert scheduler.stats()["queued"]["default"] == 1
+        third = asyncio.create_task(scheduler.acquire(DEFAULT, client="b"))
+        await asyncio.sleep(0)
+        scheduler.release(holder)
+        scheduler.release(await first)
+        scheduler.release(await third)
+
+    run(scenario())
+    assert scheduler.stats()["queued"]["default"] == 0
+    assert scheduler.stats()["active"] == 0
+
+
+def test_key_limits_are_split_across_workers(monkeypatch):
+    monkeypatch.setattr(llm_scheduler, "LLM_WORKERS", 4)
+    monkeypatch.setattr(llm_scheduler, "GEMINI_RPM", 240)
+    monkeypatch.setattr(llm_scheduler, "GEMINI_TPM", 0)
+    monkeypatch.setattr(llm_scheduler, "_schedulers", {})
+    scheduler = llm_scheduler.get_scheduler("gemini")
+    assert scheduler.requests.rate == pytest.approx(1.0)  # 240 / 4 워커 = 분당 60
+    assert scheduler.tokens is None
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from app import mcp_pool
+from app.mcp_pool import MCPSessionPool
+
+
+class FakePooledSession:
+    """MCP 서버 프로세스 대신 쓰는 가짜 세션 (alive / ping 결과를 테스트에서 바꾼다)"""
+    spawned = []
+
+    def __init__(self, server_params):
+        self.session = None
+        self.healthy = True
+        self.closed = False
+
+    async def start(self):
+        await asyncio.sleep(0)
+        self.session = f"session-{len(FakePooledSession.spawned)}"
+        FakePooledSession.spawned.append(self)
+
+    @property
+    def alive(self):
+        return self.session is not None and not self.closed
+
+    async def ping(self, timeout=None):
+        return self.alive and self.healthy
+
+    async def close(self, timeout=None):
+        self.closed = True
+
+
+@pytest.fixture
+def make_pool(monkeypatch):
+    FakePooledSession.spawned = []
+    monkeypatch.setattr(mcp_pool, "PooledSession", FakePooledSession)
+    return lambda size=2: MCPSessionPool(server_params=None, size=size, health_interval=0)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_sessions_are_reused(make_pool):
+    async def scenario():
+        pool = make_pool()
+        await pool.start(warm=1)
+        seen = []
+        for _ in range(3):
+            async with pool.session() as session:
+                seen.append(session)
+        return pool, seen
+
+    pool, seen = run(scenario())
+    assert seen == ["session-0"] * 3
+    assert len(FakePooledSession.spawned) == 1
+    assert pool.stats() == {"size": 2, "sessions": 1, "idle": 1, "restarts": 0}
+
+
+def test_borrowers_never_exceed_pool_size(make_pool):
+    async def scenario():
+        pool = make_pool(size=2)
+        borrowed = peak = 0
+
+        async def borrow():
+            nonlocal borrowed, peak
+            async with pool.session():
+                borrowed += 1
+                peak = max(peak, borrowed)
+                await asyncio.sleep(0.01)
+                borrowed -= 1
+
+        await asyncio.gather(*(borrow() for _ in range(6)))
+        return pool, peak
+
+    pool, peak = run(scenario())
+    assert peak == 2
+    assert len(FakePooledSession.spawned) == 2
+    assert pool.stats()["idle"] == 2
+
+
+def test_borrowing_times_out_without_leaking_a_slot(make_pool):
+    async def scenario():
+        pool = make_pool(size=1)
+        async with pool.session():
+            with pytest.raises(TimeoutError):
+                async with pool.session(timeout=0.02):
+                    pass
+        # 시간이 지나 포기한 대기는 자리를 남기지 않으므로 바로 다시 빌릴 수 있다
+        async with pool.session(timeout=0.02) as session:
+            return session
+
+    assert run(scenario()) == "session-0"
+
+
+def test_broken_session_is_replaced(make_pool):
+    async def scenario():
+        pool = make_pool(size=1)
+        with pytest.raises(RuntimeError):
+            async with pool.session():
+                FakePooledSession.spawned[0].healthy = False
+                raise RuntimeError("도구 호출 실패")
+        async with pool.session() as session:
+            return pool, session
+
+    pool, session = run(scenario())
+    assert FakePooledSession.spawned[0].closed
+    assert session == "session-1"
+    assert pool.restarts == 1
+
+
+def test_error_on_a_healthy_session_keeps_it(make_pool):
+    async def scenario():
+        pool = make_pool(size=1)
+        with pytest.raises(ValueError):
+            async with pool.session():
+                raise ValueError("잘못된 응답")
+        async with pool.session() as session:
+            return pool, session
+
+    pool, session = run(scenario())
+    assert session == "session-0"
+    assert pool.restarts == 0
+
+
+def test_health_check_drops_dead_idle_sessions(make_pool):
+    async def scenario():
+        pool = make_pool(size=2)
+        await pool.start(warm=2)
+        FakePooledSession.spawned[1].healthy = False
+        await pool.check_health()
+        return pool
+
+    pool = run(scenario())
+    assert pool.stats() == {"size": 2, "sessions": 1, "idle": 1, "restarts": 1}
+    assert FakePooledSession.spawned[1].closed
+
+
+def test_closed_pool_refuses_to_lend(make_pool):
+    async def scenario():
+        pool = make_pool()
+        await pool.start(warm=1)
+        await pool.close()
+        with pytest.raises(RuntimeError):
+            async with pool.session():
+                pass
+        return pool
+
+    pool = run(scenario())
+    assert FakePooledSession.spawned[0].closed
+    assert pool.stats()["sessions"] == 0
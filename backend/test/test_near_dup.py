@@ -0,0 +1,63 @@
+import numpy as np
+
+from app.near_dup import EMPTY, MinHasher, NearDuplicateFilter, cluster_labels, similarity, unique_hits
+
+ORIGINAL = ("서울 구로구의 한 아파트 단지에서 흉기 난동이 벌어져 주민 두 명이 다쳤다. 경찰은 현장에서 "
+            "30대 남성을 현행범으로 체포하고 정확한 범행 동기를 조사하고 있다.")
+# 통신사 기사를 받아 앞뒤만 조금 고쳐 쓴 기사
+REWRITE = ("[속보] 서울 구로구의 한 아파트 단지에서 흉기 난동이 벌어져 주민 두 명이 다쳤다. 경찰은 현장에서 "
+           "30대 남성을 현행범으로 체포하고 정확한 범행 동기를 조사 중이다.")
+OTHER = ("대전의 한 초등학교에서 급식을 먹은 학생 40여 명이 복통과 설사 증상을 보여 보건 당국이 "
+         "식중독 여부를 역학 조사하고 있다.")
+
+
+def shingle_jaccard(a, b):
+    from app.near_dup import shingle_hashes
+    x, y = set(shingle_hashes(a).tolist()), set(shingle_hashes(b).tolist())
+    return len(x & y) / len(x | y)
+
+
+def test_similarity_estimates_jaccard():
+    hasher = MinHasher(num_perm=256)
+    estimate = similarity(hasher.signature(ORIGINAL), hasher.signature(REWRITE))
+    assert abs(estimate - shingle_jaccard(ORIGINAL, REWRITE)) < 0.1
+    assert similarity(hasher.signature(ORIGINAL), hasher.signature(OTHER)) < 0.2
+
+
+def test_signature_ignores_spacing_punctuation_and_case():
+    hasher = MinHasher()
+    assert np.array_equal(hasher.signature("KTX 탈선, 사고!"), hasher.signature("ktx탈선사고"))
+
+
+def test_empty_text_is_never_a_duplicate():
+    hasher = MinHasher()
+    empty = hasher.signature("  ...  ")
+    assert empty[0] == EMPTY
+    seen = NearDuplicateFilter()
+    assert seen.add(empty) is None
+    assert seen.add(empty) is None
+
+
+def test_rewrite_is_folded_into_the_first_article():
+    hasher = MinHasher()
+    labels = cluster_labels(hasher.signatures([ORIGINAL, OTHER, REWRITE, ORIGINAL]))
+    assert labels == [0, 1, 0, 0]
+
+
+def test_threshold_decides_folding():
+    hasher = MinHasher()
+    a, b = hasher.signature(ORIGINAL), hasher.signature(REWRITE)
+    score = similarity(a, b)
+    strict = NearDuplicateFilter(threshold=min(1.0, score + 0.05))
+    strict.add(a)
+    assert strict.add(b) is None
+    loose = NearDuplicateFilter(threshold=score - 0.05)
+    loose.add(a)
+    assert loose.add(b) == 0
+
+
+def test_unique_hits_keeps_the_best_scored_copy():
+    hasher = MinHasher()
+    hits = [(3.0, REWRITE), (2.0, OTHER), (1.0, ORIGINAL)]
+    result = unique_hits(hits, lambda hit: hasher.signature(hit[1]), source="test")
+    assert result == [(3.0, REWRITE), (2.0, OTHER)]
@@ -0,0 +1,63 @@
+import pytest
+
+from app.prompt_budget import SUMMARY_INSTRUCTION, build_summary_prompt, count_tokens, dedup_items
+
+
+def make_articles(n, body_chars=600):
+    articles, analyses = [], []
+    for i in range(n):
+        articles.append(f"{i + 1}. 기사 제목 {i}\n" + f"기사 {i} 본문 내용 " * (body_chars // 10))
+        analyses.append({
+            "article_index": i,
+            "title": f"기사 제목 {i}",
+            "issues": ["안전 관리 부실", f"기사 {i} 고유 쟁점", "책임 소재"],
+            "angles": ["피해자 중심", f"기사 {i} 보도 각도"],
+            "framing": f"기사 {i} 프레이밍",
+            "implications": ["제도 개선 필요", f"기사 {i} 시사점"],
+        })
+    return analyses, articles
+
+
+def test_count_tokens_weighs_hangul_more_than_ascii():
+    assert count_tokens("가나다") == 2
+    assert count_tokens("abcdefgh") == 2
+    assert count_tokens("   ") == 1
+
+
+def test_repeated_items_are_listed_once_as_common():
+    analyses, _ = make_articles(3)
+    common = dedup_items(analyses)
+    assert common["issues"] == [("안전 관리 부실", 3), ("책임 소재", 3)]
+    assert common["angles"] == [("피해자 중심", 3)]
+
+
+def test_small_input_keeps_everything():
+    analyses, articles = make_articles(2, body_chars=100)
+    prompt = build_summary_prompt(analyses, articles, budget=3000)
+    assert prompt.startswith(SUMMARY_INSTRUCTION)
+    assert "\n[공통]\n" in prompt
+    assert prompt.count("안전 관리 부실") == 1
+    assert "발췌:" in prompt and "기사 1 시사점" in prompt
+
+
+@pytest.mark.parametrize("budget", [600, 900, 1500, 3000])
+def test_prompt_stays_within_budget(budget):
+    analyses, articles = make_articles(12)
+    assert count_tokens(build_summary_prompt(analyses, articles, budget=budget)) <= budget
+
+
+def test_snippets_go_before_issues():
+    analyses, articles = make_articles(6)
+    full = build_summary_prompt(analyses, articles, budget=100000)
+    budget = count_tokens(full) - 50
+    trimmed = build_summary_prompt(analyses, articles, budget=budget)
+    assert count_tokens(trimmed) <= budget
+    assert all(f"기사 {i} 고유 쟁점" in trimmed for i in range(6))
+
+
+def test_trailing_articles_are_dropped_last():
+    analyses, articles = make_articles(30)
+    prompt = build_summary_prompt(analyses, articles, budget=500)
+    assert "발췌:" not in prompt
+    assert "[기사 1]" in prompt
+    assert "예산 때문에 생략" in prompt
@@ -0,0 +1,101 @@
+import asyncio
+
+from app.response_cache import ResponseCache
+
+ANSWER = {"issues": ["쟁점"], "angles": []}
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_cache(tmp_path, **kwargs):
+    kwargs.setdefault("generation_check", 0)
+    return ResponseCache(db_path=str(tmp_path / "cache.sqlite3"), enabled=True, **kwargs)
+
+
+def test_keys_ignore_whitespace_and_unicode_form():
+    key = ResponseCache.make_key("directing", "구로구  흉기\n난동", model="m", prompt_version="1")
+    assert key == ResponseCache.make_key("directing", " 구로구 흉기 난동 ", model="m", prompt_version="1")
+    assert key != ResponseCache.make_key("directing", "구로구 흉기 난동", model="m", prompt_version="2")
+    assert key != ResponseCache.make_key("perspective", "구로구 흉기 난동", "법적", model="m", prompt_version="1")
+
+
+def test_memory_then_disk_hits(tmp_path):
+    async def scenario():
+        first = make_cache(tmp_path)
+        await first.set("k", "directing", ANSWER, provider="gemini:m")
+        assert await first.get("k") == ANSWER
+        # 같은 파일을 쓰는 다른 워커(또는 재시작 후)는 SQLite 에서 읽어 메모리 단에 올린다
+        second = make_cache(tmp_path)
+        assert await second.get("k") == ANSWER
+        assert await second.get("k") == ANSWER
+        assert await second.get("없는 키") is None
+        return first, second
+
+    first, second = run(scenario())
+    assert first.stats()["memory_hits"] == 1
+    assert first.stats()["sets_by_provider"] == {"gemini:m": 1}
+    assert second.stats()["disk_hits"] == 1
+    assert second.stats()["memory_hits"] == 1
+    assert second.stats()["misses"] == 1
+
+
+def test_expired_entries_are_misses(tmp_path):
+    async def scenario():
+        cache = make_cache(tmp_path, ttl=-1)
+        await cache.set("k", "directing", ANSWER)
+        return await cache.get("k")
+
+    assert run(scenario()) is None
+
+
+def test_lru_keeps_most_recent_entries(tmp_path):
+    async def scenario():
+        cache = ResponseCache(db_path=None, max_entries=2, enabled=True)
+        await cache.set("a", "directing", 1)
+        await cache.set("b", "directing", 2)
+        await cache.get("a")
+        await cache.set("c", "directing", 3)
+        return [await cache.get(key) for key in ("a", "b", "c")]
+
+    assert run(scenario()) == [1, None, 3]
+
+
+def test_invalidation_reaches_other_workers(tmp_path):
+    async def scenario():
+        worker_a, worker_b = make_cache(tmp_path), make_cache(tmp_path)
+        await worker_a.set("d", "directing", ANSWER)
+        await worker_a.set("p", "perspective", ANSWER)
+        assert await worker_b.get("d") == ANSWER
+        assert await worker_b.get("p") == ANSWER
+
+        # 워커 A 가 디렉팅만 무효화하면 워커 B 의 메모리 단에서도 디렉팅 항목만 빠진다
+        assert await worker_a.invalidate("directing") == 1
+        assert await worker_b.get("d") is None
+        assert await worker_b.get("p") == ANSWER
+        assert worker_b.stats()["remote_invalidations"] == 1
+
+        # 무효화한 워커는 자기 세대 번호를 알고 있으므로 이후 저장한 항목을 다시 버리지 않는다
+        await worker_a.set("d", "directing", {"issues": ["새 답"]})
+        assert await worker_a.get("d") == {"issues": ["새 답"]}
+
+        await worker_b.invalidate()
+        assert await worker_a.get("p") is None
+        assert await worker_a.get("d") is None
+        return worker_b
+
+    worker_b = run(scenario())
+    assert worker_b.stats()["memory_entries"] == 0
+
+
+def test_disabled_cache_stores_nothing(tmp_path):
+    async def scenario():
+        cache = ResponseCache(db_path=str(tmp_path / "cache.sqlite3"), enabled=False)
+        await cache.set("k", "directing", ANSWER)
+        return cache, await cache.get("k")
+
+    cache, value = run(scenario())
+    assert value is None
+    assert cache.stats()["sets"] == 0
+    assert not (tmp_path / "cache.sqlite3").exists()
@@ -0,0 +1,66 @@
+import asyncio
+
+import pytest
+
+from app.search_cache import SearchCache, normalize_topic
+
+
+def test_spacing_particles_and_order_are_ignored():
+    assert normalize_topic("구로구 흉기 난동 사건을") == normalize_topic("흉기난동  구로구에서 사건")
+
+
+def test_punctuation_and_case_are_ignored():
+    assert normalize_topic("KTX 탈선, 사고!") == normalize_topic("ktx 탈선 사고")
+
+
+@pytest.mark.parametrize("word", ["고속도로", "고속도", "어린이", "전문가"])
+def test_noun_endings_are_not_stripped(word):
+    assert normalize_topic(word) == "".join(sorted(word))
+
+
+@pytest.mark.parametrize("word, stem", [
+    ("고속도로에서", "고속도로"),
+    ("고속도로가", "고속도로"),
+    ("어린이가", "어린이"),
+    ("경찰이", "경찰"),
+    ("구로구에서", "구로구"),
+])
+def test_particles_are_stripped(word, stem):
+    assert normalize_topic(word) == normalize_topic(stem)
+
+
+def test_short_words_keep_their_last_syllable():
+    assert normalize_topic("오이") == "".join(sorted("오이"))
+
+
+def test_stale_entry_is_returned_and_refreshed(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.search_cache.time.monotonic", lambda: now[0])
+    cache = SearchCache(ttl=10, stale=100, max_entries=4)
+
+    async def run():
+        fetched = []
+
+        async def fetch():
+            fetched.append(1)
+            return f"결과 {len(fetched)}"
+
+        key = cache.make_key("구로구 사건", 3)
+        assert await cache.get_or_fetch(key, fetch) == "결과 1"
+        now[0] += 50
+        assert await cache.get_or_fetch(key, fetch) == "결과 1"
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        assert await cache.get_or_fetch(key, fetch) == "결과 2"
+        now[0] += 500
+        assert await cache.get_or_fetch(key, fetch) == "결과 3"
+        return fetched
+
+    assert len(asyncio.run(run())) == 3
+    assert cache.stats()["stale_hits"] == 1
+
+
+def test_empty_results_are_not_cached():
+    cache = SearchCache(ttl=10, stale=0, max_entries=4)
+    cache.set("k", "  ")
+    assert cache.get("k") is None
@@ -0,0 +1,93 @@
+import threading
+
+import pytest
+
+from app.bm25 import search_indexes
+from app.segments import SegmentStore
+from app.stats_cube import StatsCube
+
+
+def article(title, body, category="accident", date="2031-05-01"):
+    return {"category": category, "date": date, "title": title, "body_prep": body}
+
+
+ARTICLES = [
+    article("구로구 공사장 크레인 붕괴", "공사장 크레인이 넘어져 작업자가 다쳤다 크레인 점검이 부실했다"),
+    article("강남 교차로 버스 추돌", "출근길 교차로에서 버스가 승용차를 들이받아 승객이 다쳤다"),
+    article("인천 항만 크레인 화재", "항만 크레인 전기 설비에서 불이 나 작업이 중단됐다", category="law"),
+    article("대전 학교 급식 식중독", "학교 급식을 먹은 학생들이 복통을 호소해 보건 당국이 조사 중이다",
+            category="education", date="2031-06-02"),
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SegmentStore(str(tmp_path / "segments"))
+
+
+def search(store, text, limit=10):
+    return search_indexes([segment.bm25 for segment in store.segments()], text, limit=limit)
+
+
+def test_ingest_adds_searchable_segments(store):
+    store.ingest(ARTICLES[:2], background_merge=False)
+    result = store.ingest(ARTICLES[2:], background_merge=False)
+    assert result == {"segment": result["segment"], "rows": 2, "segments": 2}
+    assert [len(segment) for segment in store.segments()] == [2, 2]
+    assert search(store, "학교 급식 식중독")[0]["title"] == "대전 학교 급식 식중독"
+
+
+def test_ingest_rejects_unknown_category_and_empty_articles(store):
+    with pytest.raises(ValueError):
+        store.ingest([article("제목", "본문", category="sports")], background_merge=False)
+    with pytest.raises(ValueError):
+        store.ingest([article("", " ")], background_merge=False)
+
+
+def test_idf_is_recombined_across_segments(store):
+    # 세그먼트마다 IDF 를 따로 쓰면 "크레인" 이 두 세그먼트에서 다른 무게를 갖는다
+    for a in ARTICLES:
+        store.ingest([a], background_merge=False)
+    before = search(store, "크레인 붕괴")
+    store.merge()
+    assert len(store.segments()) == 1
+    after = search(store, "크레인 붕괴")
+    assert [hit["title"] for hit in before] == [hit["title"] for hit in after]
+    assert before[0]["title"] == "구로구 공사장 크레인 붕괴"
+
+
+def test_merge_keeps_every_row_once(store):
+    for a in ARTICLES:
+        store.ingest([a], background_merge=False)
+    merged = store.merge()
+    assert [segment.name for segment in store.segments()] == [merged]
+    assert sorted(hit["title"] for hit in search(store, "크레인 버스 급식")) == sorted(
+        a["title"] for a in ARTICLES if any(w in a["title"] for w in ("크레인", "버스", "급식")))
+    assert len(store.segments()[0]) == len(ARTICLES)
+    assert store.merge() is None
+
+
+def test_racing_merges_commit_only_once(store):
+    other = SegmentStore(store.root)
+    for a in ARTICLES[:3]:
+        store.ingest([a], background_merge=False)
+    results = []
+    threads = [threading.Thread(target=lambda s=s: results.append(s.merge())) for s in (store, other)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sum(len(segment) for segment in store.segments()) == 3
+    assert len(store.segments()) == 1
+    assert store.segments()[0].name in results
+
+
+def test_segment_cubes_combine_with_base(store):
+    store.ingest(ARTICLES[:2], background_merge=False)
+    store.ingest(ARTICLES[2:], background_merge=False)
+    first, second = store.segments()
+    combined = StatsCube.combine([StatsCube.build(first.corpus), StatsCube.build(second.corpus)])
+    result = combined.query()
+    assert result["total"] == 4
+    assert result["by_category"] == {"accident": 2, "law": 1, "education": 1}
+    assert result["by_month"] == {"2031-05": 3, "2031-06": 1}
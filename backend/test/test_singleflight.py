@@ -0,0 +1,127 @@
+import asyncio
+
+import pytest
+
+from app.singleflight import SingleFlight
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class Work:
+    """호출 수를 세고 release 될 때까지 멈춰 있는 가짜 작업"""
+
+    def __init__(self, result="결과", error=None):
+        self.result = result
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+        self.release = None
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return self.result
+
+
+async def start(flight, work, key="k", n=3):
+    work.release = asyncio.Event()
+    tasks = [asyncio.create_task(flight.do(key, work)) for _ in range(n)]
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_concurrent_calls_share_one_execution():
+    flight, work = SingleFlight("test-share"), Work()
+
+    async def scenario():
+        tasks = await start(flight, work)
+        assert flight.stats()["in_flight"] == 1
+        work.release.set()
+        return await asyncio.gather(*tasks)
+
+    assert run(scenario()) == ["결과"] * 3
+    assert work.calls == 1
+    assert flight.stats() == {"calls": 3, "executions": 1, "deduplicated": 2, "in_flight": 0}
+
+
+def test_finished_key_runs_again():
+    flight, work = SingleFlight("test-again"), Work()
+
+    async def scenario():
+        for _ in range(2):
+            tasks = await start(flight, work, n=1)
+            work.release.set()
+            await asyncio.gather(*tasks)
+
+    run(scenario())
+    assert work.calls == 2
+
+
+def test_different_keys_do_not_share():
+    flight, work = SingleFlight("test-keys"), Work()
+
+    async def scenario():
+        work.release = asyncio.Event()
+        tasks = [asyncio.create_task(flight.do(key, work)) for key in ("a", "b")]
+        await asyncio.sleep(0)
+        work.release.set()
+        await asyncio.gather(*tasks)
+
+    run(scenario())
+    assert work.calls == 2
+
+
+def test_error_reaches_every_waiter_and_is_not_remembered():
+    flight, work = SingleFlight("test-error"), Work(error=ValueError("LLM 오류"))
+
+    async def scenario():
+        tasks = await start(flight, work)
+        work.release.set()
+        results = await asyncio.gather(*tasks, return_exceptions=True)
+        assert all(isinstance(r, ValueError) and str(r) == "LLM 오류" for r in results)
+        # 실패한 작업은 남겨 두지 않으므로 다음 호출은 다시 실행한다
+        work.error = None
+        tasks = await start(flight, work, n=1)
+        work.release.set()
+        return await tasks[0]
+
+    assert run(scenario()) == "결과"
+    assert work.calls == 2
+
+
+def test_cancelled_caller_leaves_others_waiting():
+    flight, work = SingleFlight("test-cancel-one"), Work()
+
+    async def scenario():
+        tasks = await start(flight, work)
+        tasks[0].cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await tasks[0]
+        work.release.set()
+        return await asyncio.gather(*tasks[1:])
+
+    assert run(scenario()) == ["결과"] * 2
+    assert work.cancelled == 0
+
+
+def test_work_is_cancelled_when_every_caller_gives_up():
+    flight, work = SingleFlight("test-cancel-all"), Work()
+
+    async def scenario():
+        tasks = await start(flight, work, n=2)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    run(scenario())
+    assert work.cancelled == 1
+    assert flight.stats()["in_flight"] == 0
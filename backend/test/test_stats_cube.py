@@ -0,0 +1,105 @@
+import pytest
+
+from app import stats_cube
+from app.corpus import Corpus, write_corpus
+from app.keyword_matcher import KeywordMatcher
+from app.segments import SegmentStore
+from app.stats_cube import UNKNOWN_MONTH, StatsCube
+
+MANIFEST = {"accident.csv": [1, 10], "law.csv": [2, 20], "health.csv": [3, 30]}
+ROWS = [
+    # (source, date, title, body)
+    (0, "2024-05-01", "서울 흉기 난동", "만취 남성 이 흉기 를 휘둘렀다"),
+    (0, "2024-05-20", "부산 교통 사고", "음주 운전 차량 이 인도 로 돌진"),
+    (0, "2024-06-03", "서울 공사장 붕괴", "작업자 가 다쳤다"),
+    (0, "", "날짜 없는 사건", "서울 도심 에서 시위"),
+    (1, "2024/06/15", "상습 음주 운전자 기소", "검찰 이 기소 했다"),
+]
+
+
+@pytest.fixture(autouse=True)
+def fixed_dictionaries(monkeypatch):
+    monkeypatch.setattr(stats_cube, "STATS_REGION_KEYWORDS", ["서울", "부산"])
+    matcher = KeywordMatcher({"범죄": ["흉기", "난동"], "음주": ["만취", "음주"], "법적": ["기소"]})
+    monkeypatch.setattr(stats_cube, "get_keyword_matcher", lambda: matcher)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    columns = {"date": [r[1] for r in ROWS], "title": [r[2] for r in ROWS], "body_prep": [r[3] for r in ROWS]}
+    sources = [{"file": "accident.csv", "rows": 4, "columns": ["date", "title", "body_prep"]},
+               {"file": "law.csv", "rows": 1, "columns": ["date", "title", "body_prep"]},
+               {"file": "health.csv", "rows": 0, "columns": []}]
+    write_corpus(str(tmp_path), columns, [r[0] for r in ROWS], sources, MANIFEST)
+    return Corpus.open(str(tmp_path))
+
+
+def test_build_counts_every_dimension(corpus):
+    cube = StatsCube.build(corpus)
+    assert cube.categories == ["accident.csv", "law.csv", "health.csv"]
+    assert cube.months == ["2024-05", "2024-06", UNKNOWN_MONTH]
+    assert cube.query() == {
+        "total": 5,
+        "by_category": {"accident": 4, "law": 1, "health": 0},
+        "by_month": {"2024-05": 2, "2024-06": 2, UNKNOWN_MONTH: 1},
+        "by_region": {"서울": 3, "부산": 1},
+        "by_topic": {"범죄": 1, "음주": 3, "법적": 1},
+    }
+    assert cube.summary()["law.csv"] == {"count": 1, "categories": "law"}
+
+
+def test_query_by_category_and_period(corpus):
+    cube = StatsCube.build(corpus)
+    accident = cube.query(category="accident")
+    assert accident["total"] == 4 and accident["by_category"] == {"accident": 4}
+    # 기간을 지정하면 날짜 불명 기사는 빠진다
+    june = cube.query(start_month="2024-06", end_month="2024-06")
+    assert june["total"] == 2
+    assert june["by_month"] == {"2024-06": 2}
+    assert june["by_region"] == {"서울": 1}
+    assert june["by_topic"] == {"음주": 1, "법적": 1}
+    assert cube.query(end_month="2024-05")["total"] == 2
+
+
+def test_query_rejects_bad_arguments(corpus):
+    cube = StatsCube.build(corpus)
+    with pytest.raises(KeyError):
+        cube.query(category="sports")
+    with pytest.raises(ValueError):
+        cube.query(start_month="2024-6")
+
+
+def test_save_and_load_round_trip(corpus, tmp_path, monkeypatch):
+    monkeypatch.setattr(stats_cube, "csv_manifest", lambda: {k: tuple(v) for k, v in MANIFEST.items()})
+    root = str(tmp_path / "cube")
+    cube = StatsCube.build(corpus)
+    cube.save(root)
+    loaded = StatsCube.load(root)
+    assert loaded.query() == cube.query()
+    assert loaded.query(category="law", start_month="2024-06") == cube.query(category="law", start_month="2024-06")
+    # CSV 가 바뀌면 저장된 큐브를 쓰지 않는다
+    monkeypatch.setattr(stats_cube, "csv_manifest", lambda: {"accident.csv": (9, 99)})
+    assert StatsCube.load(root) is None
+
+
+def test_segments_add_to_base_counts(corpus, tmp_path, monkeypatch):
+    store = SegmentStore(str(tmp_path / "segments"))
+    store.ingest([{"category": "health", "date": "2024-07-02", "title": "부산 병원 화재", "body_prep": "만취 환자"}],
+                 background_merge=False)
+    store.ingest([{"category": "accident", "date": "2024-05-09", "title": "서울 흉기 협박", "body_prep": "용의자 검거"}],
+                 background_merge=False)
+    base = StatsCube.build(corpus)
+    monkeypatch.setattr(stats_cube, "get_stats_cube", lambda: base)
+    monkeypatch.setattr(stats_cube, "_combined", None)
+    monkeypatch.setattr(stats_cube, "_segment_cubes", {})
+
+    combined = stats_cube.get_combined_cube(store.segments())
+    result = combined.query()
+    assert result["total"] == 7
+    assert result["by_category"] == {"accident": 5, "law": 1, "health": 1}
+    assert result["by_month"] == {"2024-05": 3, "2024-06": 2, "2024-07": 1, UNKNOWN_MONTH: 1}
+    assert result["by_region"] == {"서울": 4, "부산": 2}
+    assert result["by_topic"] == {"범죄": 2, "음주": 4, "법적": 1}
+    # 세그먼트 목록이 그대로면 합친 큐브를 다시 만들지 않는다
+    assert stats_cube.get_combined_cube(store.segments()) is combined
+    assert stats_cube.get_combined_cube([]) is base
@@ -0,0 +1,100 @@
+import numpy as np
+import pytest
+
+from app.corpus import Corpus, write_corpus
+from app.vector_index import HashingEmbedder, VectorIndex, document_text
+
+TOPICS = [
+    ["흉기", "난동", "경찰", "체포", "용의자", "골목"],
+    ["버스", "추돌", "교차로", "승객", "신호", "운전"],
+    ["급식", "식중독", "학생", "학교", "보건", "복통"],
+    ["공사장", "크레인", "붕괴", "작업자", "안전", "점검"],
+    ["미세먼지", "대기", "농도", "경보", "마스크", "환경"],
+]
+QUERIES = ["교차로 버스 추돌 사고", "학교 급식 식중독", "크레인 붕괴 작업자", "흉기 난동 용의자 체포", "미세먼지 경보"]
+
+
+@pytest.fixture(scope="module")
+def corpus(tmp_path_factory):
+    rng = np.random.default_rng(7)
+    titles, bodies = [], []
+    for i in range(400):
+        words = TOPICS[i % len(TOPICS)]
+        titles.append(" ".join(rng.choice(words, 3)))
+        bodies.append(" ".join(rng.choice(words + ["오늘", "시민", "현장", f"지역{i % 37}"], 12)))
+    path = str(tmp_path_factory.mktemp("corpus"))
+    write_corpus(path, {"date": [""] * len(titles), "title": titles, "body_prep": bodies}, [0] * len(titles),
+                 [{"file": "accident.csv", "rows": len(titles), "columns": ["title", "body_prep"]}],
+                 {"accident.csv": [1, 1]})
+    return Corpus.open(path)
+
+
+@pytest.fixture(scope="module")
+def index(corpus):
+    return VectorIndex.build(corpus, HashingEmbedder(dim=128))
+
+
+def brute_force(index, corpus, text, k):
+    """묶음을 나누지 않고 전체 문서와 내적"""
+    titles, bodies = corpus.column("title"), corpus.column("body_prep")
+    docs = index.embedder.encode([document_text(titles[row], bodies[row]) for row in range(len(corpus))])
+    scores = docs @ index.embedder.encode([text])[0]
+    return [int(row) for row in np.argsort(-scores, kind="stable")[:k]]
+
+
+def recall(index, corpus, nprobe, k=10):
+    hits = []
+    for text in QUERIES:
+        exact = set(brute_force(index, corpus, text, k))
+        found = {row for row, _ in index.top_k(text, k=k, nprobe=nprobe)}
+        hits.append(len(found & exact) / len(exact))
+    return float(np.mean(hits))
+
+
+def test_hashing_embedder_is_normalized_and_deterministic():
+    embedder = HashingEmbedder(dim=64)
+    vectors = embedder.encode(["흉기 난동", "흉기 난동", ""])
+    assert np.allclose(np.linalg.norm(vectors[:2], axis=1), 1.0)
+    assert np.array_equal(vectors[0], vectors[1])
+    assert not vectors[2].any()
+
+
+def test_lists_partition_every_document(index, corpus):
+    assert len(index.centroids) == 20  # sqrt(400)
+    assert index.offsets[0] == 0 and index.offsets[-1] == len(corpus)
+    assert sorted(index.rows.tolist()) == list(range(len(corpus)))
+    # 각 벡터는 자기 묶음의 중심에 가장 가깝다
+    for l in range(len(index.centroids)):
+        block = index.vectors[index.offsets[l]:index.offsets[l + 1]]
+        assert (np.argmax(block @ index.centroids.T, axis=1) == l).all()
+
+
+def test_probing_every_list_is_exact(index, corpus):
+    for text in QUERIES:
+        exact = brute_force(index, corpus, text, 10)
+        found = [row for row, _ in index.top_k(text, k=10, nprobe=len(index.centroids))]
+        assert found == exact
+
+
+def test_recall_against_brute_force(index, corpus):
+    recalls = [recall(index, corpus, nprobe) for nprobe in (1, 2, 4, len(index.centroids))]
+    # 묶음을 더 많이 볼수록 정확해지고, 기본 탐색 폭의 일부만 봐도 상위 10건을 거의 다 찾는다
+    assert recalls == sorted(recalls)
+    assert recalls[2] >= 0.9
+    assert recalls[-1] == 1.0
+
+
+def test_save_and_load_give_same_results(index, corpus, tmp_path):
+    index.save(str(tmp_path))
+    loaded = VectorIndex.load(corpus, index.embedder, str(tmp_path))
+    assert loaded is not None
+    assert loaded.top_k(QUERIES[0], k=5) == index.top_k(QUERIES[0], k=5)
+    # 다른 임베딩 모델로 만든 색인은 쓰지 않는다
+    assert VectorIndex.load(corpus, HashingEmbedder(dim=64), str(tmp_path)) is None
+
+
+def test_search_returns_cases_with_scores(index):
+    results = index.search("크레인 붕괴", limit=3)
+    assert len(results) == 3
+    assert all("크레인" in r["title"] or "붕괴" in r["title"] or "크레인" in r["summary"] for r in results)
+    assert results[0]["score"] >= results[-1]["score"] > 0